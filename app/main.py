@@ -6,7 +6,8 @@ import sys
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from core.io import ConfigLoader, PreferenceManager
+from core.io import PreferenceManager
+from core.registry import ArtifactRegistry
 from core.i18n import I18nManager
 from core.quality import QualityGateway
 from core.decision import DecisionEngine
@@ -37,8 +38,7 @@ else:
     with col1:
         st.subheader("A. Load Demo Project")
         if st.button(I18nManager.get("home.action_load", "Load Default Demo (Sample)")):
-            loader = ConfigLoader("configs/customer_default.yaml")
-            st.session_state.config = loader.load_config()
+            st.session_state.config = ArtifactRegistry.load_config("configs/customer_default.yaml")
             st.success("Demo configuration loaded!")
             st.rerun()
             
@@ -4,42 +4,40 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-import importlib
-import core.priority
-importlib.reload(core.priority)
-from core.priority import PriorityCalculator
+# Hot-reload of core modules is dev-only (EBDA_DEBUG=1); it also wipes class-level caches
+import core.priority, core.io, core.visualizer
+from core.lazy import dev_reload
+dev_reload(core.priority, core.io, core.visualizer)
 
-import core.io
-importlib.reload(core.io)
-from core.io import ConfigLoader
-
-from core.decision import DecisionEngine
+from core.registry import ArtifactRegistry, session_artifacts
 from core.snapshot import SnapshotManager
 from core.audit import AuditLogger
-import core.visualizer
-importlib.reload(core.visualizer)
-from core.visualizer import CausalVisualizer
 from core.sidebar import render_sidebar
 from core.i18n import I18nManager
+from core.perf import begin_page_run, render_performance_panel, span
+from core.board import BOARD_TOP_K, filter_mask, paginate_table, stakeholder_options, table_status_counts, STATUS_ORDER
 from core.scoring import (
-    prepare_candidates,
-    compute_driver_scores,
+    prepare_card_table,
     get_kpi_latest
 )
-import graphviz
+from core.uncertainty import EvidenceDistribution, apply_uncertainty, session_monte_carlo
 
 
 st.set_page_config(page_title="Decision Board", layout="wide")
 render_sidebar()
+begin_page_run("Decision Board")
 
 # Helpers
 # ...
 # Sidebar Config
 st.sidebar.markdown("### Settings")
 if "ranking_method" not in st.session_state: st.session_state.ranking_method = "SAW (Transparent)"
-ranking_method = st.sidebar.radio("Ranking Algorithm", ["SAW (Transparent)", "WASPAS (Robust)", "TOPSIS (Relative)", "Composite (Ensemble)"], index=0, key="ranking_method_sel", on_change=lambda: st.session_state.update({"ranking_method": st.session_state.ranking_method_sel}))
+ranking_method = st.sidebar.radio("Ranking Algorithm", ["SAW (Transparent)", "WASPAS (Robust)", "TOPSIS (Relative)", "VIKOR (Compromise)", "PROMETHEE II (Net flow)", "ELECTRE (Outranking)", "Composite (Ensemble)"], index=0, key="ranking_method_sel", on_change=lambda: st.session_state.update({"ranking_method": st.session_state.ranking_method_sel}))
 # Ensure sync
 ranking_method = st.session_state.get("ranking_method", ranking_method)
+st.sidebar.checkbox("Probabilistic ranking (Monte Carlo)", value=st.session_state.get("probabilistic_ranking", False), key="probabilistic_ranking_sel",
+                    help="Samples the evidence from its sampling error; each card's status uncertainty becomes its uncertainty term.",
+                    on_change=lambda: st.session_state.update({"probabilistic_ranking": st.session_state.probabilistic_ranking_sel}))
 
 # Engines
 
@@ -87,8 +85,8 @@ if 'config' not in st.session_state:
         st.session_state.config = saved_config
         st.toast("Restored previous session state.", icon="💾")
     else:
-        loader = ConfigLoader("configs/customer_default.yaml")
-        st.session_state.config = loader.load_config()
+        # Parsed once per process; this session gets its own mutable copy
+        st.session_state.config = ArtifactRegistry.load_config("configs/customer_default.yaml")
         # Initial save
         StatePersistence.save(st.session_state.config)
 
@@ -99,17 +97,18 @@ quality_penalty = st.session_state.get('survey_quality', {}).get('penalty', 0.0)
 
 
 
-# Engines
-decision_engine = DecisionEngine()
-priority_calc = PriorityCalculator(config.priority_weights)
-audit_logger = AuditLogger()
-snapshot_manager = SnapshotManager()
+# Engines (config-derived artifacts are shared across sessions, keyed by config hash)
+artifacts = session_artifacts(st.session_state, config)
+decision_engine = artifacts.engine
+priority_calc = artifacts.priority_calc
+audit_logger = ArtifactRegistry.service("audit_logger", AuditLogger)
+snapshot_manager = ArtifactRegistry.service("snapshot_manager", SnapshotManager)
 
 st.title(f"🚦 {I18nManager.get('sidebar.decision_board', 'Decision Board')}")
 st.markdown("Prioritized list of decision cards based on evidence.")
 
 # 2. Compute Evidence Context (Moved Up)
-evidence_context = compute_driver_scores(survey_df, config.drivers)
+evidence_context = artifacts.driver_matrix.scores(survey_df)
 # Add KPIs
 if kpi_df is not None:
     # MVP: specific mapping logic
@@ -118,51 +117,96 @@ if kpi_df is not None:
     evidence_context['manager_overtime'] = get_kpi_latest(kpi_df, 'manager_overtime')
 
 # 3. Evaluate & Rank Cards (Moved Up)
-candidates = prepare_candidates(
+# Columnar table; card states/score details are materialized only for the visible page
+card_table = prepare_card_table(
     config.decision_cards,
     decision_engine,
     evidence_context,
-    quality_penalty,
-    overrides=st.session_state
+    quality_penalty
 )
 
-# Batch Ranking Call
-ranked_candidates = priority_calc.rank_candidates(candidates, method=ranking_method)
-
-# Prepare for Display loop & Graph
-card_states = []
-for item in ranked_candidates:
-    card = item["_card"]
-    state = item["_state"]
-    # Update state with calculated priority
-    state.total_priority = item["score"]
-    state.confidence_penalty = item["uncertainty"]
-    
-    # Pass details for rendering
-    # storing (card, state, score_res, final_impact, final_urgency)
-    # score_res is essentially item['_details'] + score
-    score_res = item.get("_details", {"score": item["score"]})
-    score_res["score"] = item["score"]
-    
-    card_states.append((card, state, score_res, item["impact"], item["urgency"]))
+# Probabilistic mode: per-card uncertainty from sampling the evidence
+mc_result = None
+if st.session_state.get("probabilistic_ranking"):
+    distribution = EvidenceDistribution.from_evidence(evidence_context, artifacts.driver_matrix, survey_df, kpi_df)
+    mc_result = session_monte_carlo(st.session_state, artifacts, config.decision_cards, distribution, quality_penalty, ranking_method)
+    apply_uncertainty(card_table, mc_result, quality_penalty)
+
+# Batch Ranking Call (only the top cards are ordered now; later pages extend it)
+priority_calc.rank_table(card_table, method=ranking_method, top_k=BOARD_TOP_K)
 
 # Prepare scores for Graph
-card_scores_map = {cs[0].id: cs[1].total_priority for cs in card_states}
+card_scores_map = card_table.score_map()
 
 # Visualize Causal Graph (Transparency)
+# Graph index is built once per rerun; full and per-card views are emitted from it
+viz = artifacts.visualizer
 with st.expander("🕸️ Decision Architecture (Causal Graph)"):
-    viz = CausalVisualizer(config.drivers, config.decision_cards)
+    # Large configs default to the clustered view (full layout gets slow and unreadable)
+    large_graph = len(config.decision_cards) > 40 or len(config.drivers) > 30
+    graph_mode = st.radio("View", ["Aggregated", "Full"] if large_graph else ["Full", "Aggregated"], horizontal=True, key="graph_mode")
     try:
-        # Pass scores to visualizer
-        st.graphviz_chart(viz.render_causal_graph(driver_scores=evidence_context, card_scores=card_scores_map))
+        if graph_mode == "Aggregated":
+            card_status_map = card_table.status_map()
+            col_g1, col_g2 = st.columns([1, 1])
+            with col_g1:
+                group_labels = {"status": "Status", "stakeholder": "Stakeholder", "score_band": "Priority band"}
+                group_by = st.selectbox("Group cards by", list(group_labels), format_func=group_labels.get, key="graph_group_by")
+            with col_g2:
+                max_nodes = st.slider("Max nodes", 10, 200, 60, 10, key="graph_max_nodes")
+            clusters = [f"card:{k}" for k in viz.card_clusters(group_by, card_scores_map, card_status_map)]
+            clusters += [f"driver:{k}" for k in viz.driver_clusters(evidence_context)]
+            expand = st.multiselect("Expand clusters", clusters, format_func=lambda c: c.split(":", 1)[1], key="graph_expand")
+            dot = viz.render_aggregated_dot(evidence_context, card_scores_map, card_status_map, group_by, expand, max_nodes)
+        else:
+            dot = viz.render_dot(driver_scores=evidence_context, card_scores=card_scores_map)
+        with span("graphviz.chart", scope=graph_mode):
+            st.graphviz_chart(dot)
     except Exception as e:
         st.warning(f"Graphviz not installed or error: {e}")
 
 
+# Shared evidence context (rendered once, not per card)
+with st.expander("📊 Underlying Evidence Data"):
+    st.json(evidence_context) # Raw context for transparency
+
+if mc_result is not None:
+    with st.expander(f"🎲 Monte Carlo Uncertainty ({mc_result.n_samples} samples)"):
+        st.caption("Status probabilities and rank percentiles when driver scores / KPIs vary within their sampling error.")
+        st.dataframe(mc_result.to_frame(), use_container_width=True, hide_index=True)
+
 st.write("---")
 
-# 4. Display Loop
-for card, state, score_res, final_impact, final_urgency in card_states:
+# 4. Filters & Pagination (only the visible page builds widgets)
+counts = table_status_counts(card_table)
+col_f1, col_f2, col_f3, col_f4 = st.columns([2, 2, 1, 2])
+with col_f1:
+    status_options = [s for s in STATUS_ORDER if s in counts] + [s for s in counts if s not in STATUS_ORDER]
+    filter_status = st.multiselect("Status", status_options, format_func=lambda s: f"{s} ({counts.get(s, 0)})", key="board_filter_status")
+with col_f2:
+    filter_stakeholders = st.multiselect("Stakeholder", stakeholder_options(config.decision_cards), key="board_filter_stakeholder")
+with col_f3:
+    min_score = st.number_input("Min score", value=None, step=0.1, key="board_min_score")
+with col_f4:
+    search = st.text_input("Search", key="board_search", placeholder="Title or ID")
+
+visible_mask = filter_mask(card_table, filter_status, filter_stakeholders, min_score, search)
+
+col_p1, col_p2, col_p3 = st.columns([1, 1, 4])
+with col_p1:
+    page_size = st.selectbox("Cards per page", [10, 20, 50, 100], index=1, key="board_page_size")
+_, _, total_pages, _ = paginate_table(card_table, visible_mask, 1, page_size)
+if st.session_state.get("board_page", 1) > total_pages:
+    st.session_state.board_page = total_pages # Filters shrank the result set
+with col_p2:
+    page = st.number_input("Page", 1, total_pages, key="board_page")
+page_rows, page, total_pages, n_visible = paginate_table(card_table, visible_mask, page, page_size)
+page_states = card_table.rows(page_rows)
+with col_p3:
+    st.caption(f"Showing {len(page_states)} of {n_visible} matching cards ({len(card_table)} total) · page {page}/{total_pages}")
+
+# 5. Display Loop
+for row, (card, state, score_res, final_impact, final_urgency) in zip(page_rows.tolist(), page_states):
     with st.container():
         # Header Row
         col1, col2, col3 = st.columns([1, 4, 2])
@@ -176,9 +220,10 @@ for card, state, score_res, final_impact, final_urgency in card_states:
         with col3:
             st.metric("Priority Score", f"{state.total_priority:.2f}")
             st.progress(max(0.0, min(1.0, state.total_priority / 3.0))) # Normalize approx
+            st.caption(f"Rank #{card_table.rank_of(row) + 1} of {len(card_table)}")
 
-        # Details Expander
-        with st.expander("🔍 See Evidence & Recommendation", expanded=(state.status=="RED")):
+        # Details (tabs, sliders and graph are only built when opened)
+        if st.toggle("🔍 See Evidence & Recommendation", value=(state.status=="RED"), key=f"details_{card.id}"):
             tab1, tab2, tab3, tab4 = st.tabs(["Evidence", "Recommendation", "Scoring", "Causal Graph"])
             
             with tab1:
@@ -186,8 +231,7 @@ for card, state, score_res, final_impact, final_urgency in card_states:
                 for ev in state.key_evidence:
                     st.error(ev) if state.status == "RED" else st.info(ev)
                 
-                st.write("**Underlying Data:**")
-                st.json(evidence_context) # Raw context for transparency
+                st.caption("Underlying data: see '📊 Underlying Evidence Data' above.")
 
             with tab2:
                 if state.recommendation_draft:
@@ -229,6 +273,16 @@ for card, state, score_res, final_impact, final_urgency in card_states:
                                 st.rerun()
                     st.info("No recommendation needed (Green).")
 
+                # Audit history for this card (index lookup, no full log scan)
+                history = audit_logger.card_history(card.id, limit=20)
+                if history:
+                    st.markdown("**Audit History:**")
+                    st.dataframe(
+                        pd.DataFrame(history)[["timestamp", "action", "reason", "user", "snapshot_id"]],
+                        hide_index=True,
+                        use_container_width=True
+                    )
+
             with tab3:
                 st.subheader("Scoring & What-If Simulation")
                 
@@ -289,13 +343,34 @@ for card, state, score_res, final_impact, final_urgency in card_states:
                     if (s_pos + s_neg) > 0:
                         st.latex(f"Score = \\frac{{S^-}}{{S^+ + S^-}} = \\frac{{{s_neg:.4f}}}{{{s_pos+s_neg:.4f}}}")
                 
+                elif "VIKOR" in ranking_method:
+                    st.write("**VIKOR Measures:**")
+                    st.markdown(f"- Group Utility ($S$): `{score_res.get('S', 0):.4f}`")
+                    st.markdown(f"- Individual Regret ($R$): `{score_res.get('R', 0):.4f}`")
+                    st.latex(f"Score = 1 - Q = 1 - {score_res.get('Q', 0):.4f}")
+                    st.caption("Q = v·S* + (1 - v)·R*, with S and R rescaled over all cards (lower Q = better compromise).")
+
+                elif "PROMETHEE" in ranking_method:
+                    st.write("**PROMETHEE II Flows:**")
+                    phi_pos = score_res.get("phi+", 0)
+                    phi_neg = score_res.get("phi-", 0)
+                    st.markdown(f"- Leaving Flow ($\\phi^+$): `{phi_pos:.4f}`")
+                    st.markdown(f"- Entering Flow ($\\phi^-$): `{phi_neg:.4f}`")
+                    st.latex(f"Score = \\phi^+ - \\phi^- = {phi_pos - phi_neg:.4f}")
+
+                elif "ELECTRE" in ranking_method:
+                    st.write("**Outranking Relations:**")
+                    cols_r = st.columns(2)
+                    cols_r[0].metric("Outranks", score_res.get("outranks", 0))
+                    cols_r[1].metric("Outranked By", score_res.get("outranked_by", 0))
+                    st.caption("Score = (outranks - outranked by) / (N - 1)")
+
                 elif "Composite" in ranking_method:
                     st.write("**Ensemble Rankings:**")
                     ranks = score_res.get("ranks", {})
-                    cols_r = st.columns(3)
-                    cols_r[0].metric("SAW Rank", ranks.get("SAW", "-"))
-                    cols_r[1].metric("WASPAS Rank", ranks.get("WASPAS", "-"))
-                    cols_r[2].metric("TOPSIS Rank", ranks.get("TOPSIS", "-"))
+                    cols_r = st.columns(max(len(ranks), 1))
+                    for col, (member, member_rank) in zip(cols_r, ranks.items()):
+                        col.metric(f"{member} Rank", member_rank)
                     st.caption(f"Average Rank: {score_res.get('avg_rank', 0):.2f}")
                 
                 elif "breakdown" in score_res:
@@ -304,21 +379,19 @@ for card, state, score_res, final_impact, final_urgency in card_states:
                     inputs = score_res.get("inputs", {})
                     
                     if breakdown:
-                         term_imp = breakdown.get("impact_term", 0)
-                         term_urg = breakdown.get("urgency_term", 0)
-                         term_unc = breakdown.get("uncertainty_term", 0)
-                         
-                         # Get inputs if available for transparency
-                         val_imp = inputs.get("impact", final_impact)
-                         val_urg = inputs.get("urgency", final_urgency)
-                         val_unc = inputs.get("uncertainty", state.confidence_penalty)
-                         
-                         w_imp = priority_calc.w_impact
-                         w_urg = priority_calc.w_urgency
-                         w_unc = priority_calc.w_uncertainty
-                         
-                         st.latex(f"({val_imp:.2f} \\times {w_imp:.1f}) + ({val_urg:.2f} \\times {w_urg:.1f}) - ({val_unc:.2f} \\times {w_unc:.1f})")
-                         st.latex(f"= {term_imp:.2f} + {term_urg:.2f} - {abs(term_unc):.2f} = {score_res['score']:.2f}")
+                         # One term per criterion: benefit criteria add, cost criteria (uncertainty, ...) subtract
+                         fallback = {"impact": final_impact, "urgency": final_urgency, "uncertainty": state.confidence_penalty}
+                         factors, terms = [], []
+                         for crit, w, benefit in zip(priority_calc.criteria, priority_calc.weights.tolist(), priority_calc.benefit.tolist()):
+                             sign = "+" if benefit else "-"
+                             val = inputs.get(crit.id, fallback.get(crit.id, 0.0))
+                             factors.append(f"{sign} ({val:.2f} \\times {w:.1f})")
+                             terms.append(f"{sign} {abs(breakdown.get(f'{crit.id}_term', 0)):.2f}")
+
+                         st.latex(" ".join(factors).lstrip("+ "))
+                         st.latex(f"= {' '.join(terms).lstrip('+ ')} = {score_res['score']:.2f}")
+                         if priority_calc.extra_ids:
+                             st.caption("Terms: " + ", ".join(c.label or c.id for c in priority_calc.criteria))
                 
                 if quality_penalty > 0.1:
                     st.warning(f"⚠️ Confidence Penalty applied: -{quality_penalty:.2f} due to data quality issues.")
@@ -327,19 +400,21 @@ for card, state, score_res, final_impact, final_urgency in card_states:
                 st.subheader("Decision Architecture")
                 st.caption("Contextual Causal Graph for this Decision")
                 try:
-                    # Renders focused view for specific card
-                    mini_dot = viz.render_causal_graph(
+                    # Focused view for specific card (derived from the shared graph index, cached DOT)
+                    mini_dot = viz.render_dot(
                         driver_scores=evidence_context, 
                         card_scores=card_scores_map,
                         target_card_id=card.id
                     )
-                    st.graphviz_chart(mini_dot)
+                    with span("graphviz.chart", scope=card.id):
+                        st.graphviz_chart(mini_dot)
                 except Exception as e:
                     st.error(f"Visualization Error: {e}")
 
-        st.json(state.model_dump(include={'status','total_priority','confidence_penalty'})) # Mini debug
         st.divider()
 
 # Freeze Action moved to page 4_Freeze_Report
 st.sidebar.markdown("### Actions")
 st.sidebar.info("Go to 'Report & Freeze' page to finalize.")
+
+render_performance_panel()
@@ -5,9 +5,12 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from core.quality import QualityGateway
+from core.workbook import load_workbook
 from core.io import DataLoader, PreferenceManager
 from core.templates import DataTemplates
 from core.llm import LLMClient
+from core.copilot import stream_suggestion
+from core.synthetic import SyntheticSurveyGenerator
 from core.security import SecurityManager
 from core.sidebar import render_sidebar
 from core.i18n import I18nManager
@@ -38,8 +41,35 @@ with tab1:
                            DataTemplates.get_survey_template().to_csv(index=False), 
                            "sample_survey.csv")
 
-    uploaded_survey = st.file_uploader("Upload Survey CSV", type=["csv"], key="survey_upl")
-    if uploaded_survey:
+    uploaded_survey = st.file_uploader("Upload Survey CSV (or an .xlsx workbook with survey/KPI sheets)", type=["csv", "xlsx"], key="survey_upl")
+    if uploaded_survey and uploaded_survey.name.lower().endswith(".xlsx"):
+        # Parse once per uploaded file, not on every rerun
+        cached = st.session_state.get('_survey_workbook')
+        if cached is None or cached[0] != uploaded_survey.file_id:
+            wb_import = load_workbook(uploaded_survey, st.session_state.config.quality_gates,
+                                      drivers=st.session_state.config.drivers, roles=["survey", "kpi"])
+            st.session_state['_survey_workbook'] = (uploaded_survey.file_id, wb_import)
+        wb_import = st.session_state['_survey_workbook'][1]
+
+        st.caption(f"Sheets: {wb_import.sheets or 'none recognized'}" + (f" (ignored: {', '.join(wb_import.unused_sheets)})" if wb_import.unused_sheets else ""))
+        for role, err in wb_import.errors.items():
+            st.error(f"{role}: {err}")
+        if wb_import.survey is not None:
+            st.write(f"Loaded {len(wb_import.survey)} responses.")
+            st.metric("Structure Confidence", f"{(1.0 - wb_import.survey_quality['penalty']):.0%}")
+        if wb_import.kpi is not None:
+            st.write(f"Loaded {len(wb_import.kpi)} KPI records.")
+
+        if (wb_import.survey is not None or wb_import.kpi is not None) and st.button("Ingest Workbook", key="ingest_workbook"):
+            if wb_import.survey is not None:
+                st.session_state.survey_data = wb_import.survey
+                st.session_state.survey_quality = wb_import.survey_quality
+            if wb_import.kpi is not None:
+                st.session_state.kpi_data = wb_import.kpi
+            del st.session_state['_survey_workbook']
+            st.success("Ingested workbook.")
+            st.rerun()
+    elif uploaded_survey:
         df_survey = pd.read_csv(uploaded_survey)
         st.write(f"Loaded {len(df_survey)} responses.")
         
@@ -120,6 +150,18 @@ with tab3:
             
         st.markdown("---")
 
+        # Local statistical generator (no LLM, scales to large n)
+        st.markdown("#### Generate Locally (Statistical)")
+        n_local = st.number_input("Number of respondents", 10, 1_000_000, 1000, step=1000, key="n_local_ev")
+        if st.button("Generate Locally"):
+            gen = SyntheticSurveyGenerator(st.session_state.config, seed=int(n_local))
+            st.session_state.survey_data = pd.concat(list(gen.iter_survey(int(n_local))), ignore_index=True)
+            st.session_state.kpi_data = gen.kpi_series()
+            st.success(f"Generated {int(n_local)} respondents and KPI series.")
+            st.rerun()
+
+        st.markdown("---")
+
         # Generate Action
         st.markdown("#### Generate Synthetic Responses")
         n_samples = st.number_input("Number of samples", 1, 50, 10, key="n_samples_ev")
@@ -132,12 +174,12 @@ with tab3:
                 cols_str = ",".join(list(df_active.columns)) if not df_active.empty else "Q1,Q2..."
                 prompt = base_prompt + f"\n\nTASK: Generate exactly {n_samples} CSV rows (no header) representing realistic survey answers (1-5 scale). Columns should match the drivers."
                 
-                with st.spinner("Generating..."):
-                    try:
-                        res = st.session_state['ev_llm'].generate_suggestions(str(df_active.head().to_csv()), "Survey Data") 
-                        st.session_state['ev_suggestion'] = res
-                    except Exception as e:
-                        st.error(f"Error: {e}")
+                try:
+                    # Synthetic samples should vary between clicks -> bypass the response cache
+                    res = stream_suggestion(st.session_state['ev_llm'], str(df_active.head().to_csv()), "Survey Data", list(df_active.columns), use_cache=False)
+                    st.session_state['ev_suggestion'] = res
+                except Exception as e:
+                    st.error(f"Error: {e}")
             else:
                 st.warning("Init Copilot first.")
         
@@ -203,6 +245,6 @@ with tab4:
 
 st.markdown("---")
 if st.button("🗑️ Clear All Data"):
-    for k in ['survey_data', 'kpi_data', 'survey_quality']:
+    for k in ['survey_data', 'kpi_data', 'survey_quality', '_survey_workbook']:
         if k in st.session_state: del st.session_state[k]
     st.rerun()
@@ -7,6 +7,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 
 from core.sidebar import render_sidebar
 from core.i18n import I18nManager
+from core.priority import criteria_to_frame
 
 
 st.set_page_config(page_title="Settings", layout="wide")
@@ -21,6 +22,9 @@ if 'config' in st.session_state:
     
     st.subheader("Priority Weights (SAW)")
     st.json(config.priority_weights)
+    if config.criteria:
+        st.subheader("Additional Criteria")
+        st.dataframe(criteria_to_frame(config.criteria), hide_index=True)
     
     st.subheader("Quality Gates")
     st.json(config.quality_gates)
@@ -2,8 +2,6 @@ import streamlit as st
 import pandas as pd
 from core.snapshot import SnapshotManager
 from core.report import ReportGenerator
-from core.decision import DecisionEngine
-from core.priority import PriorityCalculator
 import sys
 import os
 
@@ -13,14 +11,18 @@ from core.quality import QualityGateway
 from core.io import DataLoader
 from core.sidebar import render_sidebar
 from core.i18n import I18nManager
+from core.perf import begin_page_run, render_performance_panel, span
+from core.registry import ArtifactRegistry, session_artifacts
+from core.card_table import STATUS_CODES
 from core.scoring import (
-    prepare_candidates,
-    compute_driver_scores,
+    prepare_card_table,
     get_kpi_latest
 )
+from core.uncertainty import EvidenceDistribution, apply_uncertainty, session_monte_carlo
 
 st.set_page_config(page_title="Report & Freeze", layout="wide")
 render_sidebar()
+begin_page_run("Freeze Report")
 st.title(f"📑 {I18nManager.get('sidebar.freeze_report', 'Report Generation & Freeze')}")
 
 # 1. State Check
@@ -38,11 +40,13 @@ kpi_df = st.session_state.get('kpi_data')
 # For MVP, we'll re-run the logic quickly
 
 def get_current_state():
-    decision_engine = DecisionEngine()
-    priority_calc = PriorityCalculator(config.priority_weights)
+    # Shared, config-derived engines (see core.registry)
+    artifacts = session_artifacts(st.session_state, config)
+    decision_engine = artifacts.engine
+    priority_calc = artifacts.priority_calc
     
     # Context (simplified MVP logic)
-    evidence_context = compute_driver_scores(survey_df, config.drivers)
+    evidence_context = artifacts.driver_matrix.scores(survey_df)
     if kpi_df is not None:
         evidence_context['turnover_rate_junior'] = get_kpi_latest(kpi_df, 'turnover_rate_junior')
         evidence_context['avg_overtime_hours'] = get_kpi_latest(kpi_df, 'avg_overtime_hours')
@@ -51,49 +55,40 @@ def get_current_state():
     penalty = st.session_state.get('survey_quality', {}).get('penalty', 0.0)
     
     # Use shared logic consistent with Decision Board
-    candidates = prepare_candidates(
+    card_table = prepare_card_table(
         config.decision_cards,
         decision_engine,
         evidence_context,
-        penalty,
-        overrides=st.session_state
+        penalty
     )
 
-    # Use same ranking method as Decision Board
+    # Use same ranking method (and probabilistic mode) as Decision Board
     method = st.session_state.get("ranking_method", "SAW (Transparent)")
-    ranked = priority_calc.rank_candidates(candidates, method=method)
-    
-    states = []
-    for item in ranked:
-        s = item["_state"]
-        s.total_priority = item["score"]
-        # Score Result (details + score)
-        score_res = item.get("_details", {})
-        score_res["score"] = item["score"]
-        states.append((item["_card"], s, score_res))
-        
-    return states, evidence_context
-
-current_states, context = get_current_state()
-
-# 3. Preview
+    if st.session_state.get("probabilistic_ranking"):
+        distribution = EvidenceDistribution.from_evidence(evidence_context, artifacts.driver_matrix, survey_df, kpi_df)
+        mc_result = session_monte_carlo(st.session_state, artifacts, config.decision_cards, distribution, penalty, method)
+        apply_uncertainty(card_table, mc_result, penalty)
+    priority_calc.rank_table(card_table, method=method)
+    return card_table, evidence_context
+
+card_table, context = get_current_state()
+
+# 3. Preview (straight from the table columns; every card, as in the memo)
 st.subheader("Summarized Status")
-df_summary = pd.DataFrame([
-    {
-        "ID": cs[0].id,
-        "Title": cs[0].title,
-        "Status": cs[1].status,
-        "Priority": f"{cs[1].total_priority:.2f}"
-    }
-    for cs in current_states
-])
+order = card_table.order
+df_summary = pd.DataFrame({
+    "ID": [card_table.ids[i] for i in order],
+    "Title": [card_table.cards[i].title for i in order],
+    "Status": [STATUS_CODES[code].value for code in card_table.status[order].tolist()],
+    "Priority": [f"{score:.2f}" for score in card_table.score[order].tolist()]
+})
 st.dataframe(df_summary)
 
 # 4. Freeze Action
 st.subheader("Freeze Snapshot")
 st.markdown("Create an immutable snapshot of the current state before generating final reports.")
 
-snapshot_manager = SnapshotManager()
+snapshot_manager = ArtifactRegistry.service("snapshot_manager", SnapshotManager)
 
 col1, col2 = st.columns(2)
 with col1:
@@ -105,7 +100,8 @@ if st.button("❄️ Freeze Current State"):
     wave = Wave(id="W001", name=snap_name)
     # Ideally populate wave with states...
     
-    snap = snapshot_manager.freeze(wave, "config_hash")
+    with span("snapshot.freeze"):
+        snap = snapshot_manager.freeze(wave, "config_hash")
     st.session_state['last_snapshot'] = snap
     st.success(f"Snapshot Frozen: {snap.id}")
 
@@ -122,7 +118,7 @@ report_gen = ReportGenerator(config)
 if st.button("📄 Generate Decision Memo (DOCX)"):
     docx_buffer = report_gen.generate_docx(
         wave_data={"status": "DRAFT"},
-        decision_states=current_states,
+        decision_states=[row[:3] for row in card_table.rows(order)], # Export: materialize every card
         snapshot_id=st.session_state.get('last_snapshot', type('obj', (object,), {'id': 'LIVE'})).id
     )
     
@@ -132,3 +128,5 @@ if st.button("📄 Generate Decision Memo (DOCX)"):
         file_name=f"Decision_Memo_{config.customer_name}.docx",
         mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
     )
+
+render_performance_panel()
@@ -1,11 +1,19 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import json
 import yaml
-from core.converter import DataConverter
+from core.converter import DataConverter, DRIVER_COLUMNS, CARD_COLUMNS
+from core.rule_format import RuleFormatError, rules_to_long
+from core.workbook import load_workbook
+from core.registry import config_changed, session_artifacts
+from core.scoring import prepare_card_table, get_kpi_latest
+from core.priority import BASE_METHODS, DIRECTIONS, criteria_from_frame, criteria_to_frame
+from core.sensitivity import WeightSensitivity, grid_steps, sample_weights, vector_budget, weight_grid
+from core.copilot import stream_suggestion
 import core.io
-import importlib
-importlib.reload(core.io)
+from core.lazy import dev_reload
+dev_reload(core.io) # Dev-only hot reload (EBDA_DEBUG=1)
 from core.io import ConfigLoader, PreferenceManager
 from data.models import DecisionCardConfig, DriverConfig
 from core.templates import DataTemplates
@@ -43,6 +51,22 @@ with tab1:
                            "template_cards.csv")
     
     st.markdown("---")
+
+    # One workbook (Drivers / Cards / optional Rules sheets) instead of Steps A and B
+    uploaded_workbook = st.file_uploader("Or upload one Excel workbook (.xlsx)", type=["xlsx"], key="config_xlsx")
+    if uploaded_workbook:
+        # Parse once per uploaded file, not on every rerun
+        cached = st.session_state.get('_config_workbook')
+        if cached is None or cached[0] != uploaded_workbook.file_id:
+            st.session_state['_config_workbook'] = (uploaded_workbook.file_id, load_workbook(uploaded_workbook, roles=["drivers", "cards", "rules"]))
+        wb_import = st.session_state['_config_workbook'][1]
+        for role, err in wb_import.errors.items():
+            st.error(f"{role}: {err}")
+        if wb_import.drivers is not None and wb_import.cards is not None:
+            drivers_json, cards_json = wb_import.drivers, wb_import.cards
+            st.success(f"Parsed {len(drivers_json)} drivers and {len(cards_json)} cards from sheets {list(wb_import.sheets.values())}.")
+        elif not wb_import.errors:
+            st.warning(f"Workbook needs a Drivers and a Cards sheet (found: {list(wb_import.sheets.values()) or 'none'}).")
     
     col1, col2 = st.columns(2)
     
@@ -61,10 +85,19 @@ with tab1:
         if uploaded_cards:
             df_cards = pd.read_csv(uploaded_cards)
             st.dataframe(df_cards.head())
-            cards_json = DataConverter.csv_to_decision_card(df_cards)
-            st.success(f"Parsed {len(cards_json)} cards.")
+            # Optional long-format rules (card_id, order, condition, status, message)
+            uploaded_rules = st.file_uploader("Upload Rules CSV (optional, one row per rule)", type=["csv"], key="rules_csv")
+            df_rules = pd.read_csv(uploaded_rules) if uploaded_rules else None
+            try:
+                cards_json = DataConverter.csv_to_decision_card(df_cards, rules_df=df_rules)
+                st.success(f"Parsed {len(cards_json)} cards.")
+            except RuleFormatError as e:
+                uploaded_cards = None # Blocks Step C
+                st.error(f"{len(e.errors)} invalid rule(s); nothing was imported.")
+                st.dataframe(pd.DataFrame(e.errors))
 
-    if uploaded_drivers and uploaded_cards:
+    workbook_ready = bool(uploaded_workbook) and wb_import.drivers is not None and wb_import.cards is not None
+    if (uploaded_drivers and uploaded_cards) or workbook_ready:
         st.markdown("### Step C: Generate YAML Config")
         if st.button("Generate Config File"):
             config_dict = {
@@ -94,8 +127,9 @@ with tab3:
         st.download_button("Download Drivers CSV", df_drivers.to_csv(index=False), "drivers.csv", "text/csv")
         
         # Cards to CSV
-        df_cards = DataConverter.decision_card_to_csv(config.decision_cards)
+        df_cards = DataConverter.decision_card_to_csv(config.decision_cards, include_templates=True)
         st.download_button("Download Cards CSV", df_cards.to_csv(index=False), "cards.csv", "text/csv")
+        st.download_button("Download Rules CSV (long format)", rules_to_long(config.decision_cards).to_csv(index=False), "rules.csv", "text/csv")
         
         # Full YAML
         full_yaml = yaml.dump(config.dict(), sort_keys=False)
@@ -144,9 +178,9 @@ with tab4:
             st.markdown("#### Copilot")
             if st.button("Suggest Drivers"):
                 if 'llm_client' in st.session_state:
-                    with st.spinner("Thinking..."):
-                        suggestion = st.session_state['llm_client'].generate_suggestions(df_drivers_current.to_csv(), "Drivers")
-                        st.session_state['driver_suggestion'] = suggestion
+                    # Rows render and validate as they stream in
+                    suggestion = stream_suggestion(st.session_state['llm_client'], df_drivers_current.to_csv(), "Drivers", DRIVER_COLUMNS)
+                    st.session_state['driver_suggestion'] = suggestion
                 else:
                     st.warning("Init Copilot first.")
             
@@ -169,6 +203,7 @@ with tab4:
                             new_drivers_obj = DataConverter.csv_to_drivers(combined)
                             st.session_state.config.drivers = new_drivers_obj
                             StatePersistence.save(st.session_state.config)
+                            config_changed(st.session_state)
                             
                             del st.session_state['driver_suggestion']
                             st.success(f"Appended {len(new_rows)} drivers!")
@@ -183,6 +218,7 @@ with tab4:
                 new_drivers = DataConverter.csv_to_drivers(edited_drivers_df)
                 st.session_state.config.drivers = new_drivers
                 StatePersistence.save(st.session_state.config)
+                config_changed(st.session_state)
                 st.success(f"Updated {len(new_drivers)} drivers!")
                 st.rerun()
             except Exception as e:
@@ -202,9 +238,8 @@ with tab4:
             st.markdown("#### Copilot")
             if st.button("Suggest Cards"):
                 if 'llm_client' in st.session_state:
-                    with st.spinner("Analyzing context..."):
-                        suggestion = st.session_state['llm_client'].generate_suggestions(df_cards_current.to_csv(), "Decision Cards")
-                        st.session_state['card_suggestion'] = suggestion
+                    suggestion = stream_suggestion(st.session_state['llm_client'], df_cards_current.to_csv(), "Decision Cards", CARD_COLUMNS)
+                    st.session_state['card_suggestion'] = suggestion
                 else:
                     st.warning("Init Copilot first.")
             
@@ -234,9 +269,14 @@ with tab4:
                                         nc.simulation_urgency = oc.simulation_urgency
                                         nc.manual_override_status = oc.manual_override_status
                                         nc.manual_override_reason = oc.manual_override_reason
+                                        if not nc.recommendation_templates:
+                                            nc.recommendation_templates = oc.recommendation_templates
+                                        if not nc.criteria_values:
+                                            nc.criteria_values = oc.criteria_values
 
                             st.session_state.config.decision_cards = new_cards_obj
                             StatePersistence.save(st.session_state.config)
+                            config_changed(st.session_state)
                             
                             del st.session_state['card_suggestion']
                             st.success(f"Appended {len(new_rows)} cards!")
@@ -260,9 +300,14 @@ with tab4:
                             nc.simulation_urgency = oc.simulation_urgency
                             nc.manual_override_status = oc.manual_override_status
                             nc.manual_override_reason = oc.manual_override_reason
+                            if not nc.recommendation_templates:
+                                nc.recommendation_templates = oc.recommendation_templates
+                            if not nc.criteria_values:
+                                nc.criteria_values = oc.criteria_values
 
                 st.session_state.config.decision_cards = new_cards
                 StatePersistence.save(st.session_state.config)
+                config_changed(st.session_state)
                 st.success(f"Updated {len(new_cards)} decision cards!")
                 st.rerun()
             except Exception as e:
@@ -279,9 +324,89 @@ with tab4:
         if st.button("Update Weights"):
             st.session_state.config.priority_weights = {"impact": w_imp, "urgency": w_urg, "uncertainty": w_unc}
             StatePersistence.save(st.session_state.config)
+            config_changed(st.session_state)
             st.success("Weights Updated!")
             st.rerun()
 
+        ensemble = st.multiselect("Composite Ensemble", BASE_METHODS, default=[m for m in config.ranking_ensemble if m in BASE_METHODS],
+                                  help="Methods whose ranks are averaged by the Composite (Ensemble) ranking.")
+        if st.button("Update Ensemble"):
+            if not ensemble:
+                st.error("Select at least one method.")
+            else:
+                st.session_state.config.ranking_ensemble = ensemble
+                StatePersistence.save(st.session_state.config)
+                config_changed(st.session_state)
+                st.success("Ensemble Updated!")
+                st.rerun()
+
+        st.markdown("#### Additional Criteria")
+        st.caption("Ranking criteria besides impact / urgency / uncertainty (e.g. cost, effort, strategic fit). "
+                   "Card values go in each card's `criteria_values` and are rescaled from [min, max] to 0-1; "
+                   "'cost' criteria count against a card, unset values sit in the middle of the range.")
+        edited_criteria = st.data_editor(
+            criteria_to_frame(config.criteria),
+            num_rows="dynamic",
+            column_config={
+                "direction": st.column_config.SelectboxColumn("direction", options=DIRECTIONS, default="benefit"),
+                "weight": st.column_config.NumberColumn("weight", min_value=0.0, default=1.0),
+                "min": st.column_config.NumberColumn("min", default=0.0),
+                "max": st.column_config.NumberColumn("max", default=1.0),
+            },
+            key="editor_criteria_df",
+        )
+        if st.button("Update Criteria"):
+            try:
+                st.session_state.config.criteria = criteria_from_frame(edited_criteria)
+                StatePersistence.save(st.session_state.config)
+                config_changed(st.session_state)
+                st.success(f"Saved {len(st.session_state.config.criteria)} additional criteria!")
+                st.rerun()
+            except ValueError as e:
+                st.error(f"Invalid criteria: {e}")
+
+        with st.expander("🎯 Weight Sensitivity"):
+            st.caption("How stable is the current ranking if the weights were different? "
+                       "Ranks every card for many weight vectors (same total weight) with the current evidence.")
+            s1, s2, s3, s4 = st.columns(4)
+            sens_method = s1.selectbox("Method", ["SAW (Transparent)", "WASPAS (Robust)", "TOPSIS (Relative)", "VIKOR (Compromise)",
+                                                    "PROMETHEE II (Net flow)", "ELECTRE (Outranking)", "Composite (Ensemble)"],
+                                       index=0, key="sens_method")
+            sens_mode = s2.selectbox("Weights", ["Around current", "Whole simplex", "Grid"], key="sens_mode")
+            sens_n = s3.number_input("Samples / grid steps", 5, 5000, 1000, key="sens_n")
+            sens_k = s4.number_input("Top-k", 1, 100, 10, key="sens_k")
+            if st.button("Run Sensitivity"):
+                artifacts = session_artifacts(st.session_state, config)
+                evidence_context = artifacts.driver_matrix.scores(st.session_state.get('survey_data'))
+                kpi_df = st.session_state.get('kpi_data')
+                if kpi_df is not None:
+                    evidence_context['turnover_rate_junior'] = get_kpi_latest(kpi_df, 'turnover_rate_junior')
+                    evidence_context['avg_overtime_hours'] = get_kpi_latest(kpi_df, 'avg_overtime_hours')
+                    evidence_context['manager_overtime'] = get_kpi_latest(kpi_df, 'manager_overtime')
+                penalty = st.session_state.get('survey_quality', {}).get('penalty', 0.0)
+                card_table = artifacts.priority_calc.rank_table(
+                    prepare_card_table(config.decision_cards, artifacts.engine, evidence_context, penalty), sens_method)
+
+                current = artifacts.priority_calc.weights # One weight per criterion (built-in + additional)
+                if sens_mode == "Grid":
+                    k = len(current)
+                    weights = weight_grid(min(int(sens_n), grid_steps(k)), current.sum(), k)
+                else:
+                    weights = sample_weights(int(sens_n), current, concentration=20.0 if sens_mode == "Around current" else None, seed=0)
+                # ELECTRE with many criteria is scored per weight vector: keep the run interactive
+                budget = vector_budget(artifacts.priority_calc, sens_method, len(card_table), len(weights))
+                if budget < len(weights):
+                    st.caption(f"{sens_method} with {len(current)} criteria compares all card pairs per weight vector: "
+                               f"using {budget} of {len(weights)} vectors.")
+                    weights = weights[np.linspace(0, len(weights) - 1, budget).astype(int)]
+                steps = max(2, min(200, vector_budget(artifacts.priority_calc, sens_method, len(card_table), 200 * len(current)) // len(current)))
+                sensitivity = WeightSensitivity(artifacts.priority_calc)
+                result = sensitivity.sweep(card_table, weights, sens_method, top_k=int(sens_k))
+                st.markdown(f"**Rank ranges over {len(weights)} weight vectors**")
+                st.dataframe(result.to_frame(), use_container_width=True, hide_index=True)
+                st.markdown("**Critical weight changes** (smallest single-weight change that swaps a card with the next one)")
+                st.dataframe(sensitivity.critical_changes(card_table, sens_method, pairs=50, steps=steps), use_container_width=True, hide_index=True)
+
     else:
         st.warning("No configuration loaded.")
 
@@ -346,7 +471,8 @@ with tab6:
             if st.button("🔄 Fetch/Refresh Models"):
                 with st.spinner("Fetching..."):
                     try:
-                        models = LLMClient.fetch_available_models(selected_provider, api_key)
+                        # Explicit refresh bypasses the cached listing
+                        models = LLMClient.fetch_available_models(selected_provider, api_key, use_cache=False)
                         st.session_state[f"models_{selected_provider}"] = models
                         st.success(f"Fetched {len(models)} models.")
                     except Exception as e:
@@ -355,6 +481,9 @@ with tab6:
         with col_m2:
             # Load models
             models = st.session_state.get(f"models_{selected_provider}", [])
+            if not models:
+                # Last fetched listing from the on-disk cache (no network round trip)
+                models = LLMClient.cached_models(selected_provider, api_key) or []
             if not models:
                 # Defaults
                 if selected_provider=="OpenAI": models=["gpt-4o", "gpt-4-turbo"]
@@ -416,12 +545,14 @@ with tab5:
                     df_d = pd.read_csv(io.StringIO(drivers_txt))
                     new_drivers = DataConverter.csv_to_drivers(df_d)
                     st.session_state.config.drivers = new_drivers
+                    config_changed(st.session_state)
                     st.success(f"Loaded {len(new_drivers)} drivers!")
                 
                 if cards_txt:
                     df_c = pd.read_csv(io.StringIO(cards_txt))
                     new_cards = DataConverter.csv_to_decision_card(df_c)
                     st.session_state.config.decision_cards = new_cards
+                    config_changed(st.session_state)
                     st.success(f"Loaded {len(new_cards)} cards!")
                     
                 st.rerun()
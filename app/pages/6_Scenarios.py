@@ -0,0 +1,103 @@
+import streamlit as st
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from core.sidebar import render_sidebar
+from core.i18n import I18nManager
+from core.perf import begin_page_run, render_performance_panel, span
+from core.priority import PAIRWISE_INTERACTIVE_CELLS
+from core.registry import session_artifacts
+from core.scenario import PERTURBATION_OPS, ScenarioEngine, scenarios_from_frame, scenarios_to_frame
+from core.scoring import get_kpi_latest
+from core.state_manager import StatePersistence
+
+st.set_page_config(page_title="What-If Scenarios", layout="wide")
+render_sidebar()
+begin_page_run("Scenarios")
+st.title(f"🔮 {I18nManager.get('sidebar.scenarios', 'What-If Scenarios')}")
+st.markdown("Perturb the evidence (e.g. a driver drops 0.5 points) and see which cards change status or rank.")
+
+if 'config' not in st.session_state:
+    st.warning("Please configure project first.")
+    st.stop()
+
+config = st.session_state.config
+survey_df = st.session_state.get('survey_data')
+kpi_df = st.session_state.get('kpi_data')
+quality_penalty = st.session_state.get('survey_quality', {}).get('penalty', 0.0)
+method = st.session_state.get("ranking_method", "SAW (Transparent)")
+
+artifacts = session_artifacts(st.session_state, config)
+
+# Same evidence context as the Decision Board
+evidence_context = artifacts.driver_matrix.scores(survey_df)
+if kpi_df is not None:
+    evidence_context['turnover_rate_junior'] = get_kpi_latest(kpi_df, 'turnover_rate_junior')
+    evidence_context['avg_overtime_hours'] = get_kpi_latest(kpi_df, 'avg_overtime_hours')
+    evidence_context['manager_overtime'] = get_kpi_latest(kpi_df, 'manager_overtime')
+
+# 1. Scenario definitions (stored on the config, persisted with it)
+st.subheader("1. Scenarios")
+st.caption("One row per perturbation; rows with the same scenario name form one scenario. "
+           "'add'/'mul' need the variable in the current evidence, 'set' also fills missing evidence.")
+variables = sorted(set(evidence_context) | {d.id for d in config.drivers})
+edited = st.data_editor(
+    scenarios_to_frame(config.scenarios),
+    num_rows="dynamic",
+    use_container_width=True,
+    column_config={
+        "variable": st.column_config.SelectboxColumn("variable", options=variables),
+        "op": st.column_config.SelectboxColumn("op", options=PERTURBATION_OPS, default="add"),
+        "value": st.column_config.NumberColumn("value"),
+    },
+    key="scenario_editor",
+)
+if st.button("💾 Save Scenarios"):
+    try:
+        config.scenarios = scenarios_from_frame(edited)
+        StatePersistence.save(config)
+        st.session_state.pop("scenario_batch", None)
+        st.success(f"Saved {len(config.scenarios)} scenario(s).")
+    except ValueError as e:
+        st.error(f"Invalid scenarios: {e}")
+
+# 2. Run all scenarios in one batch
+st.subheader("2. Results")
+st.caption(f"Ranking method: {method} (change it on the Decision Board). Current evidence: {len(evidence_context)} values.")
+if not config.scenarios:
+    st.info("No scenarios saved yet.")
+else:
+    # Everything the batch depends on: structure (weights, ensemble, criteria, cards, rules),
+    # per-session simulation sliders, scenario definitions, evidence and ranking settings
+    batch_key = (
+        artifacts.config_hash, method, quality_penalty, str(evidence_context), repr(config.scenarios),
+        tuple((c.simulation_impact, c.simulation_urgency) for c in config.decision_cards),
+    )
+    n_cards = len(config.decision_cards)
+    if artifacts.priority_calc.uses_pairwise(method) and n_cards ** 2 * (len(config.scenarios) + 1) > PAIRWISE_INTERACTIVE_CELLS:
+        st.warning(f"{method} compares every pair of the {n_cards} cards once per scenario; "
+                   f"running {len(config.scenarios)} scenario(s) can take a while. PROMETHEE II or TOPSIS scale better.")
+    batch = st.session_state.get("scenario_batch")
+    fresh = batch is not None and st.session_state.get("scenario_batch_key") == batch_key
+    if st.button("▶️ Run Scenarios", type="primary") and not fresh:
+        with span("scenario.batch", scenarios=len(config.scenarios), cards=len(config.decision_cards)):
+            engine = ScenarioEngine(artifacts.engine, artifacts.priority_calc)
+            batch = engine.run(config.decision_cards, evidence_context, config.scenarios, quality_penalty, method)
+        st.session_state.scenario_batch, st.session_state.scenario_batch_key = batch, batch_key
+        fresh = True
+
+    if batch is not None and not fresh:
+        st.info("Inputs changed since the last run; press Run to refresh the results.")
+    elif batch is not None:
+        st.dataframe(batch.summary(), use_container_width=True, hide_index=True)
+
+        selected = st.selectbox("Scenario details", batch.names[1:], key="scenario_selected")
+        only_changed = st.checkbox("Only changed cards", value=True, key="scenario_only_changed")
+        changes = batch.changes(selected, only_changed=only_changed)
+        if changes.empty:
+            st.info("No card changes status or rank in this scenario.")
+        else:
+            st.dataframe(changes, use_container_width=True, hide_index=True)
+
+render_performance_panel()
@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.converter import DataConverter
+from core.rule_format import rules_to_long
+from benchmarks.bench_pipeline import time_stage
+
+# CSV <-> config conversion at catalogue scale.
+# Usage: python benchmarks/bench_converter.py --rows 100000
+# Card rows carry 2 rules each (legacy text, JSON cells or a long rules frame).
+# "row path" is the per-row parser (same work the old iterrows loop did, minus iterrows).
+
+def make_frames(rows: int):
+    cards = {
+        "id": [f"C{i:06d}" for i in range(rows)],
+        "title": [f"Card {i}" for i in range(rows)],
+        "decision_question": [f"Should we act on topic {i}?" for i in range(rows)],
+        "stakeholders": ["HR,Line Managers" if i % 2 else "CEO" for i in range(rows)],
+        "drivers": [f"drv_{i % 50},drv_{(i * 7) % 50}" for i in range(rows)],
+        "kpis": [f"kpi_{i % 20}" for i in range(rows)],
+        "rules": [f"drv_{i % 50} < 2.8:RED:Driver low|kpi_{i % 20} > 0.12:YELLOW:KPI high" for i in range(rows)],
+    }
+    drivers = {
+        "id": [f"drv_{i}" for i in range(rows)],
+        "label": [f"Driver {i}" for i in range(rows)],
+        "survey_items": [f"Q{i}_1,Q{i}_2,Q{i}_3" for i in range(rows)],
+        "range": ["1-5"] * rows,
+    }
+    return pd.DataFrame(cards), pd.DataFrame(drivers)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV <-> config conversion.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--skip-row-path", action="store_true", help="Skip the slow per-row reference")
+    args = parser.parse_args()
+
+    cards_df, drivers_df = make_frames(args.rows)
+    cards = DataConverter.csv_to_decision_card(cards_df)
+    drivers = DataConverter.csv_to_drivers(drivers_df)
+
+    json_df = DataConverter.decision_card_to_csv(cards)
+    long_df = rules_to_long(cards)
+    bare_df = json_df.drop(columns=["rules"])
+
+    stages = {
+        "csv_to_decision_card": lambda: DataConverter.csv_to_decision_card(cards_df),
+        "csv_to_decision_card (json)": lambda: DataConverter.csv_to_decision_card(json_df),
+        "csv_to_decision_card (long)": lambda: DataConverter.csv_to_decision_card(bare_df, rules_df=long_df),
+        "decision_card_to_csv": lambda: DataConverter.decision_card_to_csv(cards),
+        "csv_to_drivers": lambda: DataConverter.csv_to_drivers(drivers_df),
+        "drivers_to_csv": lambda: DataConverter.drivers_to_csv(drivers),
+    }
+    if not args.skip_row_path:
+        records = cards_df.to_dict("records")
+        stages["card_from_row (row path)"] = lambda: [DataConverter.card_from_row(r) for r in records]
+
+    print(f"== {args.rows} rows")
+    for name, fn in stages.items():
+        res = time_stage(fn, args.repeat)
+        print(f"  {name:<30} min {res['min']:8.2f}s  ({res['min'] / args.rows * 1e6:6.1f} us/row)")
+
+    assert DataConverter.csv_to_decision_card(DataConverter.decision_card_to_csv(cards[:1000])) == cards[:1000]
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.io import ConfigLoader
+from core.quality import QualityGateway
+from core.scoring import compute_driver_scores, get_kpi_latest, prepare_candidates, prepare_card_table
+from core.decision import DecisionEngine
+from core.priority import PriorityCalculator
+from core.report import ReportGenerator
+from core.sensitivity import WeightSensitivity, sample_weights
+from core.snapshot import SnapshotManager
+from core.synthetic import SyntheticSurveyGenerator
+from data.models import AppConfig, Wave
+
+# End-to-end benchmark of the evidence -> ranking pipeline, stage by stage.
+# Usage:
+#   python benchmarks/bench_pipeline.py --sizes small,medium --compare
+# Results are appended to benchmarks/results/history.jsonl (one JSON object per run).
+
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), "results", "history.jsonl")
+METHODS = ["SAW", "WASPAS", "TOPSIS", "VIKOR", "PROMETHEE", "ELECTRE", "Composite"]
+
+SIZES = {
+    "tiny":   {"respondents": 200,     "drivers": 3,  "items": 3, "cards": 10,   "kpis": 3,  "months": 6},
+    "small":  {"respondents": 2_000,   "drivers": 5,  "items": 3, "cards": 50,   "kpis": 5,  "months": 12},
+    "medium": {"respondents": 50_000,  "drivers": 20, "items": 4, "cards": 500,  "kpis": 10, "months": 24},
+    "large":  {"respondents": 500_000, "drivers": 50, "items": 5, "cards": 5_000, "kpis": 20, "months": 36},
+}
+
+def make_config_dict(drivers: int, items: int, cards: int, kpis: int, **_) -> Dict[str, Any]:
+    """Synthetic customer config with the requested shape."""
+    driver_ids = [f"drv_{d}" for d in range(drivers)]
+    kpi_ids = [f"kpi_{k}_rate" for k in range(kpis)]
+    return {
+        "version": "bench",
+        "customer_name": "Benchmark",
+        "priority_weights": {"impact": 1.0, "urgency": 1.5, "uncertainty": 1.0},
+        "quality_gates": {"min_n_count": 5, "max_missing_ratio": 0.2},
+        "drivers": [
+            {"id": d_id, "label": f"Driver {d}", "survey_items": [f"Q{d}_{i}" for i in range(items)], "range": [1, 5]}
+            for d, d_id in enumerate(driver_ids)
+        ],
+        "decision_cards": [
+            {
+                "id": f"C{c:05d}",
+                "title": f"Card {c}",
+                "decision_question": f"Should we act on topic {c}?",
+                "stakeholders": ["HR", "Line Managers"],
+                "required_evidence": {
+                    "drivers": [driver_ids[c % drivers], driver_ids[(c * 7 + 1) % drivers]],
+                    "kpis": [kpi_ids[c % kpis]]
+                },
+                "rules": [
+                    {"condition": f"{driver_ids[c % drivers]} < 2.8", "status": "RED", "message": "Driver low"},
+                    {"condition": f"{kpi_ids[c % kpis]} > 0.12", "status": "YELLOW", "message": "KPI high"},
+                ],
+                "recommendation_templates": [
+                    {"id": f"R{c}", "action": "Review", "risks": "Load", "success_metrics": "Score", "preconditions": "Time"}
+                ]
+            }
+            for c in range(cards)
+        ]
+    }
+
+def time_stage(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"min": min(samples), "median": statistics.median(samples), "repeat": repeat}
+
+def run_size(params: Dict[str, int], repeat: int = 3, workdir: str = None) -> Dict[str, Dict[str, float]]:
+    workdir = workdir or tempfile.mkdtemp(prefix="ebda_bench_")
+    results = {}
+
+    # Setup (not timed): config file + synthetic evidence
+    config_path = os.path.join(workdir, "config.yaml")
+    with open(config_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(make_config_dict(**params), f, sort_keys=False)
+    config = ConfigLoader(config_path, use_cache=False).load_config()
+    gen = SyntheticSurveyGenerator(config, seed=0, segments={"Department": ["A", "B", "C"]})
+    survey_df = gen.survey_chunk(0, params["respondents"])
+    kpi_df = gen.kpi_series(months=params["months"])
+
+    cache_dir = os.path.join(workdir, "config_cache")
+    results["load_config_uncached"] = time_stage(lambda: ConfigLoader(config_path, use_cache=False).load_config(), repeat)
+    ConfigLoader(config_path, cache_dir=cache_dir).load_config() # Warm the binary cache
+    results["load_config"] = time_stage(lambda: ConfigLoader(config_path, cache_dir=cache_dir).load_config(), repeat)
+
+    gateway = QualityGateway(config.quality_gates)
+    def quality():
+        gateway.check_survey_data(survey_df)
+        gateway.check_cronbach_alpha(survey_df, config.drivers)
+    results["quality_gate"] = time_stage(quality, repeat)
+
+    results["driver_scores"] = time_stage(lambda: compute_driver_scores(survey_df, config.drivers), repeat)
+
+    context = compute_driver_scores(survey_df, config.drivers)
+    for k in gen.kpi_names():
+        context[k] = get_kpi_latest(kpi_df, k)
+
+    engine = DecisionEngine()
+    results["evaluate_cards"] = time_stage(lambda: [engine.evaluate_card(c, context) for c in config.decision_cards], repeat)
+
+    results["prepare_candidates"] = time_stage(lambda: prepare_candidates(config.decision_cards, engine, context, 0.1), repeat)
+
+    # Ranking only (clamping/sorting in rank_candidates is idempotent, so candidates are reused)
+    calc = PriorityCalculator(config.priority_weights)
+    candidates = prepare_candidates(config.decision_cards, engine, context, 0.1)
+    for method in METHODS:
+        results[f"rank_{method}"] = time_stage(lambda method=method: calc.rank_candidates(list(candidates), method=method), repeat)
+
+    results["prepare_card_table"] = time_stage(lambda: prepare_card_table(config.decision_cards, engine, context, 0.1), repeat)
+    table = prepare_card_table(config.decision_cards, engine, context, 0.1)
+    for method in METHODS:
+        results[f"rank_table_{method}"] = time_stage(lambda method=method: calc.rank_table(table, method=method), repeat)
+    # Board / report: only the top cards are ordered (CardTable.head / rank_of for the rest)
+    results["rank_candidates_top100"] = time_stage(lambda: calc.rank_candidates(list(candidates), method="SAW", top_k=100), repeat)
+    results["rank_table_top100"] = time_stage(lambda: calc.rank_table(table, method="SAW", top_k=100), repeat)
+
+    # Weight sensitivity: 1000 sampled weight vectors
+    sensitivity = WeightSensitivity(calc)
+    weights = sample_weights(1000, config.priority_weights, seed=0)
+    for method in ("SAW", "Composite"):
+        calc.rank_table(table, method=method)
+        results[f"sensitivity_{method}"] = time_stage(lambda method=method: sensitivity.sweep(table, weights, method), repeat)
+
+    ranked = calc.rank_candidates(list(candidates), method="SAW")
+    states = []
+    for item in ranked:
+        item["_state"].total_priority = item["score"]
+        states.append((item["_card"], item["_state"], item.get("_details", {})))
+
+    report = ReportGenerator(config)
+    results["generate_docx"] = time_stage(lambda: report.generate_docx({"status": "DRAFT"}, states, "BENCH"), repeat)
+
+    snapshots = SnapshotManager(os.path.join(workdir, "snapshots"))
+    wave = Wave(id="BENCH", name="bench", cards={s.card_id: s for _, s, _ in states})
+    results["snapshot_freeze"] = time_stage(lambda: snapshots.freeze(wave, "bench"), repeat)
+
+    return results
+
+def card_memory(params: Dict[str, int]) -> Dict[str, float]:
+    """Bytes per card retained by a ranked rerun: candidate dicts (+ states) vs CardTable."""
+    config = AppConfig(**make_config_dict(**params))
+    context = {d.id: 3.0 for d in config.drivers}
+    context.update({k: 0.1 for c in config.decision_cards for k in c.required_evidence["kpis"]})
+    engine, calc = DecisionEngine(), PriorityCalculator(config.priority_weights)
+    engine.compile_rules(config.decision_cards)
+
+    def retained(build: Callable[[], Any]) -> float:
+        tracemalloc.start()
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        return size / len(config.decision_cards)
+
+    return {
+        "candidates": retained(lambda: calc.rank_candidates(prepare_candidates(config.decision_cards, engine, context, 0.1), "SAW")),
+        "card_table": retained(lambda: calc.rank_table(prepare_card_table(config.decision_cards, engine, context, 0.1), "SAW")),
+    }
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+def load_history(path: str = HISTORY_FILE) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def append_history(entry: Dict[str, Any], path: str = HISTORY_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+def compare(entry: Dict[str, Any], history: List[Dict[str, Any]], threshold: float = 1.2) -> List[str]:
+    """Lines comparing entry to the latest earlier run of the same size; flags slowdowns > threshold."""
+    lines = []
+    for size, stages in entry["results"].items():
+        previous = next((h for h in reversed(history)
+                         if size in h.get("results", {}) and h.get("sizes", {}).get(size) == entry["sizes"][size]), None)
+        if previous is None:
+            continue
+        for stage, res in stages.items():
+            old = previous["results"][size].get(stage)
+            if not old or not old["min"]:
+                continue
+            ratio = res["min"] / old["min"]
+            flag = "  REGRESSION" if ratio > threshold else ""
+            lines.append(f"{size:<7} {stage:<18} {old['min']*1e3:10.2f}ms -> {res['min']*1e3:10.2f}ms  x{ratio:.2f} (vs {previous['commit']}){flag}")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the evidence -> ranking pipeline.")
+    parser.add_argument("--sizes", default="small", help=f"Comma-separated presets: {', '.join(SIZES)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="Compare with the previous run of each size")
+    parser.add_argument("--memory", action="store_true", help="Also report retained bytes per card (candidates vs CardTable)")
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    entry = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "sizes": {s: SIZES[s] for s in sizes},
+        "results": {}
+    }
+    for size in sizes:
+        print(f"== {size}: {SIZES[size]}")
+        entry["results"][size] = run_size(SIZES[size], repeat=args.repeat)
+        for stage, res in entry["results"][size].items():
+            print(f"  {stage:<18} min {res['min']*1e3:10.2f}ms  median {res['median']*1e3:10.2f}ms")
+        if args.memory:
+            for path, per_card in card_memory(SIZES[size]).items():
+                print(f"  memory/{path:<11} {per_card:10.0f} bytes/card")
+
+    if args.compare:
+        for line in compare(entry, load_history(args.history)):
+            print(line)
+    if not args.no_save:
+        append_history(entry, args.history)
+        print(f"Saved to {args.history}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,136 @@
 from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterator
 import os
 import json
+import threading
+from itertools import islice
 
 AUDIT_FILE = "audit_trail.log"
+INDEX_SUFFIX = ".idx"
+
+# Fields with an exact-match index in the sidecar file
+INDEXED_FIELDS = ("card_id", "user", "snapshot_id")
+# Rewrite the sidecar once this many log bytes are unsaved; the unsaved tail is
+# re-indexed by catch_up on the next load, so appends stay constant time
+CHECKPOINT_BYTES = 1 << 20
+
+class AuditIndex:
+    """
+    Sidecar index for the audit trail (JSON, next to the log file).
+    Maps card_id / user / snapshot_id / day bucket -> byte offsets of log lines,
+    so queries can seek straight to matching entries.
+    """
+    def __init__(self, log_file: str):
+        self.log_file = log_file
+        self.index_file = log_file + INDEX_SUFFIX
+        self.indexed_size = 0 # Bytes of the log already covered by the index
+        self.saved_size = 0 # Bytes covered by the sidecar on disk
+        self.fields: Dict[str, Dict[str, List[int]]] = {f: {} for f in INDEXED_FIELDS}
+        self.buckets: Dict[str, List[int]] = {} # "YYYY-MM-DD" -> offsets
+        self._load()
+
+    @staticmethod
+    def bucket_of(timestamp: str) -> str:
+        # ISO timestamps sort lexically, the date prefix is the day bucket
+        return timestamp[:10]
+
+    def _load(self):
+        if not os.path.exists(self.index_file):
+            return
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.indexed_size = self.saved_size = data.get("indexed_size", 0)
+            for field in INDEXED_FIELDS:
+                self.fields[field] = data.get("fields", {}).get(field, {})
+            self.buckets = data.get("buckets", {})
+        except Exception as e:
+            # Corrupt sidecar: rebuild from the log on next catch_up
+            print(f"Audit index unreadable, rebuilding: {e}")
+            self.reset()
+
+    def reset(self):
+        self.indexed_size = self.saved_size = 0
+        self.fields = {f: {} for f in INDEXED_FIELDS}
+        self.buckets = {}
+
+    def save(self):
+        data = {
+            "indexed_size": self.indexed_size,
+            "fields": self.fields,
+            "buckets": self.buckets
+        }
+        tmp_path = self.index_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.index_file)
+        self.saved_size = self.indexed_size
+
+    def checkpoint(self, force: bool = False):
+        """Save the sidecar if enough of the log is unsaved (or any of it, with force)."""
+        unsaved = self.indexed_size - self.saved_size
+        if unsaved and (force or unsaved >= CHECKPOINT_BYTES):
+            self.save()
+
+    def add(self, offset: int, entry: Dict[str, Any]):
+        for field in INDEXED_FIELDS:
+            value = entry.get(field)
+            if value is not None:
+                self.fields[field].setdefault(str(value), []).append(offset)
+        ts = entry.get("timestamp")
+        if ts:
+            self.buckets.setdefault(self.bucket_of(ts), []).append(offset)
+
+    def catch_up(self) -> bool:
+        """
+        Index lines appended since the last save (e.g. by another process).
+        Returns True if the index changed.
+        """
+        if not os.path.exists(self.log_file):
+            return False
+        size = os.path.getsize(self.log_file)
+        if size < self.indexed_size:
+            # Log was truncated/replaced -> full rebuild
+            self.reset()
+        if size == self.indexed_size:
+            return False
+
+        with open(self.log_file, "rb") as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break # Partial line still being written
+                try:
+                    self.add(offset, json.loads(raw))
+                except ValueError:
+                    pass # Skip garbage lines, keep offsets consistent
+                offset += len(raw)
+        self.indexed_size = offset
+        return True
+
+    def candidate_offsets(self, since: Optional[str] = None, until: Optional[str] = None, **filters) -> Optional[List[int]]:
+        """
+        Intersect offset lists for the given filters.
+        Returns None when no indexed filter applies (caller must scan everything).
+        """
+        result = None
+        for field, value in filters.items():
+            if value is None:
+                continue
+            offsets = set(self.fields.get(field, {}).get(str(value), []))
+            result = offsets if result is None else result & offsets
+
+        if since or until:
+            lo = self.bucket_of(since) if since else ""
+            hi = self.bucket_of(until) if until else "9999-12-31"
+            offsets = set()
+            for bucket, offs in self.buckets.items():
+                if lo <= bucket <= hi:
+                    offsets.update(offs)
+            result = offsets if result is None else result & offsets
+
+        return sorted(result) if result is not None else None
 
 class AuditLogger:
     def __init__(self, output_file: str = AUDIT_FILE):
@@ -11,6 +139,12 @@ class AuditLogger:
         if not os.path.exists(output_file):
             with open(output_file, 'w') as f:
                 pass
+        self.index = AuditIndex(output_file)
+        # Persist the tail left unsaved by earlier writers once per open
+        if self.index.catch_up():
+            self.index.checkpoint(force=True)
+        # One logger may be shared by all sessions (see core.registry)
+        self._lock = threading.RLock()
 
     def log_action(self, card_id: str, snapshot_id: str, action: str, reason: str, user_target: str = "Unknown"):
         timestamp = datetime.now()
@@ -22,6 +156,72 @@ class AuditLogger:
             "reason": reason,
             "user": user_target
         }
-        
-        with open(self.output_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(entry) + "\n")
+
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._lock:
+            # Index anything appended by others first, so our offset is exact
+            self.index.catch_up()
+            with open(self.output_file, 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+            self.index.add(offset, entry)
+            self.index.indexed_size = offset + len(line)
+            self.index.checkpoint()
+
+    def query(
+        self,
+        card_id: str = None,
+        user: str = None,
+        snapshot_id: str = None,
+        action: str = None,
+        since: datetime = None,
+        until: datetime = None,
+        newest_first: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream audit entries matching all given filters, in log order (or reversed).
+        Indexed filters (card_id, user, snapshot_id, time range) seek directly
+        to matching lines; 'action' and exact time bounds are checked per entry.
+        """
+        since_s = since.isoformat() if since else None
+        until_s = until.isoformat() if until else None
+        with self._lock:
+            if self.index.catch_up():
+                self.index.checkpoint()
+            offsets = self.index.candidate_offsets(
+                since=since_s, until=until_s,
+                card_id=card_id, user=user, snapshot_id=snapshot_id
+            )
+
+        def matches(entry: Dict[str, Any]) -> bool:
+            if action is not None and entry.get("action") != action:
+                return False
+            ts = entry.get("timestamp", "")
+            if since_s and ts < since_s: return False
+            if until_s and ts > until_s: return False
+            return True
+
+        with open(self.output_file, "rb") as f:
+            if offsets is None:
+                # No indexed filter -> sequential stream
+                for raw in (reversed(f.readlines()) if newest_first else f):
+                    try:
+                        entry = json.loads(raw)
+                    except ValueError:
+                        continue
+                    if matches(entry):
+                        yield entry
+                return
+
+            for offset in (reversed(offsets) if newest_first else offsets):
+                f.seek(offset)
+                try:
+                    entry = json.loads(f.readline())
+                except ValueError:
+                    continue
+                if matches(entry):
+                    yield entry
+
+    def card_history(self, card_id: str, limit: int = None) -> List[Dict[str, Any]]:
+        """Most recent first."""
+        return list(islice(self.query(card_id=card_id, newest_first=True), limit or None))
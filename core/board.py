@@ -0,0 +1,66 @@
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from core.card_table import STATUS_CODES, STATUS_INDEX
+from data.models import CardStatus
+
+# Decision Board list helpers: filtering + pagination over a ranked CardTable
+# (filter on columns, materialize only the visible page).
+
+STATUS_ORDER = ["RED", "YELLOW", "GREEN", "UNKNOWN"]
+
+def stakeholder_options(cards: List[Any]) -> List[str]:
+    return sorted({s for card in cards for s in card.stakeholders})
+
+BOARD_TOP_K = 100 # Rows ordered up front by the board; later pages extend it (CardTable.head)
+
+def filter_mask(
+    table: Any,
+    statuses: Optional[Sequence[str]] = None,
+    stakeholders: Optional[Sequence[str]] = None,
+    min_score: Optional[float] = None,
+    query: str = ""
+) -> np.ndarray:
+    """
+    Boolean mask of matching rows; needs no ranking order. Empty/None filters match everything;
+    stakeholders match any shared one, query is a case-insensitive substring of title or id.
+    """
+    keep = np.ones(len(table), dtype=bool)
+    if statuses:
+        codes = [STATUS_INDEX[CardStatus(s)] for s in statuses if s in CardStatus.__members__]
+        keep &= np.isin(table.status, codes)
+    if min_score is not None:
+        keep &= table.score >= min_score
+    # Text/stakeholder filters need the card objects: only check rows still in play
+    stakeholders = set(stakeholders) if stakeholders else None
+    query = query.strip().lower()
+    if stakeholders is not None or query:
+        for i in np.flatnonzero(keep).tolist():
+            card = table.cards[i]
+            if stakeholders is not None and not stakeholders.intersection(card.stakeholders):
+                keep[i] = False
+            elif query and query not in card.title.lower() and query not in card.id.lower():
+                keep[i] = False
+    return keep
+
+def paginate_table(table: Any, keep: np.ndarray, page: int, page_size: int) -> Tuple[np.ndarray, int, int, int]:
+    """
+    One page of the rows in `keep` (filter_mask) in ranking order, ordering only as far as the
+    requested page (CardTable.head). Returns (page rows, clamped page (1-based), page count, matching rows).
+    """
+    total = int(np.count_nonzero(keep))
+    page_size = max(1, int(page_size))
+    pages = max(1, math.ceil(total / page_size))
+    page = min(max(1, int(page)), pages)
+    start, stop = (page - 1) * page_size, min(page * page_size, total)
+    m = stop
+    while True:
+        head = table.head(m)
+        hits = head[keep[head]]
+        if len(hits) >= stop or len(head) == len(table):
+            return hits[start:stop], page, pages, total
+        m = min(len(table), 2 * m)
+
+def table_status_counts(table: Any) -> Dict[str, int]:
+    counts = np.bincount(table.status, minlength=len(STATUS_CODES))
+    return {STATUS_CODES[code].value: int(n) for code, n in enumerate(counts.tolist()) if n}
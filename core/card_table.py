@@ -0,0 +1,147 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from data.models import CardStatus, DecisionCardConfig, DecisionCardState
+
+# Columnar runtime representation of the evaluated/ranked cards (struct of arrays).
+# One row per config card (same order as config.decision_cards); the pydantic
+# DecisionCardState and the score details are only materialized for rows that are
+# displayed or exported (state(), rows()).
+
+STATUS_CODES = [CardStatus.GREEN, CardStatus.YELLOW, CardStatus.RED, CardStatus.UNKNOWN]
+STATUS_INDEX = {s: i for i, s in enumerate(STATUS_CODES)}
+
+def top_order(score: np.ndarray, k: int) -> np.ndarray:
+    """
+    Row indices of the k best scores, best first: np.argsort(-score, kind="stable")[:k]
+    (ties in row order) in O(n + k log k). argpartition finds the k-th best score; rows
+    above it plus the first tied rows are the top k, and only those are sorted.
+    """
+    n = len(score)
+    if k >= n:
+        return np.argsort(-score, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    kth = score[np.argpartition(-score, k - 1)[:k]].min()
+    above = np.flatnonzero(score > kth)
+    tied = np.flatnonzero(score == kth)[:k - len(above)]
+    rows = np.sort(np.concatenate([above, tied]))
+    return rows[np.argsort(-score[rows], kind="stable")]
+
+class CardTable:
+    __slots__ = ("cards", "ids", "status", "matched_rule", "impact", "urgency", "uncertainty",
+                 "score", "method", "aux", "context", "_engine", "_calc", "_ranks", "_order", "_top")
+
+    def __init__(self, cards: List[DecisionCardConfig], status: np.ndarray, matched_rule: np.ndarray,
+                 impact: np.ndarray, urgency: np.ndarray, uncertainty: np.ndarray,
+                 context: Dict[str, float] = None, engine: Any = None):
+        self.cards = cards # Config objects (shared, not copied)
+        self.ids = [c.id for c in cards]
+        self.status = status # int8 codes into STATUS_CODES
+        self.matched_rule = matched_rule # int16 rule index, or DecisionEngine.NO_MATCH / MISSING_EVIDENCE
+        self.impact = impact
+        self.urgency = urgency
+        self.uncertainty = uncertainty
+        self.score = np.zeros(len(cards))
+        self.method: Optional[str] = None
+        self.aux: Dict[str, np.ndarray] = {} # Per-method extras (TOPSIS distances, composite ranks)
+        self.context = context or {}
+        self._engine = engine
+        self._calc = None
+        self._ranks = None
+        self._order = np.arange(len(cards)) # Row indices, best first (set by PriorityCalculator.rank_table)
+        self._top = None # Best-first prefix of the order when only the top k were ranked
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def set_ranking(self, score: np.ndarray, method: str, aux: Dict[str, np.ndarray], calc: Any, top_k: Optional[int] = None):
+        """top_k: only order the k best rows now; the rest is ordered when first needed (order / head / ranks)."""
+        self.score = score
+        self.method = method
+        self.aux = aux
+        self._calc = calc
+        self._ranks = None
+        # Stable descending sort (same tie order as list.sort(reverse=True))
+        if top_k is None or top_k >= len(score):
+            self._order, self._top = np.argsort(-score, kind="stable"), None
+        else:
+            self._order, self._top = None, top_order(score, top_k)
+
+    @property
+    def order(self) -> np.ndarray:
+        """Row indices of all rows, best first (sorted on first use after a top-k ranking)."""
+        if self._order is None:
+            self._order = np.argsort(-self.score, kind="stable")
+            self._top = None
+        return self._order
+
+    @property
+    def ranked(self) -> int:
+        """Number of leading rows whose order is known without sorting the rest."""
+        return len(self._order) if self._order is not None else len(self._top)
+
+    def head(self, m: int) -> np.ndarray:
+        """First m row indices in ranking order; extends a top-k ranking (doubling) when m is past it."""
+        m = max(0, min(int(m), len(self)))
+        if m > self.ranked:
+            k = max(m, 2 * self.ranked)
+            if k >= len(self) // 2: # Most of the table: a full sort is cheaper than selecting
+                return self.order[:m]
+            self._top = top_order(self.score, k)
+        return (self._order if self._order is not None else self._top)[:m]
+
+    @property
+    def ranks(self) -> np.ndarray:
+        """0-based rank of each row (inverse of order), computed on first use."""
+        if self._ranks is None:
+            self._ranks = np.empty(len(self), dtype=np.int64)
+            self._ranks[self.order] = np.arange(len(self))
+        return self._ranks
+
+    def rank_of(self, i: int) -> int:
+        """0-based rank of one row without ordering the whole table (rows scoring higher + earlier ties)."""
+        if self._ranks is not None:
+            return int(self._ranks[i])
+        if self._order is None:
+            hit = np.flatnonzero(self._top == i)
+            if len(hit):
+                return int(hit[0])
+        s = self.score[i]
+        return int(np.count_nonzero(self.score > s) + np.count_nonzero(self.score[:i] == s))
+
+    def status_of(self, i: int) -> CardStatus:
+        return STATUS_CODES[self.status[i]]
+
+    def status_map(self) -> Dict[str, str]:
+        return {cid: STATUS_CODES[code].value for cid, code in zip(self.ids, self.status.tolist())}
+
+    def score_map(self) -> Dict[str, float]:
+        return dict(zip(self.ids, self.score.tolist()))
+
+    def nbytes(self) -> int:
+        """Array payload (ids/cards lists are shared with the config)."""
+        arrays = [self.status, self.matched_rule, self.impact, self.urgency, self.uncertainty, self.score]
+        arrays += [a for a in (self._order, self._top) if a is not None]
+        return sum(a.nbytes for a in arrays) + sum(a.nbytes for a in self.aux.values())
+
+    # --- Materialization (displayed / exported rows only) ---
+
+    def state(self, i: int) -> DecisionCardState:
+        card = self.cards[i]
+        state = self._engine.build_state(card, self.status_of(i), int(self.matched_rule[i]), self.context)
+        state.total_priority = float(self.score[i])
+        state.confidence_penalty = float(self.uncertainty[i])
+        return state
+
+    def details(self, i: int) -> Dict[str, Any]:
+        """score_res as rank_candidates' '_details' (+ 'score')."""
+        res = self._calc.score_details(self, i) if self._calc is not None else {}
+        res["score"] = float(self.score[i])
+        return res
+
+    def rows(self, indices: Sequence[int]) -> List[Tuple[DecisionCardConfig, DecisionCardState, Dict[str, Any], float, float]]:
+        """(card, state, score_res, impact, urgency) tuples, as the board used to build for every card."""
+        return [
+            (self.cards[i], self.state(i), self.details(i), float(self.impact[i]), float(self.urgency[i]))
+            for i in (int(i) for i in indices)
+        ]
@@ -1,104 +1,246 @@
 import pandas as pd
+import csv
 import json
 import yaml
-from typing import List, Dict, Any, Union
-from data.models import DecisionCardConfig, DriverConfig, RuleConfig, CardStatus
+from typing import List, Dict, Any, Optional, Tuple, Union
+from pydantic import TypeAdapter
+from data.models import DecisionCardConfig, DriverConfig, RecommendationTemplate
+from core.rule_format import (
+    group_by_row, parse_rule_column, parse_rules_cell, rules_from_long, rules_to_json, rules_to_legacy
+)
+
+_TEMPLATES_ADAPTER = TypeAdapter(List[RecommendationTemplate])
+_CRITERIA_ADAPTER = TypeAdapter(Dict[str, float])
+
+def _text_column(df: pd.DataFrame, name: str, default: str = "") -> pd.Series:
+    """Column as str with missing cells (or a missing column) as default."""
+    if name not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    col = df[name]
+    return col.where(col.notna(), default).astype(str)
+
+def _split_list(col: pd.Series, sep: str = ",", regex: bool = False) -> List[List[str]]:
+    """'a, b,,c' -> ['a', 'b', 'c'] per row, vectorized via split/explode (col must have a RangeIndex)."""
+    parts = col.str.split(sep, regex=regex).explode().str.strip()
+    parts = parts[parts.notna() & (parts != "")]
+    return group_by_row(parts.tolist(), parts.index.to_numpy(), len(col))
 
 class DataConverter:
+    # Columnar conversion: string fields are split with vectorized pandas ops and
+    # models are bulk-built with model_construct (values are already typed/checked
+    # column-wise, so per-row pydantic validation is skipped).
+
     @staticmethod
-    def csv_to_decision_card(df: pd.DataFrame) -> List[DecisionCardConfig]:
+    def csv_to_decision_card(df: pd.DataFrame, rules_df: pd.DataFrame = None, rules_format: str = "auto") -> List[DecisionCardConfig]:
         """
         Converts a CSV with columns:
-        [id, title, decision_question, drivers (comma-sep), kpis (comma-sep), rule_condition, rule_status, stakeholders]
+        [id, title, decision_question, stakeholders (comma-sep), drivers (comma-sep), kpis (comma-sep), rules]
+        rules: JSON array or legacy 'condition:STATUS[:message] | ...' per cell (see core.rule_format).
+        rules_df: long-format rules CSV; replaces the rules column when given.
+        Optional 'recommendation_templates' and 'criteria_values' columns hold those fields as JSON.
+        Raises RuleFormatError listing every invalid rule.
         """
-        # Group by ID since rules might span rows?
-        # Assuming one row per card for simplicity in MVP, but rules are tricky.
-        # Let's assume each row is a separate card, and rules are a JSON string or simpler.
-        
-        cards = []
-        for _, row in df.iterrows():
-            # Parse required evidence
-            drivers = [x.strip() for x in str(row.get('drivers', '')).split(',') if x.strip()]
-            kpis = [x.strip() for x in str(row.get('kpis', '')).split(',') if x.strip()]
-            
-            # Simple rule parsing: condition1:status1|condition2:status2
-            rules_raw = str(row.get('rules', ''))
-            rules_list = []
-            if rules_raw:
-                for rule_segment in rules_raw.split('|'):
-                    parts = rule_segment.split(':', 2)
-                    if len(parts) >= 2:
-                        cond = parts[0].strip()
-                        stat = parts[1].strip()
-                        msg = parts[2].strip() if len(parts) > 2 else f"Rule triggered: {cond}"
-                        rules_list.append(RuleConfig(
-                            condition=cond,
-                            status=CardStatus(stat.upper()) if stat.upper() in CardStatus.__members__ else CardStatus.UNKNOWN,
-                            message=msg
-                        ))
-            
-            stakeholders = [x.strip() for x in str(row.get('stakeholders', '')).split(',') if x.strip()]
-            
-            card = DecisionCardConfig(
-                id=str(row['id']),
-                title=str(row['title']),
-                decision_question=str(row['decision_question']),
-                stakeholders=stakeholders,
-                required_evidence={"drivers": drivers, "kpis": kpis},
-                rules=rules_list,
-                recommendation_templates=[]
+        if df.empty:
+            return []
+        df = df.reset_index(drop=True)
+        ids = df['id'].astype(str).tolist()
+        titles = df['title'].astype(str).tolist()
+        questions = df['decision_question'].astype(str).tolist()
+
+        drivers = _split_list(_text_column(df, 'drivers'))
+        kpis = _split_list(_text_column(df, 'kpis'))
+        stakeholders = _split_list(_text_column(df, 'stakeholders'))
+
+        if rules_df is not None:
+            rules_by_row = rules_from_long(rules_df, ids)
+        else:
+            rules_by_row = parse_rule_column(_text_column(df, 'rules'), ids, rules_format)
+
+        # Optional lossless columns (one batch validation for the nested templates)
+        templates: List[List[RecommendationTemplate]] = [[] for _ in range(len(df))]
+        if 'recommendation_templates' in df.columns:
+            raw = _text_column(df, 'recommendation_templates')
+            for i, text in enumerate(raw):
+                if text.strip():
+                    templates[i] = _TEMPLATES_ADAPTER.validate_json(text)
+        criteria: List[Dict[str, float]] = [{} for _ in range(len(df))]
+        if 'criteria_values' in df.columns:
+            raw = _text_column(df, 'criteria_values')
+            for i, text in enumerate(raw):
+                if text.strip():
+                    criteria[i] = _CRITERIA_ADAPTER.validate_json(text)
+
+        return [
+            DecisionCardConfig.model_construct(
+                id=ids[i],
+                title=titles[i],
+                decision_question=questions[i],
+                stakeholders=stakeholders[i],
+                required_evidence={"drivers": drivers[i], "kpis": kpis[i]},
+                rules=rules_by_row[i],
+                recommendation_templates=templates[i],
+                criteria_values=criteria[i],
+                simulation_impact=None,
+                simulation_urgency=None,
+                manual_override_reason=None,
+                manual_override_status=None
             )
-            cards.append(card)
-        return cards
+            for i in range(len(df))
+        ]
 
     @staticmethod
-    def decision_card_to_csv(cards: List[DecisionCardConfig]) -> pd.DataFrame:
-        data = []
-        for card in cards:
-            # Flatten rules
-            rules_str = "|".join([f"{r.condition}:{r.status.value}:{r.message}" for r in card.rules])
-            drivers_str = ",".join(card.required_evidence.get('drivers', []))
-            kpis_str = ",".join(card.required_evidence.get('kpis', []))
-            stakeholders_str = ",".join(card.stakeholders)
-            
-            data.append({
-                "id": card.id,
-                "title": card.title,
-                "decision_question": card.decision_question,
-                "stakeholders": stakeholders_str,
-                "drivers": drivers_str,
-                "kpis": kpis_str,
-                "rules": rules_str
-            })
-        return pd.DataFrame(data)
+    def decision_card_to_csv(cards: List[DecisionCardConfig], include_templates: bool = False, rules_format: str = "json") -> pd.DataFrame:
+        """
+        rules_format: 'json' (lossless) or 'legacy' (conditions must not contain ':').
+        include_templates: also write the lossless 'recommendation_templates' and 'criteria_values' columns.
+        """
+        write_rules = rules_to_legacy if rules_format == "legacy" else rules_to_json
+        columns = {
+            "id": [c.id for c in cards],
+            "title": [c.title for c in cards],
+            "decision_question": [c.decision_question for c in cards],
+            "stakeholders": [",".join(c.stakeholders) for c in cards],
+            "drivers": [",".join(c.required_evidence.get('drivers', [])) for c in cards],
+            "kpis": [",".join(c.required_evidence.get('kpis', [])) for c in cards],
+            "rules": [write_rules(c.rules) for c in cards],
+        }
+        if include_templates:
+            columns["recommendation_templates"] = [
+                _TEMPLATES_ADAPTER.dump_json(c.recommendation_templates).decode("utf-8") if c.recommendation_templates else ""
+                for c in cards
+            ]
+            columns["criteria_values"] = [json.dumps(c.criteria_values) if c.criteria_values else "" for c in cards]
+        return pd.DataFrame(columns)
 
     @staticmethod
     def drivers_to_csv(drivers: List[DriverConfig]) -> pd.DataFrame:
-        data = []
-        for d in drivers:
-            items_str = ",".join(d.survey_items)
-            range_str = f"{d.range[0]}-{d.range[1]}"
-            data.append({
-                "id": d.id,
-                "label": d.label,
-                "survey_items": items_str,
-                "range": range_str
-            })
-        return pd.DataFrame(data)
+        return pd.DataFrame({
+            "id": [d.id for d in drivers],
+            "label": [d.label for d in drivers],
+            "survey_items": [",".join(d.survey_items) for d in drivers],
+            "range": [f"{d.range[0]}-{d.range[1]}" for d in drivers],
+        })
 
     @staticmethod
     def csv_to_drivers(df: pd.DataFrame) -> List[DriverConfig]:
-        drivers = []
-        for _, row in df.iterrows():
-            items = [x.strip() for x in str(row.get('survey_items', '')).split(',') if x.strip()]
-            range_raw = str(row.get('range', '1-5')).split('-')
-            range_val = [float(range_raw[0]), float(range_raw[1])] if len(range_raw) == 2 else [1.0, 5.0]
-            
-            driver = DriverConfig(
-                id=str(row['id']),
-                label=str(row['label']),
-                survey_items=items,
-                range=range_val
-            )
-            drivers.append(driver)
-        return drivers
+        if df.empty:
+            return []
+        df = df.reset_index(drop=True)
+        ids = df['id'].astype(str).tolist()
+        labels = df['label'].astype(str).tolist()
+        items = _split_list(_text_column(df, 'survey_items'))
+
+        # 'lo-hi' -> [lo, hi]; anything else -> [1.0, 5.0]; non-numeric bounds raise
+        range_parts = _text_column(df, 'range', '1-5').str.split('-')
+        two = range_parts.str.len() == 2
+        lo = pd.Series(1.0, index=df.index)
+        hi = pd.Series(5.0, index=df.index)
+        lo[two] = pd.to_numeric(range_parts[two].str[0].str.strip(), errors='raise').astype(float)
+        hi[two] = pd.to_numeric(range_parts[two].str[1].str.strip(), errors='raise').astype(float)
+
+        lo, hi = lo.tolist(), hi.tolist()
+        return [
+            DriverConfig.model_construct(id=ids[i], label=labels[i], survey_items=items[i], range=[lo[i], hi[i]])
+            for i in range(len(df))
+        ]
+
+    # --- Single-row path (streamed rows: no DataFrame overhead) ---
+
+    @staticmethod
+    def _cell(row: Dict[str, Any], name: str, default: str = "") -> str:
+        value = row.get(name)
+        return default if value is None or (isinstance(value, float) and value != value) else str(value)
+
+    @staticmethod
+    def _cell_list(row: Dict[str, Any], name: str) -> List[str]:
+        return [x.strip() for x in DataConverter._cell(row, name).split(',') if x.strip()]
+
+    @staticmethod
+    def driver_from_row(row: Dict[str, Any]) -> DriverConfig:
+        """Same result as csv_to_drivers for a one-row frame."""
+        range_raw = DataConverter._cell(row, 'range', '1-5').split('-')
+        range_val = [float(range_raw[0]), float(range_raw[1])] if len(range_raw) == 2 else [1.0, 5.0]
+        return DriverConfig(
+            id=str(row['id']),
+            label=str(row['label']),
+            survey_items=DataConverter._cell_list(row, 'survey_items'),
+            range=range_val
+        )
+
+    @staticmethod
+    def card_from_row(row: Dict[str, Any]) -> DecisionCardConfig:
+        """Same result as csv_to_decision_card for a one-row frame (without templates)."""
+        return DecisionCardConfig(
+            id=str(row['id']),
+            title=str(row['title']),
+            decision_question=str(row['decision_question']),
+            stakeholders=DataConverter._cell_list(row, 'stakeholders'),
+            required_evidence={"drivers": DataConverter._cell_list(row, 'drivers'), "kpis": DataConverter._cell_list(row, 'kpis')},
+            rules=parse_rules_cell(DataConverter._cell(row, 'rules')),
+            recommendation_templates=[]
+        )
+
+    @staticmethod
+    def validate_row(row: Dict[str, str], item_type: str = None) -> Optional[str]:
+        """Validate one suggested row against the driver/card schema. Returns an error or None."""
+        try:
+            if item_type == "Drivers":
+                DataConverter.driver_from_row(row)
+            elif item_type == "Decision Cards":
+                DataConverter.card_from_row(row)
+            # Survey rows: column count is the only structural check
+        except Exception as e:
+            return str(e).splitlines()[0]
+        return None
+
+# Column layouts of LLM-suggested rows (no header, see LLMClient prompts)
+DRIVER_COLUMNS = ["id", "label", "survey_items", "range"]
+CARD_COLUMNS = ["id", "title", "decision_question", "stakeholders", "drivers", "kpis", "rules"]
+
+class StreamingRowParser:
+    """
+    Incremental CSV parser for streamed LLM output.
+    feed() returns rows completed by the new chunk; quoted fields spanning
+    chunk (or line) boundaries are held back until closed. Markdown fences are skipped.
+    """
+    def __init__(self, columns: List[str], item_type: str = None):
+        self.columns = columns
+        self.item_type = item_type
+        self._buffer = ""
+        self._pending = "" # Logical row spanning several lines (open quote)
+
+    def feed(self, chunk: str) -> List[Tuple[Dict[str, str], Optional[str]]]:
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        return self._consume(lines)
+
+    def close(self) -> List[Tuple[Dict[str, str], Optional[str]]]:
+        lines, self._buffer = [self._buffer], ""
+        rows = self._consume(lines)
+        if self._pending.strip():
+            # Unterminated quote at end of stream
+            rows.append(self._parse(self._pending))
+            self._pending = ""
+        return rows
+
+    def _consume(self, lines: List[str]) -> List[Tuple[Dict[str, str], Optional[str]]]:
+        rows = []
+        for line in lines:
+            line = line.rstrip("\r")
+            if not self._pending and (not line.strip() or line.strip().startswith("```")):
+                continue
+            self._pending = f"{self._pending}\n{line}" if self._pending else line
+            if self._pending.count('"') % 2 == 1:
+                continue # Inside a quoted field
+            rows.append(self._parse(self._pending))
+            self._pending = ""
+        return rows
+
+    def _parse(self, text: str) -> Tuple[Dict[str, str], Optional[str]]:
+        """Returns (row, error). error is None for a valid row."""
+        values = next(csv.reader([text], skipinitialspace=True), [])
+        # Without known columns (e.g. empty survey frame) rows are keyed by position
+        row = dict(zip(self.columns or range(len(values)), values))
+        if self.columns and len(values) != len(self.columns):
+            return row, f"Expected {len(self.columns)} columns, got {len(values)}"
+        return row, DataConverter.validate_row(row, self.item_type)
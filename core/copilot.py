@@ -0,0 +1,45 @@
+import time
+import pandas as pd
+import streamlit as st
+from typing import List
+from core.converter import StreamingRowParser
+
+def stream_suggestion(llm, context: str, item_type: str, columns: List[str], use_cache: bool = None) -> str:
+    """
+    Render a streamed copilot suggestion: raw text plus rows validated as they complete.
+    Returns the full text (same contract as LLMClient.generate_suggestions).
+    """
+    parser = StreamingRowParser(columns, item_type)
+    text_slot = st.empty()
+    rows_slot = st.empty()
+    status_slot = st.empty()
+
+    valid, errors = [], []
+    started = time.perf_counter()
+    first_row_at = None
+
+    def render(rows):
+        nonlocal first_row_at
+        for row, error in rows:
+            if error:
+                errors.append(f"Row {len(valid) + len(errors) + 1}: {error}")
+            else:
+                valid.append(row)
+                if first_row_at is None:
+                    first_row_at = time.perf_counter() - started
+        if rows:
+            if valid:
+                rows_slot.dataframe(pd.DataFrame(valid, columns=columns or None), hide_index=True)
+            if errors:
+                status_slot.warning("\n\n".join(errors))
+
+    text = ""
+    for chunk in llm.stream_suggestions(context, item_type, use_cache=use_cache):
+        text += chunk
+        text_slot.code(text, language="csv")
+        render(parser.feed(chunk))
+    render(parser.close())
+
+    if first_row_at is not None:
+        st.caption(f"{len(valid)} valid rows (first after {first_row_at:.1f}s of {time.perf_counter() - started:.1f}s)")
+    return text
@@ -1,59 +1,78 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from data.models import DecisionCardConfig, DecisionCardState, CardStatus, RecommendationTemplate
 
 class DecisionEngine:
-    def evaluate_card(self, card_config: DecisionCardConfig, evidence_context: Dict[str, float]) -> DecisionCardState:
-        """
-        Evaluate rules against evidence and return the card state.
-        evidence_context: map of variable names to values (e.g. {'psychological_safety': 3.1})
-        """
-        state = DecisionCardState(card_id=card_config.id)
-        
-        # Default to GREEN if no rules trigger
-        matched_status = CardStatus.GREEN
-        matched_message = "No issues detected."
-
-        # Check for Data Availability First
-        missing_evidence = []
-        if 'drivers' in card_config.required_evidence:
-            for d in card_config.required_evidence['drivers']:
-                if d not in evidence_context: missing_evidence.append(d)
-        
-        if 'kpis' in card_config.required_evidence:
-            for k in card_config.required_evidence['kpis']:
-                if k not in evidence_context: missing_evidence.append(k)
-
-        if missing_evidence:
-            matched_status = CardStatus.UNKNOWN
-            msg = f"Missing Evidence: {', '.join(missing_evidence)}"
-            state.key_evidence.append(msg)
-            state.status = matched_status
-            state.total_priority = 0.0 # Force low priority if unknown
-            return state
+    def __init__(self):
+        # condition string -> compiled code object (shared engines compile each rule once)
+        self._compiled: Dict[str, Any] = {}
+
+    def compile_rules(self, cards: List[DecisionCardConfig]):
+        """Pre-compile every rule condition; invalid ones are reported at evaluation time."""
+        for card in cards:
+            for rule in card.rules:
+                try:
+                    self._compile(rule.condition)
+                except SyntaxError:
+                    pass
+
+    def _compile(self, condition: str):
+        code = self._compiled.get(condition)
+        if code is None:
+            code = compile(condition, "<rule>", "eval")
+            self._compiled[condition] = code
+        return code
 
-        # Normal Rule Evaluation if Data Exists
+    # match(): rule index of the first triggered rule, or one of these
+    NO_MATCH = -1
+    MISSING_EVIDENCE = -2
 
-        # Iterate rules
-        for rule in card_config.rules:
+    def missing_evidence(self, card_config: DecisionCardConfig, evidence_context: Dict[str, float]) -> List[str]:
+        missing = []
+        for key in ('drivers', 'kpis'):
+            for name in card_config.required_evidence.get(key, []):
+                if name not in evidence_context: missing.append(name)
+        return missing
+
+    def match(self, card_config: DecisionCardConfig, evidence_context: Dict[str, float]) -> Tuple[CardStatus, int]:
+        """(status, rule index) without building a DecisionCardState (see CardTable)."""
+        if self.missing_evidence(card_config, evidence_context):
+            return CardStatus.UNKNOWN, self.MISSING_EVIDENCE
+        for i, rule in enumerate(card_config.rules):
             try:
                 # Security note: eval is used here for MVP flexibility. 
                 # In production, use a safe expression parser like simpleeval.
-                if eval(rule.condition, {"__builtins__": {}}, evidence_context):
-                    matched_status = rule.status
-                    matched_message = rule.message
-                    state.key_evidence.append(f"Condition met: {rule.condition} ({matched_message})")
-                    # Break on first match (priority based on order in config)
-                    break 
+                if eval(self._compile(rule.condition), {"__builtins__": {}}, evidence_context):
+                    # First match wins (priority based on order in config)
+                    return rule.status, i
             except Exception as e:
                 # Log error or warning?
                 print(f"Error evaluating rule '{rule.condition}': {e}")
+        return CardStatus.GREEN, self.NO_MATCH
 
-        state.status = matched_status
+    def build_state(self, card_config: DecisionCardConfig, status: CardStatus, rule_index: int,
+                    evidence_context: Dict[str, float]) -> DecisionCardState:
+        """DecisionCardState for a match() result."""
+        state = DecisionCardState(card_id=card_config.id, status=status)
+        if rule_index == self.MISSING_EVIDENCE:
+            missing = self.missing_evidence(card_config, evidence_context)
+            state.key_evidence.append(f"Missing Evidence: {', '.join(missing)}")
+            state.total_priority = 0.0 # Force low priority if unknown
+            return state
+        if rule_index >= 0:
+            rule = card_config.rules[rule_index]
+            state.key_evidence.append(f"Condition met: {rule.condition} ({rule.message})")
 
         # Recommendation Logic (MVP: Default to first template if RED/YELLOW)
-        if matched_status in [CardStatus.RED, CardStatus.YELLOW] and card_config.recommendation_templates:
+        if status in [CardStatus.RED, CardStatus.YELLOW] and card_config.recommendation_templates:
             # Simple logic: pick the first one
             # Phase 2: Select best fit based on specific rule or driver
             state.recommendation_draft = card_config.recommendation_templates[0]
-        
         return state
+
+    def evaluate_card(self, card_config: DecisionCardConfig, evidence_context: Dict[str, float]) -> DecisionCardState:
+        """
+        Evaluate rules against evidence and return the card state.
+        evidence_context: map of variable names to values (e.g. {'psychological_safety': 3.1})
+        """
+        status, rule_index = self.match(card_config, evidence_context)
+        return self.build_state(card_config, status, rule_index, evidence_context)
@@ -1,21 +1,30 @@
 import json
 import os
+import time
 import streamlit as st
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 class I18nManager:
     _default_locale = "en"
     _file_path = "configs/locales.json"
     _cache = {}
 
+    # Precompiled lookup: lang -> {"dotted.key": "text"} with English fallback merged in
+    _flat: Dict[str, Dict[str, str]] = {}
+    _mtime: Optional[float] = None
+    _checked_at = 0.0
+    _check_interval = 1.0 # Seconds between mtime checks (keeps get() at dict speed)
+
     @classmethod
     def load(cls) -> Dict:
         """Load locales from file. If missing, return defaults."""
+        cls._revalidate()
         if not cls._cache:
             if os.path.exists(cls._file_path):
                 try:
                     with open(cls._file_path, "r", encoding="utf-8") as f:
                         cls._cache = json.load(f)
+                    cls._mtime = os.path.getmtime(cls._file_path)
                 except Exception as e:
                     st.error(f"Error loading locales: {e}")
                     cls._cache = cls._get_default_structure()
@@ -31,35 +40,60 @@ class I18nManager:
         with open(cls._file_path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
         cls._cache = data
+        cls._flat = {}
+        cls._mtime = os.path.getmtime(cls._file_path)
 
     @classmethod
-    def get(cls, key: str, default: str = None) -> str:
-        """Get translated string. Key format: 'category.subcategory.item'"""
-        lang = st.session_state.get("language", cls._default_locale)
-        data = cls.load()
-        
-        # Helper to traverse dict
-        def traverse(d, k_parts):
-            curr = d
-            for p in k_parts:
-                if isinstance(curr, dict) and p in curr:
-                    curr = curr[p]
-                else:
-                    return None
-            return curr if isinstance(curr, str) else None
+    def _revalidate(cls, force: bool = False):
+        """Drop cached locales if the file changed on disk (throttled stat)."""
+        now = time.monotonic()
+        if not force and now - cls._checked_at < cls._check_interval:
+            return
+        cls._checked_at = now
+        try:
+            mtime = os.path.getmtime(cls._file_path)
+        except OSError:
+            mtime = None
+        if mtime != cls._mtime:
+            cls._cache = {}
+            cls._flat = {}
 
-        parts = key.split(".")
-        
-        # 1. Try active language
-        val = traverse(data.get(lang, {}), parts)
+    @staticmethod
+    def _flatten(d: Dict, prefix: str = "", out: Dict[str, str] = None) -> Dict[str, str]:
+        out = {} if out is None else out
+        for k, v in d.items():
+            path = f"{prefix}{k}"
+            if isinstance(v, dict):
+                I18nManager._flatten(v, path + ".", out)
+            elif isinstance(v, str):
+                out[path] = v
+        return out
+
+    @classmethod
+    def table(cls, lang: str) -> Dict[str, str]:
+        """Flattened dotted-key table for a language, built once per locale file version."""
+        cls._revalidate()
+        flat = cls._flat.get(lang)
+        if flat is None:
+            data = cls.load()
+            # English first, active language overwrites -> fallback merged in
+            flat = cls._flatten(data.get("en", {})) if lang != "en" else {}
+            cls._flatten(data.get(lang, {}), out=flat)
+            cls._flat[lang] = flat
+        return flat
+
+    @classmethod
+    def get(cls, key: str, default: str = None, lang: str = None) -> str:
+        """Get translated string. Key format: 'category.subcategory.item'"""
+        if lang is None:
+            lang = st.session_state.get("language", cls._default_locale)
+        flat = cls._flat.get(lang)
+        if flat is None or time.monotonic() - cls._checked_at >= cls._check_interval:
+            flat = cls.table(lang)
+        val = flat.get(key)
         if val is not None: return val
-        
-        # 2. Fallback to English
-        if lang != "en":
-            val = traverse(data.get("en", {}), parts)
-            if val is not None: return val
-            
-        # 3. Fallback to default arg or key itself
+
+        # Fallback to default arg or key itself
         return default or key
 
     @classmethod
@@ -1,15 +1,103 @@
+import os
+import json
+import pickle
+import hashlib
 import yaml
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from data.models import AppConfig, DecisionCardConfig, RuleConfig, DriverConfig
+from core.settings_cache import CachedFileStore
+
+# libyaml-backed loader when available (~10x faster than the pure-Python one)
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+CONFIG_CACHE_DIR = ".cache/config"
+CONFIG_CACHE_VERSION = 1
 
 class ConfigLoader:
-    def __init__(self, config_path: str):
+    """
+    Loads a customer config YAML into validated models.
+    Validated configs are pickled to CONFIG_CACHE_DIR, keyed by path and checked against
+    (mtime, size) and the content hash, so unchanged files skip YAML parsing and
+    pydantic validation entirely.
+    """
+    _schema_tag = None
+
+    def __init__(self, config_path: str, use_cache: bool = True, cache_dir: str = CONFIG_CACHE_DIR):
         self.config_path = config_path
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+
+    @classmethod
+    def _model_tag(cls) -> str:
+        # Invalidate pickles when the models change shape
+        if cls._schema_tag is None:
+            schema = json.dumps(AppConfig.model_json_schema(), sort_keys=True)
+            cls._schema_tag = hashlib.sha256(schema.encode("utf-8")).hexdigest()[:16]
+        return cls._schema_tag
+
+    def _cache_path(self) -> str:
+        key = hashlib.sha256(os.path.abspath(self.config_path).encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def _read_cache(self, stat: os.stat_result, raw: Optional[bytes]) -> Optional[AppConfig]:
+        try:
+            with open(self._cache_path(), "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            return None
+        if entry.get("version") != CONFIG_CACHE_VERSION or entry.get("model") != self._model_tag():
+            return None
+        if raw is None:
+            # Fast path: file untouched since the cache was written
+            if entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+                return entry["config"]
+            return None
+        # Touched but possibly identical content
+        if entry.get("sha256") == hashlib.sha256(raw).hexdigest():
+            return entry["config"]
+        return None
+
+    def _write_cache(self, stat: os.stat_result, raw: bytes, config: AppConfig):
+        entry = {
+            "version": CONFIG_CACHE_VERSION,
+            "model": self._model_tag(),
+            "path": os.path.abspath(self.config_path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": hashlib.sha256(raw).hexdigest(),
+            "config": config,
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._cache_path()
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Config cache write failed: {e}")
 
     def load_config(self) -> AppConfig:
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        if not self.use_cache:
+            with open(self.config_path, 'rb') as f:
+                return self._parse(f.read())
+
+        stat = os.stat(self.config_path)
+        config = self._read_cache(stat, None)
+        if config is not None:
+            return config
+
+        with open(self.config_path, 'rb') as f:
+            raw = f.read()
+        config = self._read_cache(stat, raw)
+        if config is None:
+            config = self._parse(raw)
+        self._write_cache(stat, raw, config)
+        return config
+
+    def _parse(self, raw: bytes) -> AppConfig:
+        data = yaml.load(raw, Loader=YAML_LOADER)
 
         # Convert simple types to Models
         drivers = [DriverConfig(**d) for d in data.get("drivers", [])]
@@ -29,7 +117,9 @@ class ConfigLoader:
             priority_weights=data.get("priority_weights", {}),
             quality_gates=data.get("quality_gates", {}),
             decision_cards=cards,
-            drivers=drivers
+            drivers=drivers,
+            # Optional sections keep the model defaults when absent
+            **{k: data[k] for k in ("scenarios", "ranking_ensemble", "criteria") if k in data}
         )
 
 class DataLoader:
@@ -47,26 +137,23 @@ class PreferenceManager:
     def _get_path(cls):
         return cls._file_path
 
+    @classmethod
+    def _store(cls) -> CachedFileStore:
+        return CachedFileStore.for_path(
+            cls._get_path(),
+            load_fn=lambda raw: json.loads(raw.decode("utf-8")),
+            dump_fn=lambda data: json.dumps(data).encode("utf-8")
+        )
+
     @classmethod
     def load(cls) -> dict:
-        import os, json
-        if os.path.exists(cls._get_path()):
-            try:
-                with open(cls._get_path(), "r") as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+        return cls._store().read()
 
     @classmethod
     def save(cls, key: str, value: Any):
-        import os, json
-        prefs = cls.load()
-        prefs[key] = value
-        os.makedirs(os.path.dirname(cls._get_path()), exist_ok=True)
-        with open(cls._get_path(), "w") as f:
-            json.dump(prefs, f)
+        # Queued and coalesced with other saves into a single write
+        cls._store().set(key, value)
 
     @classmethod
     def get(cls, key: str, default=None):
-        return cls.load().get(key, default)
+        return cls._store().get(key, default)
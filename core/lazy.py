@@ -0,0 +1,69 @@
+import os
+import sys
+import importlib
+import threading
+from types import ModuleType
+from typing import Optional
+
+# Startup/import helpers.
+# - lazy_import(): module proxy that defers heavy optional dependencies
+#   (openai, graphviz, docx...) until first attribute access.
+# - dev_reload(): hot-reload core modules on each rerun, only when EBDA_DEBUG is set.
+
+DEBUG_ENV = "EBDA_DEBUG"
+
+def debug_enabled() -> bool:
+    return os.environ.get(DEBUG_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+class LazyModule(ModuleType):
+    """Imports the real module on first attribute access, then gets out of the way."""
+    def __init__(self, name: str, install_hint: str = None):
+        super().__init__(name)
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_hint"] = install_hint
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    try:
+                        module = importlib.import_module(self.__dict__["_lazy_name"])
+                    except ImportError as e:
+                        hint = self.__dict__["_lazy_hint"]
+                        if hint:
+                            raise ImportError(f"{e}. {hint}") from e
+                        raise
+                    self.__dict__["_lazy_module"] = module
+                    # Later lookups hit the module dict directly
+                    self.__dict__.update(module.__dict__)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__["_lazy_module"] is not None
+
+def lazy_import(name: str, install_hint: str = None) -> ModuleType:
+    """Return the module if already imported, otherwise a LazyModule proxy."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name, install_hint)
+
+def is_loaded(module: ModuleType) -> bool:
+    return not isinstance(module, LazyModule) or module.is_loaded
+
+def dev_reload(*modules: ModuleType) -> Optional[list]:
+    """importlib.reload the given modules, but only in debug mode (EBDA_DEBUG=1)."""
+    if not debug_enabled():
+        return None
+    return [importlib.reload(m) for m in modules]
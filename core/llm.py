@@ -1,22 +1,253 @@
-import openai
-import google.generativeai as genai
 import os
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+from core.llm_cache import ResponseCache
+from core.lazy import lazy_import, is_loaded
+
+# openai pulls in httpx/pydantic models (~0.5s); only pay for it when an LLM feature is used
+openai = lazy_import("openai", "Install it with 'pip install openai'.")
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+MODEL_LIST_TTL = 24 * 3600 # Seconds a cached model listing stays valid
+
+class RateLimitExceeded(Exception):
+    """Raised when retries are exhausted on 429 responses."""
+
+class RetryPolicy:
+    """Exponential backoff with full jitter; honours Retry-After when given."""
+    def __init__(self, max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 20.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        if retry_after is not None:
+            return min(self.max_delay, max(0.0, retry_after))
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+def _is_rate_limit(e: Exception) -> bool:
+    # An openai error implies openai is already imported; don't import it just to check
+    if is_loaded(openai) and isinstance(e, openai.RateLimitError):
+        return True
+    # Gemini (google.api_core ResourceExhausted) and others only expose it in the message
+    msg = str(e).lower()
+    return "429" in msg or "rate limit" in msg or "resource exhausted" in msg
+
+def _is_transient(e: Exception) -> bool:
+    return is_loaded(openai) and isinstance(e, (openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError))
+
+def _retry_after(e: Exception) -> Optional[float]:
+    response = getattr(e, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class LLMClientPool:
+    """
+    Process-wide pool of provider clients.
+    - One openai.OpenAI client (and its HTTP connection pool) per provider/key/base_url
+    - Concurrency cap per provider (semaphore)
+    - 429 -> shared cooldown for the provider (backpressure for all callers) + backoff retries
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_concurrency: int = 4, retry: RetryPolicy = None, timeout: float = 60.0):
+        self.max_concurrency = max_concurrency
+        self.retry = retry or RetryPolicy()
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, str, Optional[str]], Any] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._cooldown_until: Dict[str, float] = {}
+        self._gemini_key: Optional[str] = None
+        # (provider, model) pairs known to reject the 'system' role
+        self.no_system_role = set()
+
+    @classmethod
+    def default(cls) -> "LLMClientPool":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def _key_id(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+    def openai_client(self, provider: str, api_key: str, base_url: str = None):
+        if base_url is None and provider == "OpenRouter":
+            base_url = OPENROUTER_BASE_URL
+        pool_key = (provider, self._key_id(api_key), base_url)
+        with self._lock:
+            client = self._clients.get(pool_key)
+            if client is None:
+                kwargs = {"api_key": api_key, "max_retries": 0, "timeout": self.timeout}
+                if base_url:
+                    kwargs["base_url"] = base_url
+                if provider == "OpenRouter":
+                    kwargs["default_headers"] = {"HTTP-Referer": "http://localhost:8501", "X-Title": "Evidence-Based DSS"}
+                # Retries are handled by the pool, not the SDK
+                client = openai.OpenAI(**kwargs)
+                self._clients[pool_key] = client
+            return client
+
+    def gemini(self, api_key: str):
+        import google.generativeai as genai
+        with self._lock:
+            # genai.configure is global state; only redo it when the key changes
+            if self._gemini_key != api_key:
+                genai.configure(api_key=api_key)
+                self._gemini_key = api_key
+        return genai
+
+    def _semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._semaphores.get(provider)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.max_concurrency)
+                self._semaphores[provider] = sem
+            return sem
+
+    def _wait_cooldown(self, provider: str):
+        while True:
+            with self._lock:
+                wait = self._cooldown_until.get(provider, 0.0) - time.monotonic()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def _set_cooldown(self, provider: str, seconds: float):
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._cooldown_until[provider] = max(self._cooldown_until.get(provider, 0.0), until)
+
+    def _backoff(self, provider: str, e: Exception, attempt: int) -> Tuple[float, bool]:
+        """(delay, rate_limited) before retrying after e; re-raises when e is final."""
+        rate_limited = _is_rate_limit(e)
+        if not (rate_limited or _is_transient(e)):
+            raise e
+        if attempt >= self.retry.max_retries:
+            if rate_limited:
+                raise RateLimitExceeded(str(e)) from e
+            raise e
+        delay = self.retry.delay(attempt, _retry_after(e))
+        if rate_limited:
+            # Backpressure: every caller on this provider waits it out
+            self._set_cooldown(provider, delay)
+        return delay, rate_limited
+
+    def call(self, provider: str, fn: Callable[[], Any]) -> Any:
+        """Run fn under the provider's concurrency cap with backoff retries."""
+        sem = self._semaphore(provider)
+        attempt = 0
+        while True:
+            self._wait_cooldown(provider)
+            with sem:
+                try:
+                    return fn()
+                except Exception as e:
+                    delay, rate_limited = self._backoff(provider, e, attempt)
+            if not rate_limited:
+                time.sleep(delay)
+            attempt += 1
+
+    def stream(self, provider: str, fn: Callable[[], Any]) -> "PooledStream":
+        """
+        Like call(), but fn opens a stream: retries cover opening it, and the
+        concurrency slot is held until the stream is exhausted or closed.
+        """
+        sem = self._semaphore(provider)
+        attempt = 0
+        while True:
+            self._wait_cooldown(provider)
+            sem.acquire()
+            try:
+                return PooledStream(fn(), sem)
+            except Exception as e:
+                sem.release()
+                delay, rate_limited = self._backoff(provider, e, attempt)
+            if not rate_limited:
+                time.sleep(delay)
+            attempt += 1
+
+class PooledStream:
+    """Iterator over an open stream that releases its pool slot once exhausted or closed."""
+    def __init__(self, stream: Any, sem: threading.BoundedSemaphore):
+        self._stream = stream
+        self._it = iter(stream)
+        self._sem = sem
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._sem is None:
+            raise StopIteration
+        try:
+            return next(self._it)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        if self._sem is None:
+            return
+        sem, self._sem = self._sem, None
+        sem.release()
+        close = getattr(self._stream, "close", None) # Drop the HTTP response early
+        if close is not None:
+            close()
+
+    def __del__(self):
+        self.close()
 
 class LLMClient:
-    def __init__(self, provider: str, api_key: str, model_name: str = "gpt-4o"):
+    def __init__(
+        self,
+        provider: str,
+        api_key: str,
+        model_name: str = "gpt-4o",
+        base_url: str = None,
+        pool: LLMClientPool = None,
+        cache: ResponseCache = None,
+        use_cache: bool = True,
+        temperature: float = 0.7
+    ):
         self.provider = provider
         self.api_key = api_key
         self.model_name = model_name
-        
-    def generate_suggestions(self, context: str, item_type: str) -> str:
-        """
-        Generate CSV rows for Drivers or Cards.
-        """
-        if not self.api_key:
-            return "Error: No API Key provided."
-            
+        self.base_url = base_url
+        self.pool = pool or LLMClientPool.default()
+        self.cache = cache
+        self.use_cache = use_cache
+        self.temperature = temperature
+
+    def _cache(self) -> ResponseCache:
+        if self.cache is None:
+            self.cache = ResponseCache.default()
+        return self.cache
+
+    def _cache_key(self, system_prompt: str, user_prompt: str) -> str:
+        return ResponseCache.make_key(
+            "completion",
+            provider=self.provider,
+            base_url=self.base_url,
+            model=self.model_name,
+            prompt=ResponseCache.prompt_hash(system_prompt, user_prompt),
+            temperature=self.temperature
+        )
+
+    def _build_prompts(self, context: str, item_type: str) -> Tuple[str, str]:
         if item_type == "Survey Data":
             col_hint = "Columns: Determined by Driver definitions (e.g. Q1, Q2...)"
         else:
@@ -28,92 +259,231 @@ class LLMClient:
         system_prompt = f"""
         You are a Data Architect extension for a Decision Support System.
         Your task is to suggest additional {item_type} based on the existing configuration provided below.
-        
+
         Output format: CSV rows only (no header, no markdown).
         {col_hint}
-        
+
         Generate high-quality, relevant data rows.
         """
-        
+
         user_prompt = f"Existing Configuration Context:\n{context}\n\nSuggest 2 new {item_type}:"
-        
+        return system_prompt, user_prompt
+
+    def _merged_messages(self, system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+        return [{"role": "user", "content": f"{system_prompt}\n\n{user_prompt}"}]
+
+    def _messages(self, system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+        # Google/Gemma models on OpenRouter often reject 'system' role
+        if self.provider == "OpenRouter" and ("google" in self.model_name.lower() or "gemma" in self.model_name.lower()):
+            return self._merged_messages(system_prompt, user_prompt)
+        if (self.provider, self.model_name) in self.pool.no_system_role:
+            return self._merged_messages(system_prompt, user_prompt)
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def _openai_create(self, system_prompt: str, user_prompt: str, stream: bool = False):
+        """
+        chat.completions.create through the pool, with the system-role fallback.
+        stream=True returns a PooledStream holding a concurrency slot until it's consumed.
+        """
+        client = self.pool.openai_client(self.provider, self.api_key, self.base_url)
+        messages = self._messages(system_prompt, user_prompt)
+        run = self.pool.stream if stream else self.pool.call
+
+        def create(msgs):
+            return run(self.provider, lambda: client.chat.completions.create(
+                model=self.model_name,
+                messages=msgs,
+                temperature=self.temperature,
+                **({"stream": True} if stream else {})
+            ))
+
         try:
-            if self.provider == "OpenAI" or self.provider == "OpenRouter":
-                extra_headers = {"HTTP-Referer": "http://localhost:8501", "X-Title": "Evidence-Based DSS"} if self.provider == "OpenRouter" else None
-                client = openai.OpenAI(
-                    base_url="https://openrouter.ai/api/v1" if self.provider == "OpenRouter" else None,
-                    api_key=self.api_key,
-                    default_headers=extra_headers
-                )
-                
-                
-                messages = []
-                # Google/Gemma models on OpenRouter often reject 'system' role
-                if self.provider == "OpenRouter" and ("google" in self.model_name.lower() or "gemma" in self.model_name.lower()):
-                    messages = [{"role": "user", "content": f"{system_prompt}\n\n{user_prompt}"}]
-                else:
-                    messages = [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ]
+            return create(messages)
+        except openai.BadRequestError as e:
+            # Retry if standard call failed (likely due to system role support)
+            msg = str(e).lower()
+            if len(messages) > 1 and ("instruction" in msg or "system" in msg or "unsupported" in msg):
+                response = create(self._merged_messages(system_prompt, user_prompt))
+                # The merged prompt worked: remember, so later calls go straight to it
+                self.pool.no_system_role.add((self.provider, self.model_name))
+                return response
+            raise e
 
-                try:
-                    response = client.chat.completions.create(
-                        model=self.model_name,
-                        messages=messages,
-                        temperature=0.7
-                    )
-                except openai.BadRequestError as e:
-                    # Retry if standard call failed (likely due to system role support)
-                    if "instruction" in str(e).lower() or "system" in str(e).lower() or "unsupported" in str(e).lower() or "400" in str(e):
-                        fallback_msg = [{"role": "user", "content": f"{system_prompt}\n\n{user_prompt}"}]
-                        response = client.chat.completions.create(
-                            model=self.model_name,
-                            messages=fallback_msg,
-                            temperature=0.7
-                        )
-                    else:
-                        raise e
-                return response.choices[0].message.content
-                
-            elif self.provider == "Google (Gemini)":
-                genai.configure(api_key=self.api_key)
-                model = genai.GenerativeModel(self.model_name)
-                response = model.generate_content(system_prompt + "\n" + user_prompt)
-                return response.text
-                
+    def _complete(self, system_prompt: str, user_prompt: str) -> str:
+        """Single completion through the pool. Raises on failure."""
+        if self.provider == "OpenAI" or self.provider == "OpenRouter":
+            response = self._openai_create(system_prompt, user_prompt)
+            return response.choices[0].message.content
+
+        elif self.provider == "Google (Gemini)":
+            genai = self.pool.gemini(self.api_key)
+            model = genai.GenerativeModel(self.model_name)
+            response = self.pool.call(self.provider, lambda: model.generate_content(system_prompt + "\n" + user_prompt))
+            return response.text
+
+        raise ValueError("Provider not supported.")
+
+    def _stream(self, system_prompt: str, user_prompt: str) -> Iterator[str]:
+        """Yield text chunks as they arrive. Retries only cover opening the stream."""
+        if self.provider == "OpenAI" or self.provider == "OpenRouter":
+            stream = self._openai_create(system_prompt, user_prompt, stream=True)
+            try:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                stream.close()
+            return
+
+        elif self.provider == "Google (Gemini)":
+            genai = self.pool.gemini(self.api_key)
+            model = genai.GenerativeModel(self.model_name)
+            response = self.pool.stream(self.provider, lambda: model.generate_content(system_prompt + "\n" + user_prompt, stream=True))
+            try:
+                for chunk in response:
+                    if chunk.text:
+                        yield chunk.text
+            finally:
+                response.close()
+            return
+
+        raise ValueError("Provider not supported.")
+
+    def _error_message(self, e: Exception) -> str:
+        if isinstance(e, ValueError):
+            return f"Error: {e}"
+        msg = str(e)
+        if isinstance(e, RateLimitExceeded) or "429" in msg or "rate limit" in msg.lower():
+            return f"⚠️ Model Busy (429): The selected model ({self.model_name}) is currently overloaded or rate-limited. Please try another model."
+        return f"Error calling LLM: {msg}"
+
+    def _lookup_cache(self, system_prompt: str, user_prompt: str, use_cache: bool = None) -> Tuple[Optional[str], Optional[str]]:
+        """Returns (cache_key, cached_value); cache_key is None when caching is off."""
+        if not (self.use_cache if use_cache is None else use_cache):
+            return None, None
+        cache_key = self._cache_key(system_prompt, user_prompt)
+        return cache_key, self._cache().get(cache_key)
+
+    def generate_suggestions(self, context: str, item_type: str, use_cache: bool = None) -> str:
+        """
+        Generate CSV rows for Drivers or Cards.
+        use_cache=False skips the response cache (e.g. for deliberately varied synthetic data).
+        """
+        if not self.api_key:
+            return "Error: No API Key provided."
+
+        system_prompt, user_prompt = self._build_prompts(context, item_type)
+        cache_key, cached = self._lookup_cache(system_prompt, user_prompt, use_cache)
+        if cached is not None:
+            return cached
+
+        try:
+            result = self._complete(system_prompt, user_prompt)
+            # Only successful completions are cached, never error strings
+            if cache_key is not None and result:
+                self._cache().set(cache_key, result)
+            return result
         except Exception as e:
-            msg = str(e)
-            if "429" in msg or "rate limit" in msg.lower():
-                return f"⚠️ Model Busy (429): The selected model ({self.model_name}) is currently overloaded or rate-limited. Please try another model."
-            return f"Error calling LLM: {msg}"
-            
-        return "Error: Provider not supported."
+            return self._error_message(e)
+
+    def stream_suggestions(self, context: str, item_type: str, use_cache: bool = None) -> Iterator[str]:
+        """
+        Streaming variant of generate_suggestions: yields text chunks as they arrive.
+        A cache hit is yielded as a single chunk. Errors are yielded as a final chunk
+        (same messages as generate_suggestions) and nothing is cached.
+        """
+        if not self.api_key:
+            yield "Error: No API Key provided."
+            return
+
+        system_prompt, user_prompt = self._build_prompts(context, item_type)
+        cache_key, cached = self._lookup_cache(system_prompt, user_prompt, use_cache)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        try:
+            for chunk in self._stream(system_prompt, user_prompt):
+                parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            yield ("\n" if parts else "") + self._error_message(e)
+            return
+
+        if cache_key is not None and parts:
+            self._cache().set(cache_key, "".join(parts))
+
+    def generate_many(self, jobs: List[Tuple[str, str]], max_concurrency: int = None) -> List[str]:
+        """
+        Run several (context, item_type) requests concurrently.
+        Results keep the order of jobs. The pool's per-provider cap still applies.
+        """
+        if not jobs:
+            return []
+        workers = max_concurrency or self.pool.max_concurrency
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda job: self.generate_suggestions(*job), jobs))
+
+    async def agenerate_suggestions(self, context: str, item_type: str) -> str:
+        """Async variant (runs the pooled sync client in a worker thread)."""
+        return await asyncio.to_thread(self.generate_suggestions, context, item_type)
 
     @staticmethod
-    def fetch_available_models(provider: str, api_key: str) -> List[str]:
+    def _models_cache_key(provider: str, api_key: str, base_url: str = None) -> str:
+        # Listings can differ per key (permissions), so the key id is part of the cache key
+        return ResponseCache.make_key("models", provider=provider, key=LLMClientPool._key_id(api_key), base_url=base_url)
+
+    @staticmethod
+    def cached_models(provider: str, api_key: str, base_url: str = None, cache: ResponseCache = None) -> Optional[List[str]]:
+        """Cached model listing without any network call (None if absent/expired)."""
+        if not api_key: return None
+        cache = cache or ResponseCache.default()
+        return cache.get(LLMClient._models_cache_key(provider, api_key, base_url))
+
+    @staticmethod
+    def fetch_available_models(provider: str, api_key: str, use_cache: bool = True, base_url: str = None, cache: ResponseCache = None) -> List[str]:
         if not api_key: return []
-        
+        cache = cache or ResponseCache.default()
+        key = LLMClient._models_cache_key(provider, api_key, base_url)
+
+        if use_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        models = LLMClient._list_models(provider, api_key, base_url)
+        if models:
+            cache.set(key, models, ttl=MODEL_LIST_TTL)
+        return models
+
+    @staticmethod
+    def _list_models(provider: str, api_key: str, base_url: str = None) -> List[str]:
+        pool = LLMClientPool.default()
+
         try:
             if provider == "OpenAI":
-                client = openai.OpenAI(api_key=api_key)
-                models = client.models.list()
+                client = pool.openai_client(provider, api_key, base_url)
+                models = pool.call(provider, client.models.list)
                 # Filter for chat models usually starting with gpt
                 return sorted([m.id for m in models.data if "gpt" in m.id])
-                
+
             elif provider == "Google (Gemini)":
-                genai.configure(api_key=api_key)
-                models = genai.list_models()
+                genai = pool.gemini(api_key)
+                models = pool.call(provider, lambda: list(genai.list_models()))
                 # Filter for generateContent supported models
                 return sorted([m.name.replace("models/", "") for m in models if "generateContent" in m.supported_generation_methods])
-                
+
             elif provider == "OpenRouter":
                 import requests
                 # OpenRouter modls endpoint is public, but using key might show specific permissions
                 # Try with key if present, else without
                 headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
                 try:
-                    resp = requests.get("https://openrouter.ai/api/v1/models", headers=headers, timeout=10)
+                    resp = requests.get(f"{base_url or OPENROUTER_BASE_URL}/models", headers=headers, timeout=10)
                     if resp.status_code == 200:
                         data = resp.json().get("data", [])
                         return sorted([m["id"] for m in data])
@@ -123,9 +493,9 @@ class LLMClient:
                 except Exception as ex:
                      st.error(f"Connection Error: {ex}")
                      return []
-                    
+
         except Exception as e:
             st.error(f"Failed to fetch models: {e}")
             return []
-            
+
         return []
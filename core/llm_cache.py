@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+CACHE_PATH = ".cache/llm_cache.sqlite"
+
+class ResponseCache:
+    """
+    On-disk cache for LLM responses and model listings (SQLite, stdlib only).
+    - Entries may carry a TTL (model lists); completions are kept until evicted.
+    - LRU eviction keeps the total payload under max_bytes.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = 32 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+
+    @classmethod
+    def default(cls) -> "ResponseCache":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Short-lived connections: safe across Streamlit session threads
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with conn: # Commit / rollback
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(kind: str, **parts) -> str:
+        """Stable key from the request identity (provider, model, prompt hash, temperature...)."""
+        raw = json.dumps({"kind": kind, **parts}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def prompt_hash(*prompts: str) -> str:
+        h = hashlib.sha256()
+        for p in prompts:
+            h.update(p.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return # Would evict everything else; not worth caching
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, expires_at, now)
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used until under budget
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC").fetchall():
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def stats(self) -> dict:
+        with self._lock, self._connect() as conn:
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
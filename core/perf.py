@@ -0,0 +1,175 @@
+import io
+import json
+import time
+import cProfile
+import pstats
+import functools
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# Lightweight per-rerun instrumentation.
+# Spans are only recorded while a RunRecorder is active on the current thread
+# (one Streamlit rerun = one thread-bound run). Otherwise span()/traced cost one
+# thread-local lookup and return immediately.
+
+_local = threading.local()
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("recorder", "name", "args", "start", "depth")
+
+    def __init__(self, recorder: "RunRecorder", name: str, args: Optional[Dict[str, Any]]):
+        self.recorder = recorder
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.depth = self.recorder.depth
+        self.recorder.depth += 1
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.recorder.depth -= 1
+        self.recorder.events.append((self.name, self.start, end - self.start, self.depth, self.args))
+        return False
+
+class RunRecorder:
+    """Spans collected during one rerun, plus an optional cProfile capture."""
+    def __init__(self, label: str = "rerun", profile: bool = False):
+        self.label = label
+        self.events = [] # (name, start_ns, dur_ns, depth, args)
+        self.depth = 0
+        self.t0 = time.perf_counter_ns()
+        self.wall_ns = None
+        self.tid = threading.get_ident()
+        self.profiler = cProfile.Profile() if profile else None
+        self.profile_text = None
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Aggregated per span name, slowest first."""
+        agg = {}
+        for name, _, dur, _, _ in self.events:
+            row = agg.setdefault(name, {"span": name, "calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+            ms = dur / 1e6
+            row["calls"] += 1
+            row["total_ms"] += ms
+            row["max_ms"] = max(row["max_ms"], ms)
+        rows = sorted(agg.values(), key=lambda r: r["total_ms"], reverse=True)
+        for r in rows:
+            r["mean_ms"] = r["total_ms"] / r["calls"]
+        return rows
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace-event format (load in chrome://tracing or Perfetto)."""
+        events = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": f"EBDA {self.label}"}}]
+        if self.wall_ns is not None:
+            events.append({"name": self.label, "cat": "run", "ph": "X", "pid": 1, "tid": self.tid,
+                           "ts": 0.0, "dur": self.wall_ns / 1e3})
+        for name, start, dur, _, args in self.events:
+            ev = {"name": name, "cat": "span", "ph": "X", "pid": 1, "tid": self.tid,
+                  "ts": (start - self.t0) / 1e3, "dur": dur / 1e3}
+            if args:
+                ev["args"] = {k: str(v) for k, v in args.items()}
+            events.append(ev)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def chrome_trace_json(self) -> str:
+        return json.dumps(self.chrome_trace())
+
+def span(name: str, **args):
+    """Context manager timing a block: `with span("graphviz.render"): ...`"""
+    recorder = getattr(_local, "recorder", None)
+    if recorder is None:
+        return _NULL_SPAN
+    return _Span(recorder, name, args or None)
+
+def traced(name: str = None) -> Callable:
+    """Decorator form of span(); defaults to the function's qualified name."""
+    def decorator(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            recorder = getattr(_local, "recorder", None)
+            if recorder is None:
+                return fn(*args, **kwargs)
+            with _Span(recorder, label, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def current() -> Optional[RunRecorder]:
+    return getattr(_local, "recorder", None)
+
+def discard_run():
+    """Drop the active run without reporting it (e.g. one cut short by st.stop()/st.rerun())."""
+    previous = current()
+    _local.recorder = None
+    if previous is not None and previous.profiler is not None:
+        previous.profiler.disable()
+
+def start_run(label: str = "rerun", profile: bool = False) -> RunRecorder:
+    discard_run()
+    recorder = RunRecorder(label, profile)
+    _local.recorder = recorder
+    if recorder.profiler is not None:
+        recorder.profiler.enable()
+    return recorder
+
+def end_run(top: int = 30) -> Optional[RunRecorder]:
+    recorder = current()
+    if recorder is None:
+        return None
+    _local.recorder = None
+    if recorder.profiler is not None:
+        recorder.profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(recorder.profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        recorder.profile_text = out.getvalue()
+    recorder.wall_ns = time.perf_counter_ns() - recorder.t0
+    return recorder
+
+# --- Streamlit surface ---
+
+def begin_page_run(label: str) -> Optional[RunRecorder]:
+    """Sidebar toggles + start recording this rerun if enabled."""
+    import streamlit as st
+    with st.sidebar.expander("⏱️ Performance"):
+        enabled = st.checkbox("Record timings", key="perf_enabled")
+        profile = st.checkbox("Capture cProfile", key="perf_profile", disabled=not enabled)
+    if not enabled:
+        # Recording was switched off mid-run: stop collecting spans on this thread
+        discard_run()
+        return None
+    return start_run(label, profile=profile)
+
+def render_performance_panel():
+    """Close the active run and show its spans; call at the end of the page."""
+    recorder = end_run()
+    if recorder is None:
+        return
+    import streamlit as st
+    with st.expander(f"⏱️ Performance ({recorder.wall_ns / 1e6:.0f} ms)", expanded=False):
+        rows = recorder.summary()
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True,
+                         column_order=["span", "calls", "total_ms", "mean_ms", "max_ms"])
+        else:
+            st.caption("No instrumented spans ran during this rerun.")
+        st.download_button("Download Chrome trace (JSON)", recorder.chrome_trace_json(),
+                           f"ebda_trace_{recorder.label.replace(' ', '_')}.json", "application/json")
+        if recorder.profile_text:
+            st.caption("cProfile (cumulative)")
+            st.code(recorder.profile_text, language="text")
@@ -1,56 +1,183 @@
-from typing import List, Dict, Any, Tuple
-import math
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+import copy
+import numpy as np
+import pandas as pd
+from core.card_table import top_order
+from core.perf import traced
+from data.models import CriterionConfig
+
+# Methods usable on their own and inside the Composite ensemble (matched by substring,
+# so UI labels like "VIKOR (Compromise)" work)
+BASE_METHODS = ["SAW", "WASPAS", "TOPSIS", "VIKOR", "PROMETHEE", "ELECTRE"]
+DEFAULT_ENSEMBLE = ["SAW", "WASPAS", "TOPSIS"]
+# Scores depend on the other candidates (normalization, ideal points, pairwise comparisons)
+RELATIVE_METHODS = ["TOPSIS", "Composite", "VIKOR", "PROMETHEE", "ELECTRE"]
+# Card pairs compared per interactive run (~5 s of ELECTRE); repeated scorings
+# (Monte Carlo samples, scenarios) are capped or flagged against it
+PAIRWISE_INTERACTIVE_CELLS = 250_000_000
+
+# Decision matrix: one row per card, one column per criterion. The first three columns are
+# always the derived card inputs (weights from AppConfig.priority_weights, already on 0-1);
+# AppConfig.criteria adds columns read from DecisionCardConfig.criteria_values.
+BUILTIN_CRITERIA = [
+    CriterionConfig(id="impact", label="Impact"),
+    CriterionConfig(id="urgency", label="Urgency"),
+    CriterionConfig(id="uncertainty", label="Uncertainty", direction="cost"),
+]
+DIRECTIONS = ["benefit", "cost"]
+CRITERION_COLUMNS = ["id", "label", "weight", "direction", "min", "max"]
+
+def criteria_to_frame(criteria: List[CriterionConfig]) -> pd.DataFrame:
+    rows = [(c.id, c.label, c.weight, c.direction, c.range[0], c.range[1]) for c in criteria]
+    return pd.DataFrame(rows, columns=CRITERION_COLUMNS)
+
+def criteria_from_frame(df: pd.DataFrame) -> List[CriterionConfig]:
+    """Extra criteria from the editor table (rows without id are skipped). Raises ValueError naming the row."""
+    criteria = []
+    reserved = [c.id for c in BUILTIN_CRITERIA]
+    for i, row in enumerate(df.to_dict("records")):
+        cid = row.get("id")
+        if cid is None or pd.isna(cid) or not str(cid).strip():
+            continue
+        cid = str(cid).strip()
+        if cid in reserved or cid in [c.id for c in criteria]:
+            raise ValueError(f"row {i}: criterion id '{cid}' is already used")
+        direction = str(row.get("direction") or "benefit").strip().lower()
+        if direction not in DIRECTIONS:
+            raise ValueError(f"row {i}: unknown direction '{direction}', expected one of {DIRECTIONS}")
+        try:
+            weight, low, high = (float(row.get(k)) for k in ("weight", "min", "max"))
+        except (TypeError, ValueError):
+            raise ValueError(f"row {i}: weight/min/max must be numbers") from None
+        if np.isnan([weight, low, high]).any() or weight < 0 or not high > low:
+            raise ValueError(f"row {i}: need weight >= 0 and min < max")
+        label = row.get("label")
+        criteria.append(CriterionConfig(id=cid, label="" if label is None or pd.isna(label) else str(label),
+                                        weight=weight, direction=direction, range=[low, high]))
+    return criteria
 
 class PriorityCalculator:
-    def __init__(self, weights: Dict[str, float]):
-        self.w_impact = weights.get("impact", 1.0)
-        self.w_urgency = weights.get("urgency", 1.0)
-        self.w_uncertainty = weights.get("uncertainty", 1.0)
+    VIKOR_V = 0.5 # Weight of the group utility S vs. the individual regret R
+    PROMETHEE_Q = 0.05 # Indifference threshold (linear preference with indifference, on the 0-1 inputs)
+    PROMETHEE_P = 0.30 # Strict preference threshold
+    ELECTRE_CONCORDANCE = 0.65 # a outranks b if the weights where a >= b reach this ...
+    ELECTRE_DISCORDANCE = 0.35 # ... and b is nowhere better by more than this share of the range
+    PAIRWISE_BLOCK = 2_000_000 # Pairwise cells per block (ELECTRE never builds the n x n matrix)
+    ELECTRE_PATTERN_CRITERIA = 10 # Up to this many criteria, weight batches reuse the concordance patterns
 
-    # --- Individual (Stateless) Calculations ---
+    def __init__(self, weights: Dict[str, float], ensemble: List[str] = None, criteria: List[CriterionConfig] = None):
+        self.ensemble = list(ensemble or DEFAULT_ENSEMBLE)
+        unknown = [m for m in self.ensemble if m not in BASE_METHODS]
+        if unknown:
+            raise ValueError(f"Unknown ensemble method(s) {unknown}, expected from {BASE_METHODS}")
+
+        extra = list(criteria or [])
+        self.criteria = [c.model_copy(update={"weight": float(weights.get(c.id, 1.0))}) for c in BUILTIN_CRITERIA] + extra
+        self.criteria_ids = [c.id for c in self.criteria]
+        self.extra_ids = [c.id for c in extra]
+        duplicates = sorted({cid for cid in self.criteria_ids if self.criteria_ids.count(cid) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate criterion id(s) {duplicates}")
+        for c in extra:
+            if c.direction not in DIRECTIONS:
+                raise ValueError(f"Criterion '{c.id}': direction must be one of {DIRECTIONS}, got '{c.direction}'")
+            if len(c.range) != 2 or not c.range[1] > c.range[0]:
+                raise ValueError(f"Criterion '{c.id}': range must be [min, max] with min < max, got {c.range}")
+
+        self.weights = np.array([c.weight for c in self.criteria], dtype=float)
+        self.benefit = np.array([c.direction == "benefit" for c in self.criteria])
+        self.lower = np.array([c.range[0] for c in self.criteria], dtype=float)
+        self.upper = np.array([c.range[1] for c in self.criteria], dtype=float)
+
+    @property
+    def w_impact(self) -> float:
+        return float(self.weights[0])
+
+    @property
+    def w_urgency(self) -> float:
+        return float(self.weights[1])
+
+    @property
+    def w_uncertainty(self) -> float:
+        return float(self.weights[2])
+
+    def with_weights(self, weights: Sequence[float]) -> 'PriorityCalculator':
+        """Same criteria/ensemble, other weights (one per criterion)."""
+        other = copy.copy(self)
+        other.weights = np.asarray(weights, dtype=float)
+        return other
+
+    @staticmethod
+    def is_relative(method: str) -> bool:
+        """True when a card's score depends on the other cards (can't be scored row by row)."""
+        return any(m in method for m in RELATIVE_METHODS)
+
+    def uses_pairwise(self, method: str) -> bool:
+        """True when scoring compares every pair of cards (ELECTRE, on its own or in the ensemble)."""
+        return "ELECTRE" in method or ("Composite" in method and "ELECTRE" in self.ensemble)
+
+    # --- Decision matrix ---
+
+    def criteria_values(self, cards: List[Any]) -> np.ndarray:
+        """(cards, extra criteria) raw values from DecisionCardConfig.criteria_values (NaN = not set)."""
+        values = np.full((len(cards), len(self.extra_ids)), np.nan)
+        for j, cid in enumerate(self.extra_ids):
+            values[:, j] = [card.criteria_values.get(cid, np.nan) for card in cards]
+        return values
 
-    def calculate_saw(self, impact: float, urgency: float, uncertainty: float) -> Dict[str, Any]:
-        """Simple Additive Weighting (SAW)"""
-        impact = max(0.0, min(1.0, impact))
-        urgency = max(0.0, min(1.0, urgency))
-        uncertainty = max(0.0, min(1.0, uncertainty))
+    def decision_matrix(self, impact: Any, urgency: Any, uncertainty: Any, extra: np.ndarray = None) -> np.ndarray:
+        """Raw (..., criteria) matrix; extra = (..., extra criteria) values, None = none set."""
+        columns = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (impact, urgency, uncertainty)))
+        x = np.empty(columns[0].shape + (len(self.criteria_ids),))
+        for j, column in enumerate(columns):
+            x[..., j] = column
+        x[..., 3:] = np.nan if extra is None else extra
+        return x
 
-        term_impact = impact * self.w_impact
-        term_urgency = urgency * self.w_urgency
-        term_risk = uncertainty * self.w_uncertainty # Subtract this
+    def normalize(self, x: np.ndarray) -> np.ndarray:
+        """Raw values -> 0-1 over each criterion's range, clipped; unset (NaN) values sit in the middle."""
+        scaled = (x - self.lower) / (self.upper - self.lower)
+        if self.extra_ids: # Built-in inputs are always set
+            scaled[np.isnan(scaled)] = 0.5
+        return np.clip(scaled, 0.0, 1.0, out=scaled)
 
-        score = term_impact + term_urgency - term_risk
+    def _unit_weights(self) -> np.ndarray:
+        w_sum = self.weights.sum()
+        return self.weights / w_sum if w_sum else np.full(len(self.weights), 1.0 / len(self.weights))
+
+    # --- Individual (Stateless) Calculations ---
+
+    def calculate_saw(self, impact: float, urgency: float, uncertainty: float, extra: Dict[str, float] = None) -> Dict[str, Any]:
+        """Simple Additive Weighting (SAW); extra = raw values of the extra criteria by id"""
+        row = self._row(impact, urgency, uncertainty, extra)
+
+        # Benefit criteria add their term, cost criteria (uncertainty) subtract it
+        score = 0.0
+        breakdown = {}
+        for cid, value, w, benefit in zip(self.criteria_ids, row.tolist(), self.weights.tolist(), self.benefit.tolist()):
+            term = value * w
+            score = score + term if benefit else score - term
+            breakdown[f"{cid}_term"] = term if benefit else -term
 
         return {
             "score": score,
-            "breakdown": {
-                "impact_term": term_impact,
-                "urgency_term": term_urgency,
-                "uncertainty_term": -term_risk
-            },
-            "inputs": {"impact": impact, "urgency": urgency, "uncertainty": uncertainty}
+            "breakdown": breakdown,
+            "inputs": dict(zip(self.criteria_ids, row.tolist()))
         }
 
-    def calculate_waspas(self, impact: float, urgency: float, uncertainty: float) -> Dict[str, Any]:
+    def calculate_waspas(self, impact: float, urgency: float, uncertainty: float, extra: Dict[str, float] = None) -> Dict[str, Any]:
         """WASPAS (Weighted Aggregated Sum Product Assessment)"""
         # 1. Base SAW
-        saw_res = self.calculate_saw(impact, urgency, uncertainty)
+        saw_res = self.calculate_saw(impact, urgency, uncertainty, extra)
         saw_score = saw_res["score"]
-        
-        # 2. WPM (Weighted Product Model)
-        eps = 0.01
-        certainty = 1.0 - uncertainty
-        
-        term1 = max(eps, impact) ** self.w_impact
-        term2 = max(eps, urgency) ** self.w_urgency
-        term3 = max(eps, certainty) ** self.w_uncertainty
-        
-        wpm_score = term1 * term2 * term3
-        
+
+        # 2. WPM (Weighted Product Model), cost criteria enter as 1 - value (certainty)
+        wpm_score = float(self._wpm(self._row(impact, urgency, uncertainty, extra)))
+
         # 3. Combine
         lambda_val = 0.5
         waspas_score = (lambda_val * saw_score) + ((1 - lambda_val) * wpm_score)
-        
+
         return {
             "score": waspas_score,
             "method": "WASPAS",
@@ -58,13 +185,22 @@ class PriorityCalculator:
             "breakdown": saw_res["breakdown"]
         }
 
+    def _row(self, impact: float, urgency: float, uncertainty: float, extra: Dict[str, float] = None) -> np.ndarray:
+        extra = extra or {}
+        values = [extra.get(cid, np.nan) for cid in self.extra_ids]
+        return self.normalize(self.decision_matrix(impact, urgency, uncertainty, np.array(values, dtype=float)))
+
     # --- Batch Ranking (Stateful/Relative) ---
 
-    def rank_candidates(self, candidates: List[Dict[str, Any]], method: str = "SAW") -> List[Dict[str, Any]]:
+    @traced("priority.rank_candidates")
+    def rank_candidates(self, candidates: List[Dict[str, Any]], method: str = "SAW", top_k: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Rank a full list of candidates.
-        Candidates must have: 'id', 'impact', 'urgency', 'uncertainty'.
-        Returns list with added 'score' and 'rank' keys.
+        Candidates must have: 'id', 'impact', 'urgency', 'uncertainty'
+        (+ optional 'criteria': {criterion id: value} for the extra criteria).
+        Returns list with added 'score' and '_details' keys, best first.
+        top_k: return only the k best (the other candidates get their 'score', but are not sorted
+        and get no '_details').
         """
         # Sanitization
         processed = []
@@ -77,156 +213,288 @@ class PriorityCalculator:
         if not processed:
              return []
 
+        # Same matrix computation as rank_table, details per row
+        extra = np.array([[c.get('criteria', {}).get(cid, np.nan) for cid in self.extra_ids] for c in processed], dtype=float)
+        x = self.decision_matrix([c['impact'] for c in processed], [c['urgency'] for c in processed],
+                                 [c['uncertainty'] for c in processed], extra.reshape(len(processed), len(self.extra_ids)))
+        score, aux = self.score_matrix(x, method)
+        for c, value in zip(processed, score.tolist()):
+            c['score'] = value
+
+        # Descending by score, ties in input order (as a stable list sort)
+        ranked = []
+        for i in top_order(score, len(processed) if top_k is None else top_k).tolist():
+            processed[i]['_details'] = self._details(method, x[i], aux, i)
+            ranked.append(processed[i])
+        return ranked
+
+    # --- Columnar ranking (CardTable) ---
+
+    def score_arrays(self, impact: np.ndarray, urgency: np.ndarray, uncertainty: np.ndarray,
+                     method: str = "SAW", extra: np.ndarray = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """score_matrix for the three card inputs (+ extra criteria columns)."""
+        return self.score_matrix(self.decision_matrix(impact, urgency, uncertainty, extra), method)
+
+    def score_matrix(self, x: np.ndarray, method: str = "SAW") -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Raw decision matrix (cards, criteria) -> (score per card, per-method extras).
+        SAW / WASPAS score rows independently, so x may carry leading batch axes (..., cards, criteria).
+        """
+        if x.shape[-2] == 0:
+            return np.zeros(x.shape[:-1]), {}
+        return self._score(self.normalize(x), method)
+
+    def _score(self, x: np.ndarray, method: str) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
         if "TOPSIS" in method:
-            return self._calculate_topsis_batch(processed)
-        elif "Composite" in method:
-            return self._calculate_composite_batch(processed)
-        elif "WASPAS" in method:
-            # WASPAS is technically independent per row in this impl, but treating as batch for consistency
-            for c in processed:
-                res = self.calculate_waspas(c['impact'], c['urgency'], c['uncertainty'])
-                c['score'] = res['score']
-                c['_details'] = res
-        else:
-            # SAW Default
-            for c in processed:
-                res = self.calculate_saw(c['impact'], c['urgency'], c['uncertainty'])
-                c['score'] = res['score']
-                c['_details'] = res
-
-        # Sort descending by score
-        processed.sort(key=lambda x: x['score'], reverse=True)
-        return processed
-
-    def _calculate_topsis_batch(self, candidates: List[Dict]) -> List[Dict]:
+            return self._topsis_arrays(x)
+        if "Composite" in method:
+            return self._composite_arrays(x)
+        if "VIKOR" in method:
+            return self._vikor_arrays(x)
+        if "PROMETHEE" in method:
+            return self._promethee_arrays(x)
+        if "ELECTRE" in method:
+            return self._electre_arrays(x)
+        saw = self._saw(x)
+        if "WASPAS" in method:
+            return 0.5 * saw + 0.5 * self._wpm(x), {}
+        return saw, {}
+
+    def _saw(self, x: np.ndarray) -> np.ndarray:
+        # Column by column, so every row sums its terms in criterion order (same value as calculate_saw)
+        terms = x * np.where(self.benefit, self.weights, -self.weights)
+        score = terms[..., 0]
+        for j in range(1, terms.shape[-1]):
+            score = score + terms[..., j]
+        return score
+
+    def _wpm(self, x: np.ndarray) -> np.ndarray:
+        eps = 0.01
+        return np.prod(np.maximum(eps, np.where(self.benefit, x, 1.0 - x)) ** self.weights, axis=-1)
+
+    def _topsis_arrays(self, x: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        # Vector normalization per criterion, then weights
+        denom = np.sqrt((x * x).sum(axis=0))
+        m = np.divide(x, denom, out=np.zeros_like(x), where=denom != 0) * self._unit_weights()
+
+        # Benefit criteria: max ideal, cost criteria (uncertainty): min ideal
+        high, low = m.max(axis=0), m.min(axis=0)
+        ideal = np.where(self.benefit, high, low)
+        anti = np.where(self.benefit, low, high)
+        d_pos = np.sqrt(((m - ideal) ** 2).sum(axis=1))
+        d_neg = np.sqrt(((m - anti) ** 2).sum(axis=1))
+        total = d_pos + d_neg
+        score = np.divide(d_neg, total, out=np.zeros_like(total), where=total != 0)
+        return score, {"S+": d_pos, "S-": d_neg}
+
+    def _composite_arrays(self, x: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Average rank over the ensemble members, score = 1 - avg_rank / n."""
+        n = len(x)
+        aux = {}
+        for method in self.ensemble:
+            score, _ = self._score(x, method)
+            rank = np.empty(n, dtype=np.int64)
+            rank[np.argsort(-score, kind="stable")] = np.arange(n)
+            aux[f"rank_{method}"] = rank
+        avg_rank = sum(aux[f"rank_{m}"] for m in self.ensemble) / float(len(self.ensemble))
+        aux["avg_rank"] = avg_rank
+        return np.maximum(0.0, 1.0 - avg_rank / n) if n else np.zeros(0), aux
+
+    # --- Compromise / outranking methods (columnar only) ---
+
+    def _oriented(self, x: np.ndarray) -> np.ndarray:
+        """Decision matrix with cost criteria negated, so that higher is better everywhere."""
+        return np.where(self.benefit, x, -x)
+
+    def _vikor_arrays(self, x: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """VIKOR: Q mixes group utility S and individual regret R (lower Q = better); score = 1 - Q."""
+        x, w = self._oriented(x), self._unit_weights()
+        best, worst = x.max(axis=0), x.min(axis=0)
+        spread = best - worst
+        gaps = np.divide(best - x, spread, out=np.zeros_like(x), where=spread != 0) * w
+        s, r = gaps.sum(axis=1), gaps.max(axis=1)
+
+        def scaled(v):
+            span = v.max() - v.min()
+            return (v - v.min()) / span if span else np.zeros_like(v)
+
+        q = self.VIKOR_V * scaled(s) + (1 - self.VIKOR_V) * scaled(r)
+        return 1.0 - q, {"S": s, "R": r, "Q": q}
+
+    def _pairwise_blocks(self, n: int):
+        """Row slices so that one (rows x n) block stays under PAIRWISE_BLOCK cells."""
+        rows = max(1, self.PAIRWISE_BLOCK // max(n, 1))
+        for start in range(0, n, rows):
+            yield slice(start, min(n, start + rows))
+
+    def _promethee_arrays(self, x: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
         """
-        Technique for Order of Preference by Similarity to Ideal Solution (TOPSIS)
+        PROMETHEE II net flow, linear preference with indifference q and preference p:
+        P(d) = 0 for d <= q, (d - q) / (p - q) up to p, 1 beyond. Flows are additive over
+        criteria and P is piecewise linear, so sum_b P(x_a - x_b) per criterion comes from
+        the sorted values and their prefix sums (n log n, no pairwise matrix at all).
         """
-        if not candidates: return []
-        
-        # 1. Weights
-        # We have 3 criteria: Impact (+), Urgency (+), Uncertainty (-)
-        # Uncertainty is negative, but in TOPSIS usually all are benefit/cost.
-        # We treat Uncertainty as COST criteria.
-        
-        # Construct decision matrix
-        # Columns: [Impact, Urgency, Uncertainty]
-        start_impacts = [c['impact'] for c in candidates]
-        start_urgencies = [c['urgency'] for c in candidates]
-        start_uncertainties = [c['uncertainty'] for c in candidates]
-        
-        # Norm weights
-        w_sum = self.w_impact + self.w_urgency + self.w_uncertainty
-        w1 = self.w_impact / w_sum if w_sum else 0.33
-        w2 = self.w_urgency / w_sum if w_sum else 0.33
-        w3 = self.w_uncertainty / w_sum if w_sum else 0.33
-        
-        # 2. Vector Normalization (x / sqrt(sum(x^2)))
-        def normalize_vec(vec):
-            denom = math.sqrt(sum(x*x for x in vec))
-            return [x/denom if denom else 0 for x in vec]
-
-        # Since inputs are 0-1, denom works.
-        norm_imp = normalize_vec(start_impacts)
-        norm_urg = normalize_vec(start_urgencies)
-        norm_unc = normalize_vec(start_uncertainties)
-        
-        # 3. Weighted Normalized Matrix
-        weighted_imp = [x * w1 for x in norm_imp]
-        weighted_urg = [x * w2 for x in norm_urg]
-        weighted_unc = [x * w3 for x in norm_unc]
-        
-        # 4. Determine Ideal (A*) and Negative-Ideal (A-) Solutions
-        # Impact/Urgency = Benefit (Max is best)
-        # Uncertainty = Cost (Min is best)
-        
-        ideal_imp = max(weighted_imp) if weighted_imp else 0
-        ideal_urg = max(weighted_urg) if weighted_urg else 0
-        ideal_unc = min(weighted_unc) if weighted_unc else 0 # Cost -> Min is ideal
-        
-        neg_ideal_imp = min(weighted_imp) if weighted_imp else 0
-        neg_ideal_urg = min(weighted_urg) if weighted_urg else 0
-        neg_ideal_unc = max(weighted_unc) if weighted_unc else 0 # Cost -> Max is worst
-        
-        # 5. Calculate Separation Measures
-        for i, c in enumerate(candidates):
-            # Distance to Ideal (S+)
-            d_pos = math.sqrt(
-                (weighted_imp[i] - ideal_imp)**2 +
-                (weighted_urg[i] - ideal_urg)**2 +
-                (weighted_unc[i] - ideal_unc)**2
-            )
-            # Distance to Negative Ideal (S-)
-            d_neg = math.sqrt(
-                (weighted_imp[i] - neg_ideal_imp)**2 +
-                (weighted_urg[i] - neg_ideal_urg)**2 +
-                (weighted_unc[i] - neg_ideal_unc)**2
-            )
-            
-            # 6. Relative Closeness (C*)
-            # Score = S- / (S+ + S-)
-            if (d_pos + d_neg) == 0:
-                score = 0
+        x = self._oriented(x)
+        n = len(x)
+        plus, minus = self._promethee_flows(x)
+        w = self._unit_weights()
+        phi_plus, phi_minus = plus @ w, minus @ w
+        if n > 1:
+            phi_plus /= n - 1
+            phi_minus /= n - 1
+        phi = phi_plus - phi_minus
+        return phi, {"phi+": phi_plus, "phi-": phi_minus}
+
+    def _promethee_flows(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Unweighted per-criterion sums (sum_b P(x_a - x_b), sum_b P(x_b - x_a)), each (n, criteria)."""
+        n = len(x)
+        q, p = self.PROMETHEE_Q, self.PROMETHEE_P
+        plus, minus = np.zeros(x.shape), np.zeros(x.shape)
+        for j in range(x.shape[1]):
+            v = x[:, j]
+            xs = np.sort(v)
+            prefix = np.concatenate(([0.0], np.cumsum(xs)))
+            # a preferred to b: d = v_a - x_b; full preference for x_b <= v_a - p, linear part above
+            full = np.searchsorted(xs, v - p, side="right")
+            part = np.searchsorted(xs, v - q, side="left")
+            plus[:, j] = full + ((part - full) * (v - q) - (prefix[part] - prefix[full])) / (p - q)
+            # b preferred to a: d = x_b - v_a
+            full = n - np.searchsorted(xs, v + p, side="left")
+            part = np.searchsorted(xs, v + q, side="right")
+            top = n - full
+            minus[:, j] = full + ((prefix[top] - prefix[part]) - (top - part) * (v + q)) / (p - q)
+        return plus, minus
+
+    def _electre_arrays(self, x: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        ELECTRE-style outranking: a S b when the concordance (weight of criteria with a >= b)
+        reaches ELECTRE_CONCORDANCE and no criterion vetoes it (b better by more than
+        ELECTRE_DISCORDANCE of that criterion's range). Score = (outranks - outranked_by) / (n - 1).
+        The outranking matrix is built in row blocks: row sums count 'outranks', column sums 'outranked_by'.
+        Up to 16 criteria the concordant set is a bit pattern per pair looked up in a table;
+        beyond that the concordant weights are summed per block.
+        """
+        x, w = self._oriented(x), self._unit_weights()
+        n, k = x.shape
+        threshold = self.ELECTRE_CONCORDANCE - 1e-12
+        veto = self.ELECTRE_DISCORDANCE * (x.max(axis=0) - x.min(axis=0))
+        code_type = np.uint8 if k <= 8 else np.uint16 if k <= 16 else None
+        if code_type is not None:
+            # Lookup: pattern of concordant criteria -> concordance reached
+            patterns = np.arange(2 ** k)
+            bits = (patterns[:, None] >> np.arange(k)) & 1
+            concordant = bits @ w >= threshold
+        outranks, outranked = np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+        for rows in self._pairwise_blocks(n):
+            shape = (rows.stop - rows.start, n)
+            vetoed = np.zeros(shape, dtype=bool)
+            flag = np.empty(shape, dtype=bool)
+            if code_type is not None:
+                code = np.zeros(shape, dtype=code_type)
             else:
-                score = d_neg / (d_pos + d_neg)
-            
-            c['score'] = score
-            c['_details'] = {
-                "method": "TOPSIS",
-                "S+": d_pos,
-                "S-": d_neg
-            }
-            
-        candidates.sort(key=lambda x: x['score'], reverse=True)
-        return candidates
-
-    def _calculate_composite_batch(self, candidates: List[Dict]) -> List[Dict]:
+                weight = np.zeros(shape)
+            for j in range(k):
+                np.greater_equal.outer(x[rows, j], x[:, j], out=flag)
+                if code_type is np.uint8:
+                    code |= flag.view(np.uint8) << np.uint8(j)
+                elif code_type is not None:
+                    code |= flag.astype(code_type) << code_type(j)
+                else:
+                    np.add(weight, w[j], out=weight, where=flag)
+                np.less.outer(x[rows, j] + veto[j], x[:, j], out=flag) # b better by more than the veto
+                vetoed |= flag
+            s = np.take(concordant, code) if code_type is not None else weight >= threshold
+            s &= ~vetoed
+            outranks[rows] = np.count_nonzero(s, axis=1)
+            outranked += np.count_nonzero(s, axis=0)
+        # The diagonal (a card compared with itself) always "outranks"
+        outranks -= 1
+        outranked -= 1
+        net = (outranks - outranked) / (n - 1) if n > 1 else np.zeros(n)
+        return net, {"outranks": outranks, "outranked_by": outranked}
+
+    def _electre_patterns(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Composite Rank: Aggregates ranks from SAW, WASPAS, and TOPSIS.
-        Using Borda Count or Average Rank.
+        Weight-independent part of ELECTRE on a normalized matrix (at most ELECTRE_PATTERN_CRITERIA
+        criteria): the concordant-criteria bit patterns that occur among non-vetoed pairs (a, b), a != b,
+        and per card how often each one occurs as a minus how often as b (balance). For weights w,
+        outranks - outranked_by = balance @ (patterns @ w >= threshold), same as _electre_arrays.
+        Only the patterns that occur get a column, so memory is (cards, U) rather than (cards, 2**criteria).
+        Returns (patterns (U, criteria) 0/1, balance (cards, U)).
         """
-        # Create copies to run independent rankings
-        import copy
-        
-        # Run SAW
-        c_saw = self.rank_candidates(copy.deepcopy(candidates), method="SAW")
-        # Map ID to Rank (0-indexed)
-        rank_map_saw = {x['id']: i for i, x in enumerate(c_saw)}
-        
-        # Run WASPAS
-        c_waspas = self.rank_candidates(copy.deepcopy(candidates), method="WASPAS")
-        rank_map_waspas = {x['id']: i for i, x in enumerate(c_waspas)}
-        
-        # Run TOPSIS
-        c_topsis = self.rank_candidates(copy.deepcopy(candidates), method="TOPSIS")
-        rank_map_topsis = {x['id']: i for i, x in enumerate(c_topsis)}
-        
-        # Aggregate
-        # Lower rank is better (0=1st place)
-        # Score = 1 / (1 + AvgRank) to normalize to 0-1ish for display, or just inverted rank sum.
-        # Let's use simple Borda score: Points = (N - Rank). Sum points.
-        N = len(candidates)
-        
-        for c in candidates:
-            cid = c['id']
-            r1 = rank_map_saw.get(cid, N)
-            r2 = rank_map_waspas.get(cid, N)
-            r3 = rank_map_topsis.get(cid, N)
-            
-            avg_rank = (r1 + r2 + r3) / 3.0
-            
-            # Normalize to a score 0-1 for compatibility with visualizers
-            # A rank of 0 (best) should give score near 1.
-            # A rank of N (worst) should give score near 0.
-            # Linear interp: Score = 1 - (Rank / N)
-            score = 1.0 - (avg_rank / N) if N > 0 else 0
-            
-            c['score'] = max(0.0, score)
-            c['_details'] = {
-                "method": "Composite",
-                "ranks": {"SAW": r1+1, "WASPAS": r2+1, "TOPSIS": r3+1},
-                "avg_rank": avg_rank + 1
-            }
-            
-        candidates.sort(key=lambda x: x['score'], reverse=True)
-        return candidates
+        x = self._oriented(x)
+        n, k = x.shape
+        veto = self.ELECTRE_DISCORDANCE * (x.max(axis=0) - x.min(axis=0))
+        column = np.full(2 ** k, -1, dtype=np.int64) # Pattern code -> balance column, in order of first occurrence
+        codes: List[int] = []
+        balance = np.zeros((n, 0), dtype=np.int64)
+        for rows in self._pairwise_blocks(n):
+            shape = (rows.stop - rows.start, n)
+            code = np.zeros(shape, dtype=np.int64)
+            vetoed = np.zeros(shape, dtype=bool)
+            flag = np.empty(shape, dtype=bool)
+            for j in range(k):
+                np.greater_equal.outer(x[rows, j], x[:, j], out=flag)
+                code |= flag.astype(np.int64) << j
+                np.less.outer(x[rows, j] + veto[j], x[:, j], out=flag)
+                vetoed |= flag
+            local = np.arange(shape[0])
+            vetoed[local, local + rows.start] = True # Not compared with itself
+            keep = ~vetoed
+            a = np.broadcast_to(local[:, None], shape)[keep]
+            b = np.broadcast_to(np.arange(n), shape)[keep]
+            code = code[keep]
+            new = np.flatnonzero((np.bincount(code, minlength=2 ** k) > 0) & (column < 0))
+            if len(new):
+                column[new] = np.arange(len(codes), len(codes) + len(new))
+                codes.extend(new.tolist())
+                balance = np.pad(balance, ((0, 0), (0, len(new))))
+            u = len(codes)
+            col = column[code]
+            balance[rows] += np.bincount(a * u + col, minlength=shape[0] * u).reshape(shape[0], u)
+            balance -= np.bincount(b * u + col, minlength=n * u).reshape(n, u)
+        patterns = ((np.array(codes, dtype=np.int64)[:, None] >> np.arange(k)) & 1).astype(float)
+        return patterns, balance.astype(np.int32) # |balance| < cards
+
+    @staticmethod
+    def _pairwise_details(method: str, aux: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+        if "VIKOR" in method:
+            return {"method": "VIKOR", "S": float(aux["S"][i]), "R": float(aux["R"][i]), "Q": float(aux["Q"][i])}
+        if "PROMETHEE" in method:
+            return {"method": "PROMETHEE II", "phi+": float(aux["phi+"][i]), "phi-": float(aux["phi-"][i])}
+        return {"method": "ELECTRE", "outranks": int(aux["outranks"][i]), "outranked_by": int(aux["outranked_by"][i])}
+
+    def _details(self, method: str, row: np.ndarray, aux: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+        """'_details' of one card from its raw decision matrix row and the method extras."""
+        if "TOPSIS" in method:
+            return {"method": "TOPSIS", "S+": float(aux["S+"][i]), "S-": float(aux["S-"][i])}
+        if "Composite" in method:
+            ranks = {m: int(aux[f"rank_{m}"][i]) + 1 for m in self.ensemble}
+            return {"method": "Composite", "ranks": ranks, "avg_rank": float(aux["avg_rank"][i]) + 1}
+        if any(m in method for m in ("VIKOR", "PROMETHEE", "ELECTRE")):
+            return self._pairwise_details(method, aux, i)
+        values = row.tolist()
+        extra = dict(zip(self.extra_ids, values[3:]))
+        if "WASPAS" in method:
+            return self.calculate_waspas(*values[:3], extra)
+        return self.calculate_saw(*values[:3], extra)
+
+    def table_matrix(self, table: Any) -> np.ndarray:
+        """Raw decision matrix of a CardTable (extra criteria from the card configs)."""
+        return self.decision_matrix(table.impact, table.urgency, table.uncertainty, self.criteria_values(table.cards))
+
+    @traced("priority.rank_table")
+    def rank_table(self, table: Any, method: str = "SAW", top_k: Optional[int] = None) -> Any:
+        """
+        Score and order a CardTable in place (same scores/order as rank_candidates).
+        top_k: only the k best rows are ordered now (see CardTable.head / rank_of).
+        """
+        score, aux = self.score_matrix(self.table_matrix(table), method)
+        table.set_ranking(score, method, aux, self, top_k)
+        return table
+
+    def score_details(self, table: Any, i: int) -> Dict[str, Any]:
+        """rank_candidates' '_details' for one row, rebuilt from the table."""
+        row = self.decision_matrix(table.impact[i], table.urgency[i], table.uncertainty[i],
+                                   self.criteria_values([table.cards[i]])[0])
+        return self._details(table.method or "SAW", row, table.aux, i)
@@ -0,0 +1,155 @@
+import os
+import json
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from data.models import AppConfig
+from core.io import ConfigLoader
+from core.decision import DecisionEngine
+from core.priority import PriorityCalculator
+from core.scoring import DriverItemMatrix
+from core.visualizer import CausalVisualizer
+
+# Process-wide registry of immutable, config-derived artifacts shared by all sessions
+# (st.cache_resource semantics, but reference counted per config hash).
+# Per-session mutable state (simulation sliders, overrides) lives on each session's
+# own AppConfig and is excluded from the hash.
+
+# Card fields edited per session; they never affect the shared artifacts (nor do scenarios)
+MUTABLE_CARD_FIELDS = {"simulation_impact", "simulation_urgency", "manual_override_reason", "manual_override_status"}
+
+def config_hash(config: AppConfig) -> str:
+    data = config.model_dump(mode="json", exclude={"decision_cards": {"__all__": MUTABLE_CARD_FIELDS}, "scenarios": True})
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+class ConfigArtifacts:
+    """Everything derived from one config; treat as read-only."""
+    def __init__(self, config_hash: str, config: AppConfig):
+        self.config_hash = config_hash
+        self.config = config # Private copy owned by the registry
+        self.engine = DecisionEngine()
+        self.engine.compile_rules(config.decision_cards)
+        self.priority_calc = PriorityCalculator(config.priority_weights, ensemble=config.ranking_ensemble, criteria=config.criteria)
+        self.driver_matrix = DriverItemMatrix(config.drivers)
+        self.visualizer = CausalVisualizer(config.drivers, config.decision_cards)
+
+class ArtifactHandle:
+    """
+    A session's reference to shared artifacts. Released explicitly or when
+    garbage collected (e.g. the session's state is dropped).
+    """
+    def __init__(self, artifacts: ConfigArtifacts):
+        self.artifacts = artifacts
+        self.config_hash = artifacts.config_hash
+        self._finalizer = weakref.finalize(self, ArtifactRegistry._release, artifacts.config_hash)
+
+    def release(self):
+        self._finalizer()
+
+    @property
+    def released(self) -> bool:
+        return not self._finalizer.alive
+
+    def __getattr__(self, name: str):
+        return getattr(self.artifacts, name)
+
+class ArtifactRegistry:
+    _lock = threading.RLock()
+    _entries: Dict[str, list] = {} # hash -> [ConfigArtifacts, refcount]
+    _idle: "OrderedDict[str, None]" = OrderedDict() # refcount 0, oldest first
+    _max_idle = 4 # Unreferenced artifact sets kept for quick re-acquire
+    _configs: Dict[str, Tuple[Tuple[int, int], AppConfig]] = {} # path -> (file signature, parsed config)
+    _services: Dict[str, Any] = {}
+
+    @classmethod
+    def acquire(cls, config: AppConfig, key: str = None) -> ArtifactHandle:
+        key = key or config_hash(config)
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                entry = [ConfigArtifacts(key, config.model_copy(deep=True)), 0]
+                cls._entries[key] = entry
+            entry[1] += 1
+            cls._idle.pop(key, None)
+            return ArtifactHandle(entry[0])
+
+    @classmethod
+    def _release(cls, key: str):
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            cls._idle[key] = None
+            while len(cls._idle) > cls._max_idle:
+                old, _ = cls._idle.popitem(last=False)
+                cls._entries.pop(old, None)
+
+    @classmethod
+    def load_config(cls, path: str) -> AppConfig:
+        """Parse a config file once per (mtime, size); each caller gets its own mutable copy."""
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with cls._lock:
+            cached = cls._configs.get(path)
+            if cached is None or cached[0] != signature:
+                cached = (signature, ConfigLoader(path).load_config())
+                cls._configs[path] = cached
+            return cached[1].model_copy(deep=True)
+
+    @classmethod
+    def service(cls, name: str, factory: Callable[[], Any]) -> Any:
+        """Process-wide singleton (audit logger, snapshot manager...)."""
+        with cls._lock:
+            if name not in cls._services:
+                cls._services[name] = factory()
+            return cls._services[name]
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        with cls._lock:
+            return {
+                "artifacts": {k: e[1] for k, e in cls._entries.items()},
+                "idle": list(cls._idle),
+                "configs": list(cls._configs),
+                "services": list(cls._services),
+            }
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+            cls._idle.clear()
+            cls._configs.clear()
+            cls._services.clear()
+
+def config_changed(session_state: Any):
+    """Call after editing the session's config in place (drivers, cards, weights, criteria...)."""
+    session_state["_config_edits"] = session_state.get("_config_edits", 0) + 1
+
+def session_config_hash(session_state: Any, config: AppConfig) -> str:
+    """config_hash, recomputed only when the config object is replaced or config_changed() was called."""
+    edits = session_state.get("_config_edits", 0)
+    cached = session_state.get("_config_hash")
+    if cached is not None and cached[0] is config and cached[1] == edits:
+        return cached[2]
+    key = config_hash(config)
+    session_state["_config_hash"] = (config, edits, key)
+    return key
+
+def session_artifacts(session_state: Any, config: AppConfig) -> ArtifactHandle:
+    """The handle stored in this session; re-acquired when the session's config structure changes."""
+    key = session_config_hash(session_state, config)
+    handle: Optional[ArtifactHandle] = session_state.get("_artifact_handle")
+    if handle is not None and handle.config_hash == key and not handle.released:
+        return handle
+    if handle is not None:
+        handle.release()
+    handle = ArtifactRegistry.acquire(config, key)
+    session_state["_artifact_handle"] = handle
+    return handle
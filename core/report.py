@@ -1,19 +1,23 @@
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 from typing import List, Dict, Any
 from datetime import datetime
 import io
+from core.perf import traced
 
 class ReportGenerator:
     def __init__(self, config: Any):
         self.config = config
 
+    @traced("report.generate_docx")
     def generate_docx(self, wave_data: Dict[str, Any], decision_states: List[Any], snapshot_id: str) -> io.BytesIO:
         """
         Generates a DOCX report summarizing the decision wave.
+        decision_states: every card, highest priority first.
         Returns bytes buffer.
         """
+        # python-docx is only needed when a report is actually exported
+        from docx import Document
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+
         doc = Document()
         
         # 1. Title
@@ -0,0 +1,227 @@
+import re
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List
+from pydantic import TypeAdapter, ValidationError
+from data.models import DecisionCardConfig, RuleConfig, CardStatus
+
+# Serialization of card rules in CSV.
+# - json:   one JSON array per 'rules' cell, e.g.
+#           [{"condition":"x < 3","status":"RED","message":"Low: act | now"}]
+#           Unambiguous (':' and '|' are plain text); parsed per cell by pydantic's
+#           JSON tokenizer, which validates the rules in the same pass.
+# - legacy: 'condition:STATUS[:message] | ...' ('\|' for a literal pipe). Still read,
+#           picked per cell by auto-detection; conditions can't contain ':'.
+# - long:   separate rules CSV, one row per rule (card_id, order, condition, status, message).
+# Bad rules are reported (row, column, card id) instead of dropped or defaulted.
+
+RULE_FORMATS = ["auto", "json", "legacy"]
+LONG_RULE_COLUMNS = ["card_id", "order", "condition", "status", "message"]
+LEGACY_SEPARATOR = r"(?<!\\)\|" # '|' not preceded by a backslash
+
+_RULES_ADAPTER = TypeAdapter(List[RuleConfig])
+_STATUS_VALUES = [s.value for s in CardStatus]
+
+class RuleFormatError(ValueError):
+    """
+    All rule problems of one import. errors: [{"row", "column", "id", "error"}],
+    row being the 0-based position in the parsed frame.
+    """
+    MAX_LISTED = 10
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        self.errors = errors
+        lines = [f"row {e['row']} (id={e['id']}), column '{e['column']}': {e['error']}" for e in errors[:self.MAX_LISTED]]
+        if len(errors) > self.MAX_LISTED:
+            lines.append(f"... and {len(errors) - self.MAX_LISTED} more")
+        super().__init__(f"{len(errors)} invalid rule(s): " + "; ".join(lines))
+
+def _issue(row: int, column: str, card_id: Any, error: str) -> Dict[str, Any]:
+    return {"row": int(row), "column": column, "id": str(card_id), "error": error}
+
+# --- Writing ---
+
+def rules_to_json(rules: List[RuleConfig]) -> str:
+    return _RULES_ADAPTER.dump_json(rules).decode("utf-8")
+
+def _escape_legacy(text: str) -> str:
+    return text.replace("|", "\\|")
+
+def rules_to_legacy(rules: List[RuleConfig]) -> str:
+    return "|".join(f"{_escape_legacy(r.condition)}:{r.status.value}:{_escape_legacy(r.message)}" for r in rules)
+
+def rules_to_long(cards: List[DecisionCardConfig]) -> pd.DataFrame:
+    rows = [(c.id, i, r.condition, r.status.value, r.message) for c in cards for i, r in enumerate(c.rules)]
+    return pd.DataFrame(rows, columns=LONG_RULE_COLUMNS)
+
+# --- Reading ---
+
+def detect_rule_format(text: str) -> str:
+    """'json' for a JSON array cell, else 'legacy' (legacy conditions never start with '[')."""
+    return "json" if text.lstrip().startswith("[") else "legacy"
+
+def _json_errors(e: ValidationError) -> List[str]:
+    out = []
+    for err in e.errors(include_url=False):
+        loc = err["loc"]
+        if not loc:
+            out.append(err["msg"])
+        else:
+            where = [f"rule {loc[0] + 1}" if isinstance(loc[0], int) else str(loc[0])]
+            where += [".".join(str(x) for x in loc[1:])] if len(loc) > 1 else []
+            out.append(f"{' '.join(where)}: {err['msg']}")
+    return out
+
+def parse_json_cell(text: str) -> List[RuleConfig]:
+    """Raises ValidationError (invalid JSON, unknown status, missing field)."""
+    return _RULES_ADAPTER.validate_json(text)
+
+def parse_legacy_cell(text: str) -> List[RuleConfig]:
+    """Scalar legacy parser (streamed rows). Raises ValueError naming the bad segment."""
+    rules = []
+    for segment in re.split(LEGACY_SEPARATOR, text):
+        if not segment.strip():
+            continue
+        parts = segment.split(':', 2)
+        if len(parts) < 2:
+            raise ValueError(f"'{segment.strip()}': expected condition:STATUS[:message]")
+        cond = parts[0].strip().replace("\\|", "|")
+        stat = parts[1].strip().upper()
+        if not cond:
+            raise ValueError(f"'{segment.strip()}': empty condition")
+        if stat not in _STATUS_VALUES:
+            raise ValueError(f"'{segment.strip()}': unknown status '{parts[1].strip()}'")
+        msg = parts[2].strip().replace("\\|", "|") if len(parts) > 2 else f"Rule triggered: {cond}"
+        rules.append(RuleConfig(condition=cond, status=CardStatus(stat), message=msg))
+    return rules
+
+def parse_rules_cell(text: str, rules_format: str = "auto") -> List[RuleConfig]:
+    """One 'rules' cell in either format; raises ValueError with a readable message."""
+    if not text.strip():
+        return []
+    fmt = detect_rule_format(text) if rules_format == "auto" else rules_format
+    if fmt == "json":
+        try:
+            return parse_json_cell(text)
+        except ValidationError as e:
+            raise ValueError("; ".join(_json_errors(e))) from None
+    return parse_legacy_cell(text)
+
+def group_by_row(values: List[Any], rows: np.ndarray, n: int) -> List[List[Any]]:
+    """Regroup exploded values (rows ascending, 0..n-1) into one list per row via offsets."""
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n)))).tolist()
+    return [values[offsets[i]:offsets[i + 1]] for i in range(n)]
+
+def _parse_legacy_column(col: pd.Series, ids: List[str], column: str, errors: List[Dict[str, Any]]) -> List[List[RuleConfig]]:
+    """Vectorized legacy parsing; col has a RangeIndex of length len(ids)."""
+    segments = col.str.split(LEGACY_SEPARATOR, regex=True).explode().str.strip()
+    segments = segments[segments.notna() & (segments != "")]
+    parts = segments.str.split(':', n=2, expand=True).reindex(columns=[0, 1, 2])
+    no_status, no_message = parts[1].isna(), parts[2].isna()
+    parts = parts.where(parts.notna(), "").astype(str) # All-missing columns would be float
+    conds = parts[0].str.strip().str.replace("\\|", "|", regex=False)
+    stats = parts[1].str.strip().str.upper()
+    msgs = parts[2].str.strip().str.replace("\\|", "|", regex=False)
+    msgs = msgs.where(~no_message, "Rule triggered: " + conds)
+
+    bad = no_status | (conds == "") | ~stats.isin(_STATUS_VALUES)
+    if bad.any():
+        for row, seg, missing, cond, raw in zip(segments.index[bad], segments[bad], no_status[bad], conds[bad], parts[1][bad]):
+            if missing:
+                error = "expected condition:STATUS[:message]"
+            elif cond == "":
+                error = "empty condition"
+            else:
+                error = f"unknown status '{raw.strip()}'"
+            errors.append(_issue(row, column, ids[row], f"'{seg}': {error}"))
+        return []
+
+    rules = _RULES_ADAPTER.validate_python([
+        {"condition": c, "status": s, "message": m}
+        for c, s, m in zip(conds.tolist(), stats.tolist(), msgs.tolist())
+    ])
+    return group_by_row(rules, segments.index.to_numpy(), len(col))
+
+def parse_rule_column(col: pd.Series, ids: List[str], rules_format: str = "auto", column: str = "rules") -> List[List[RuleConfig]]:
+    """
+    Rules per row of a 'rules' column (str, RangeIndex, '' for empty cells).
+    rules_format 'auto' picks json/legacy per cell. Raises RuleFormatError listing every bad cell.
+    """
+    if rules_format not in RULE_FORMATS:
+        raise ValueError(f"Unknown rules format '{rules_format}', expected one of {RULE_FORMATS}")
+    n = len(col)
+    result: List[List[RuleConfig]] = [[] for _ in range(n)]
+    errors: List[Dict[str, Any]] = []
+
+    if rules_format == "auto":
+        is_json = col.str.lstrip().str.startswith("[").to_numpy(dtype=bool)
+    else:
+        is_json = np.full(n, rules_format == "json")
+
+    # JSON cells: one tokenize+validate pass each
+    texts = col.tolist()
+    for row in np.flatnonzero(is_json).tolist():
+        if not texts[row].strip():
+            continue
+        try:
+            result[row] = parse_json_cell(texts[row])
+        except ValidationError as e:
+            errors.extend(_issue(row, column, ids[row], msg) for msg in _json_errors(e))
+
+    legacy_rows = np.flatnonzero(~is_json)
+    if len(legacy_rows):
+        legacy_ids = [ids[i] for i in legacy_rows.tolist()]
+        legacy_errors: List[Dict[str, Any]] = []
+        parsed = _parse_legacy_column(col.iloc[legacy_rows].reset_index(drop=True), legacy_ids, column, legacy_errors)
+        for e in legacy_errors:
+            e["row"] = int(legacy_rows[e["row"]])
+        errors.extend(legacy_errors)
+        for row, rules in zip(legacy_rows.tolist(), parsed):
+            result[row] = rules
+
+    if errors:
+        raise RuleFormatError(sorted(errors, key=lambda e: e["row"]))
+    return result
+
+def rules_from_long(df: pd.DataFrame, card_ids: List[str]) -> List[List[RuleConfig]]:
+    """
+    Rules per card (aligned with card_ids) from a long-format rules frame.
+    'order' is optional (file order otherwise); missing message cells become ''.
+    """
+    missing = [c for c in ("card_id", "condition", "status", "message") if c not in df.columns]
+    if missing:
+        raise ValueError(f"Rules CSV is missing column(s): {', '.join(missing)}")
+    df = df.reset_index(drop=True)
+    n = len(df)
+    position = {cid: i for i, cid in enumerate(card_ids)}
+
+    ids = df["card_id"].where(df["card_id"].notna(), "").astype(str).str.strip()
+    conds = df["condition"].where(df["condition"].notna(), "").astype(str).str.strip()
+    stats = df["status"].where(df["status"].notna(), "").astype(str).str.strip().str.upper()
+    msgs = df["message"].where(df["message"].notna(), "").astype(str).str.strip()
+    if "order" in df.columns:
+        order = pd.to_numeric(df["order"], errors="coerce")
+    else:
+        order = pd.Series(np.arange(n), dtype=float)
+    card_pos = ids.map(position)
+
+    errors: List[Dict[str, Any]] = []
+    checks = [
+        ("card_id", card_pos.isna(), lambda i: f"unknown card '{ids[i]}'"),
+        ("condition", conds == "", lambda i: "empty condition"),
+        ("status", ~stats.isin(_STATUS_VALUES), lambda i: f"unknown status '{df['status'][i]}'"),
+        ("order", order.isna(), lambda i: f"invalid order '{df['order'][i]}'"),
+    ]
+    for column, mask, describe in checks:
+        for i in np.flatnonzero(mask.to_numpy(dtype=bool)).tolist():
+            errors.append(_issue(i, column, ids[i], describe(i)))
+    if errors:
+        raise RuleFormatError(sorted(errors, key=lambda e: e["row"]))
+
+    # Stable sort by (card, order): rules with equal order keep file order
+    sort = np.lexsort((order.to_numpy(), card_pos.to_numpy(dtype=np.int64)))
+    rules = _RULES_ADAPTER.validate_python([
+        {"condition": c, "status": s, "message": m}
+        for c, s, m in zip(conds.to_numpy()[sort].tolist(), stats.to_numpy()[sort].tolist(), msgs.to_numpy()[sort].tolist())
+    ])
+    return group_by_row(rules, card_pos.to_numpy(dtype=np.int64)[sort], len(card_ids))
@@ -0,0 +1,277 @@
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from core.card_table import STATUS_CODES, STATUS_INDEX
+from core.perf import traced
+from core.scoring import _STATUS_IMPACT, _URGENCY_KEYWORDS
+from data.models import CardStatus, DecisionCardConfig, EvidencePerturbation, ScenarioConfig
+
+# What-if scenarios: named perturbations of the evidence context, evaluated for all
+# scenarios at once. Every rule condition is evaluated once with per-scenario value
+# arrays (scenarios vectorized); first-match / missing-evidence / impact / urgency are
+# then resolved as (cards x rules x scenarios) array ops, and ranking runs per scenario
+# with the columnar PriorityCalculator scores. Row 0 of a batch is always the baseline.
+
+PERTURBATION_OPS = ["add", "mul", "set"]
+BASELINE = "Baseline"
+SCENARIO_COLUMNS = ["scenario", "description", "variable", "op", "value"]
+
+_NO_KEYWORD = len(_URGENCY_KEYWORDS)
+_KEYWORD_URGENCY = np.array([u for _, u in _URGENCY_KEYWORDS] + [0.5])
+_IMPACT_BY_CODE = np.array([_STATUS_IMPACT.get(s.value, 0.5) for s in STATUS_CODES])
+
+def _keyword_rank(text: str) -> int:
+    """Index of the first urgency keyword found in text (prepare_candidates priority order)."""
+    text = text.lower()
+    for k, (keyword, _) in enumerate(_URGENCY_KEYWORDS):
+        if keyword in text:
+            return k
+    return _NO_KEYWORD
+
+def apply_perturbations(context: Dict[str, float], perturbations: Sequence[EvidencePerturbation]) -> Dict[str, float]:
+    """Scalar reference: the evidence context one scenario evaluates against."""
+    ctx = dict(context)
+    for p in perturbations:
+        if p.op == "set":
+            ctx[p.variable] = p.value
+        elif p.variable in ctx:
+            # add/mul on absent evidence leave it absent (card stays UNKNOWN)
+            ctx[p.variable] = ctx[p.variable] + p.value if p.op == "add" else ctx[p.variable] * p.value
+    return ctx
+
+# --- Storage as a flat table (one row per perturbation) ---
+
+def scenarios_to_frame(scenarios: List[ScenarioConfig]) -> pd.DataFrame:
+    rows = []
+    for s in scenarios:
+        if not s.perturbations:
+            rows.append((s.name, s.description, None, None, None))
+        rows.extend((s.name, s.description, p.variable, p.op, p.value) for p in s.perturbations)
+    return pd.DataFrame(rows, columns=SCENARIO_COLUMNS)
+
+def scenarios_from_frame(df: pd.DataFrame) -> List[ScenarioConfig]:
+    """Rows grouped by scenario name (first description wins). Raises ValueError naming the row."""
+    scenarios: Dict[str, ScenarioConfig] = {}
+    for i, row in enumerate(df.to_dict("records")):
+        name = row.get("scenario")
+        if name is None or pd.isna(name) or not str(name).strip():
+            continue
+        name = str(name).strip()
+        if name == BASELINE:
+            raise ValueError(f"row {i}: '{BASELINE}' is reserved")
+        desc = row.get("description")
+        scenario = scenarios.setdefault(name, ScenarioConfig(name=name, description="" if desc is None or pd.isna(desc) else str(desc)))
+        variable = row.get("variable")
+        if variable is None or pd.isna(variable) or not str(variable).strip():
+            continue # Scenario without perturbations (placeholder)
+        op = str(row.get("op") or "add").strip().lower()
+        if op not in PERTURBATION_OPS:
+            raise ValueError(f"row {i}: unknown op '{op}', expected one of {PERTURBATION_OPS}")
+        try:
+            value = float(row.get("value"))
+        except (TypeError, ValueError):
+            raise ValueError(f"row {i}: value '{row.get('value')}' is not a number") from None
+        if np.isnan(value):
+            raise ValueError(f"row {i}: missing value")
+        scenario.perturbations.append(EvidencePerturbation(variable=str(variable).strip(), op=op, value=value))
+    return list(scenarios.values())
+
+class ScenarioBatch:
+    """Results of one run. Arrays are (scenarios, cards); row 0 is the baseline."""
+    def __init__(self, names: List[str], cards: List[DecisionCardConfig], status: np.ndarray,
+                 matched_rule: np.ndarray, score: np.ndarray, ranks: np.ndarray, method: str):
+        self.names = names
+        self.cards = cards
+        self.ids = [c.id for c in cards]
+        self.status = status
+        self.matched_rule = matched_rule
+        self.score = score
+        self.ranks = ranks # 0-based
+        self.method = method
+
+    def index(self, name: str) -> int:
+        return self.names.index(name)
+
+    def summary(self) -> pd.DataFrame:
+        """One row per scenario: how many cards changed status/rank against the baseline."""
+        red = STATUS_INDEX[CardStatus.RED]
+        changed = self.status != self.status[0]
+        shift = self.ranks[0] - self.ranks # > 0: moved up
+        return pd.DataFrame({
+            "scenario": self.names,
+            "status_changes": changed.sum(axis=1),
+            "to_red": (changed & (self.status == red)).sum(axis=1),
+            "from_red": (changed & (self.status[0] == red)).sum(axis=1),
+            "rank_changes": (shift != 0).sum(axis=1),
+            "max_rank_up": shift.max(axis=1, initial=0),
+            "max_rank_down": -shift.min(axis=1, initial=0),
+            "mean_score": self.score.mean(axis=1) if self.score.shape[1] else np.zeros(len(self.names)),
+        })
+
+    def changes(self, scenario: Any, only_changed: bool = True) -> pd.DataFrame:
+        """Per-card status/rank change of one scenario (name or row), biggest movers first."""
+        s = self.index(scenario) if isinstance(scenario, str) else int(scenario)
+        shift = self.ranks[0] - self.ranks[s]
+        df = pd.DataFrame({
+            "id": self.ids,
+            "title": [c.title for c in self.cards],
+            "status_baseline": [STATUS_CODES[c].value for c in self.status[0].tolist()],
+            "status": [STATUS_CODES[c].value for c in self.status[s].tolist()],
+            "rank_baseline": self.ranks[0] + 1,
+            "rank": self.ranks[s] + 1,
+            "rank_change": shift,
+            "score_baseline": self.score[0],
+            "score": self.score[s],
+        })
+        if only_changed:
+            df = df[(df["status"] != df["status_baseline"]) | (df["rank_change"] != 0)]
+        order = np.lexsort((df["rank"].to_numpy(), -np.abs(df["rank_change"].to_numpy())))
+        return df.iloc[order].reset_index(drop=True)
+
+class ScenarioEngine:
+    """Vectorized what-if evaluation on top of a (shared) DecisionEngine + PriorityCalculator."""
+    def __init__(self, decision_engine: Any, priority_calc: Any, max_cells: int = 20_000_000):
+        self.engine = decision_engine
+        self.calc = priority_calc
+        self.max_cells = max_cells # Bound on cards x rules x scenarios per chunk
+
+    def _variable_matrix(self, context: Dict[str, float], scenarios: List[ScenarioConfig]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """(names, values[var, scenario], present[var, scenario]); column 0 is the baseline."""
+        names = list(dict.fromkeys(list(context) + [p.variable for s in scenarios for p in s.perturbations]))
+        row = {name: k for k, name in enumerate(names)}
+        n_s = len(scenarios) + 1
+        values = np.full((len(names), n_s), np.nan)
+        present = np.zeros((len(names), n_s), dtype=bool)
+        for name, value in context.items():
+            values[row[name]] = value
+            present[row[name]] = True
+        for j, scenario in enumerate(scenarios, start=1):
+            for p in scenario.perturbations:
+                k = row[p.variable]
+                if p.op == "set":
+                    values[k, j] = p.value
+                    present[k, j] = True
+                elif present[k, j]:
+                    values[k, j] = values[k, j] + p.value if p.op == "add" else values[k, j] * p.value
+        return names, values, present
+
+    def _evaluate_conditions(self, conditions: List[str], names: List[str], values: np.ndarray, present: np.ndarray) -> np.ndarray:
+        """bool[condition, scenario]; a failing condition never matches (as in DecisionEngine)."""
+        n_s = values.shape[1]
+        row = {name: k for k, name in enumerate(names)}
+        everywhere = {name for name, k in row.items() if present[k].all()}
+        arrays = {name: values[row[name]] for name in everywhere}
+        result = np.zeros((len(conditions), n_s), dtype=bool)
+        scalar_contexts = None
+        for c, condition in enumerate(conditions):
+            try:
+                code = self.engine._compile(condition)
+            except Exception as e:
+                print(f"Error evaluating rule '{condition}': {e}")
+                continue
+            if set(code.co_names) <= everywhere:
+                try:
+                    # Raise on x/0 etc. so those scenarios get the scalar semantics (no match)
+                    with np.errstate(all="raise"):
+                        hit = np.asarray(eval(code, {"__builtins__": {}}, arrays))
+                    if hit.shape in ((), (n_s,)):
+                        result[c] = hit.astype(bool)
+                        continue
+                except Exception:
+                    pass # e.g. 'a < x < b' / and/or on arrays: fall back to scalar eval
+            if scalar_contexts is None:
+                scalar_contexts = [
+                    {name: float(values[k, s]) for name, k in row.items() if present[k, s]}
+                    for s in range(n_s)
+                ]
+            for s, ctx in enumerate(scalar_contexts):
+                try:
+                    result[c, s] = bool(eval(code, {"__builtins__": {}}, ctx))
+                except Exception:
+                    pass
+        return result
+
+    @traced("scenario.run")
+    def run(self, cards: List[DecisionCardConfig], context: Dict[str, float], scenarios: List[ScenarioConfig],
+            quality_penalty: float = 0.0, method: str = "SAW") -> ScenarioBatch:
+        names, values, present = self._variable_matrix(context, scenarios)
+        status, matched, score, ranks = self.evaluate(cards, names, values, present, quality_penalty, method)
+        return ScenarioBatch([BASELINE] + [s.name for s in scenarios], cards, status, matched, score, ranks, method)
+
+    def evaluate(self, cards: List[DecisionCardConfig], names: List[str], values: np.ndarray, present: np.ndarray,
+                 quality_penalty: float = 0.0, method: str = "SAW") -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evidence given as values/present[variable, column] (one column per scenario or sample)
+        -> (status, matched_rule, score, ranks), each (columns, cards).
+        """
+        n, n_s = len(cards), values.shape[1]
+        required = [list(c.required_evidence.get('drivers', [])) + list(c.required_evidence.get('kpis', [])) for c in cards]
+        known = set(names)
+        absent_names = [v for v in dict.fromkeys(v for req in required for v in req) if v not in known]
+        if absent_names:
+            names = list(names) + absent_names
+            values = np.vstack([values, np.full((len(absent_names), n_s), np.nan)])
+            present = np.vstack([present, np.zeros((len(absent_names), n_s), dtype=bool)])
+        var_row = {name: k for k, name in enumerate(names)}
+
+        # Card x rule layout (padding points at an extra never-true condition / always-present variable)
+        conditions = list(dict.fromkeys(r.condition for c in cards for r in c.rules))
+        cond_row = {cond: k for k, cond in enumerate(conditions)}
+        max_rules = max((len(c.rules) for c in cards), default=0)
+        max_req = max((len(r) for r in required), default=0)
+        rule_cond = np.full((n, max_rules), len(conditions), dtype=np.int64)
+        rule_status = np.zeros((n, max_rules), dtype=np.int8)
+        rule_keyword = np.full((n, max_rules), _NO_KEYWORD, dtype=np.int64)
+        req_var = np.full((n, max_req), len(names), dtype=np.int64)
+        for i, card in enumerate(cards):
+            for j, rule in enumerate(card.rules):
+                rule_cond[i, j] = cond_row[rule.condition]
+                rule_status[i, j] = STATUS_INDEX[rule.status]
+                rule_keyword[i, j] = _keyword_rank(f"{rule.condition} ({rule.message})")
+            for j, name in enumerate(required[i]):
+                req_var[i, j] = var_row[name]
+        var_keyword = np.array([_keyword_rank(name) for name in names] + [_NO_KEYWORD])
+        sim_impact = np.array([np.nan if c.simulation_impact is None else c.simulation_impact for c in cards])
+        sim_urgency = np.array([np.nan if c.simulation_urgency is None else c.simulation_urgency for c in cards])
+
+        hits_by_cond = np.vstack([self._evaluate_conditions(conditions, names, values, present), np.zeros((1, n_s), dtype=bool)])
+        present_ext = np.vstack([present, np.ones((1, n_s), dtype=bool)])
+
+        status = np.empty((n_s, n), dtype=np.int8)
+        matched = np.empty((n_s, n), dtype=np.int16)
+        impact = np.empty((n_s, n))
+        urgency = np.empty((n_s, n))
+        chunk = max(1, self.max_cells // max(1, n * max(max_rules, max_req, 1)))
+        for start in range(0, n_s, chunk):
+            cols = slice(start, min(n_s, start + chunk))
+            hits = hits_by_cond[:, cols][rule_cond] # (cards, rules, scenarios)
+            any_hit = hits.any(axis=1)
+            first = hits.argmax(axis=1) if max_rules else np.zeros(any_hit.shape, dtype=np.int64)
+            absent = ~present_ext[:, cols][req_var] # (cards, required, scenarios)
+            missing = absent.any(axis=1)
+
+            rule_st = np.take_along_axis(rule_status, first, axis=1) if max_rules else np.zeros_like(first, dtype=np.int8)
+            st = np.where(missing, STATUS_INDEX[CardStatus.UNKNOWN], np.where(any_hit, rule_st, STATUS_INDEX[CardStatus.GREEN]))
+            mt = np.where(missing, self.engine.MISSING_EVIDENCE, np.where(any_hit, first, self.engine.NO_MATCH))
+
+            rule_kw = np.take_along_axis(rule_keyword, first, axis=1) if max_rules else np.full_like(first, _NO_KEYWORD)
+            missing_kw = np.where(absent, var_keyword[req_var][:, :, None], _NO_KEYWORD).min(axis=1, initial=_NO_KEYWORD)
+            kw = np.where(missing, missing_kw, np.where(any_hit, rule_kw, _NO_KEYWORD))
+
+            status[cols] = st.T
+            matched[cols] = mt.T
+            impact[cols] = np.where(np.isnan(sim_impact), _IMPACT_BY_CODE[st].T, sim_impact)
+            urgency[cols] = np.where(np.isnan(sim_urgency), _KEYWORD_URGENCY[kw].T, sim_urgency)
+
+        uncertainty = np.full((n_s, n), float(quality_penalty))
+        extra = self.calc.criteria_values(cards) # Config values, the same in every scenario
+        if self.calc.is_relative(method):
+            # Column normalization / rank aggregation is per scenario
+            score = np.vstack([self.calc.score_arrays(impact[s], urgency[s], uncertainty[s], method, extra)[0] for s in range(n_s)]) if n else np.zeros((n_s, 0))
+        else:
+            score = self.calc.score_arrays(impact, urgency, uncertainty, method, extra)[0] if n else np.zeros((n_s, 0))
+        order = np.argsort(-score, axis=1, kind="stable")
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.broadcast_to(np.arange(n), order.shape), axis=1)
+
+        return status, matched, score, ranks
@@ -1,7 +1,12 @@
-from typing import List, Dict, Any
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 import pandas as pd
 from data.models import DecisionCardConfig
+from core.perf import traced
+from core.card_table import CardTable, STATUS_INDEX
 
+@traced("scoring.compute_driver_scores")
 def compute_driver_scores(df: pd.DataFrame, drivers: List[Any]) -> Dict[str, float]:
     scores = {}
     if df is None: return scores
@@ -16,6 +21,81 @@ def compute_driver_scores(df: pd.DataFrame, drivers: List[Any]) -> Dict[str, flo
                 scores[driver.id] = 0.0
     return scores
 
+class DriverItemMatrix:
+    """
+    Driver x survey-item incidence matrix built once per config.
+    scores() matches compute_driver_scores (row mean over a driver's answered items,
+    then mean over respondents) with two matrix products instead of a loop per driver.
+    """
+    def __init__(self, drivers: List[Any]):
+        self.driver_ids = [d.id for d in drivers]
+        self.drivers = [SimpleNamespace(id=d.id, survey_items=list(d.survey_items)) for d in drivers]
+        self.items = list(dict.fromkeys(item for d in drivers for item in d.survey_items))
+        col = {item: j for j, item in enumerate(self.items)}
+        self.matrix = np.zeros((len(self.items), len(self.driver_ids)))
+        for i, d in enumerate(drivers):
+            for item in d.survey_items:
+                self.matrix[col[item], i] = 1.0
+        self.matrix.setflags(write=False) # Shared across sessions
+
+    def _row_means(self, df: pd.DataFrame) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        (row_means[respondent, driver], valid[respondent, driver], has_items[driver]), or None
+        when the frame has none of the items. Raises TypeError/ValueError on non-numeric answers.
+        """
+        present = [j for j, item in enumerate(self.items) if item in df.columns]
+        if not present:
+            return None
+        values = df[[self.items[j] for j in present]].to_numpy(dtype=float)
+
+        m = self.matrix[present]
+        answered = ~np.isnan(values)
+        sums = np.where(answered, values, 0.0) @ m
+        counts = answered.astype(float) @ m
+        with np.errstate(invalid="ignore", divide="ignore"):
+            row_means = sums / counts # NaN where a respondent answered none of the driver's items
+        return row_means, counts > 0, m.sum(axis=0) > 0
+
+    @traced("scoring.driver_matrix_scores")
+    def scores(self, df: pd.DataFrame) -> Dict[str, float]:
+        if df is None: return {}
+        try:
+            rows = self._row_means(df)
+        except (TypeError, ValueError):
+            # Non-numeric answers: fall back to the per-driver path (which scores them 0.0)
+            return compute_driver_scores(df, self.drivers)
+        if rows is None:
+            return {}
+
+        row_means, valid, has_items = rows
+        with np.errstate(invalid="ignore", divide="ignore"):
+            n_valid = valid.sum(axis=0)
+            totals = np.where(valid, row_means, 0.0).sum(axis=0)
+            means = totals / n_valid
+        return {d_id: float(means[i]) for i, d_id in enumerate(self.driver_ids) if has_items[i]}
+
+    def standard_errors(self, df: pd.DataFrame) -> Dict[str, float]:
+        """
+        Standard error of each driver score (sample std of the respondent means / sqrt(n)).
+        0.0 with fewer than two respondents; {} for non-numeric answers (no sampling model).
+        """
+        if df is None: return {}
+        try:
+            rows = self._row_means(df)
+        except (TypeError, ValueError):
+            return {}
+        if rows is None:
+            return {}
+
+        row_means, valid, has_items = rows
+        n_valid = valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(valid, row_means, 0.0).sum(axis=0) / n_valid
+            sq = np.where(valid, (row_means - means) ** 2, 0.0).sum(axis=0)
+            se = np.sqrt(sq / (n_valid - 1) / n_valid)
+        se = np.where(n_valid > 1, se, 0.0)
+        return {d_id: float(se[i]) for i, d_id in enumerate(self.driver_ids) if has_items[i]}
+
 def get_kpi_latest(df: pd.DataFrame, kpi_name: str) -> float:
     if df is None: return 0.0
     if kpi_name in df.columns:
@@ -23,6 +103,7 @@ def get_kpi_latest(df: pd.DataFrame, kpi_name: str) -> float:
         return df[kpi_name].iloc[-1]
     return 0.0
 
+@traced("scoring.prepare_candidates")
 def prepare_candidates(
     cards: List[DecisionCardConfig], 
     decision_engine: Any, 
@@ -74,8 +155,58 @@ def prepare_candidates(
             "impact": impact,
             "urgency": urgency,
             "uncertainty": quality_penalty,
+            "criteria": card.criteria_values,
             "_card": card,
             "_state": state
         })
         
     return candidates
+
+# Impact per status and evidence keywords -> urgency, as in prepare_candidates
+_STATUS_IMPACT = {"RED": 0.9, "YELLOW": 0.6, "GREEN": 0.3}
+_URGENCY_KEYWORDS = [("turnover", 0.9), ("overtime", 0.7), ("engagement", 0.6)]
+
+def _keyword_urgency(evidence: str) -> float:
+    evidence = evidence.lower()
+    for keyword, urgency in _URGENCY_KEYWORDS:
+        if keyword in evidence:
+            return urgency
+    return 0.5
+
+@traced("scoring.prepare_card_table")
+def prepare_card_table(
+    cards: List[DecisionCardConfig],
+    decision_engine: Any,
+    evidence_context: Dict[str, float],
+    quality_penalty: float
+) -> CardTable:
+    """
+    Same inputs/values as prepare_candidates, stored column-wise (see core.card_table).
+    No DecisionCardState is built here; rank with PriorityCalculator.rank_table().
+    """
+    n = len(cards)
+    status = np.empty(n, dtype=np.int8)
+    matched = np.empty(n, dtype=np.int16)
+    impact = np.empty(n)
+    urgency = np.empty(n)
+    missing_code = decision_engine.MISSING_EVIDENCE
+
+    for i, card in enumerate(cards):
+        card_status, rule_index = decision_engine.match(card, evidence_context)
+        status[i] = STATUS_INDEX[card_status]
+        matched[i] = rule_index
+
+        # Urgency from the evidence text the state would carry
+        if rule_index >= 0:
+            rule = card.rules[rule_index]
+            u = _keyword_urgency(f"{rule.condition} ({rule.message})")
+        elif rule_index == missing_code:
+            u = _keyword_urgency(" ".join(decision_engine.missing_evidence(card, evidence_context)))
+        else:
+            u = 0.5
+
+        impact[i] = card.simulation_impact if card.simulation_impact is not None else _STATUS_IMPACT.get(card_status.value, 0.5)
+        urgency[i] = card.simulation_urgency if card.simulation_urgency is not None else u
+
+    return CardTable(cards, status, matched, impact, urgency, np.full(n, float(quality_penalty)),
+                     context=evidence_context, engine=decision_engine)
@@ -3,6 +3,7 @@ import io
 import json
 from cryptography.fernet import Fernet
 import streamlit as st
+from core.settings_cache import CachedFileStore
 
 class SecurityManager:
     _key = None
@@ -25,42 +26,29 @@ class SecurityManager:
                 f.write(cls._key)
         return cls._key
 
+    @classmethod
+    def _store(cls) -> CachedFileStore:
+        # Decrypted secrets stay in process memory; revalidated by file mtime/size
+        def decrypt(raw: bytes) -> dict:
+            return json.loads(Fernet(cls._get_master_key()).decrypt(raw).decode())
+
+        def encrypt(data: dict) -> bytes:
+            return Fernet(cls._get_master_key()).encrypt(json.dumps(data).encode())
+
+        return CachedFileStore.for_path(cls._secrets_file, load_fn=decrypt, dump_fn=encrypt)
+
     @classmethod
     def save_api_key(cls, service: str, api_key: str):
-        key = cls._get_master_key()
-        f = Fernet(key)
-        
-        # Load existing
-        secrets = cls._load_secrets()
-        secrets[service] = api_key
-        
-        # Encrypt and Save
-        content = json.dumps(secrets).encode()
-        encrypted = f.encrypt(content)
-        
-        with open(cls._secrets_file, "wb") as file:
-            file.write(encrypted)
+        cls._store().set(service, api_key)
             
     @classmethod
     def get_api_key(cls, service: str) -> str:
-        secrets = cls._load_secrets()
-        return secrets.get(service, "")
+        return cls._store().get(service, "")
         
     @classmethod
     def _load_secrets(cls):
-        if not os.path.exists(cls._secrets_file):
-            return {}
-        
-        try:
-            key = cls._get_master_key()
-            f = Fernet(key)
-            with open(cls._secrets_file, "rb") as file:
-                encrypted = file.read()
-            decrypted = f.decrypt(encrypted)
-            return json.loads(decrypted.decode())
-        except Exception as e:
-            # Handle key mismatch or corruption
-            return {}
+        # Key mismatch or corruption is handled by the store (-> empty)
+        return cls._store().read()
 
     @classmethod
     def verify_keys_exist(cls):
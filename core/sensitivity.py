@@ -0,0 +1,293 @@
+from typing import Any, Dict, List, Optional
+import itertools
+import math
+import numpy as np
+import pandas as pd
+from core.perf import traced
+from core.priority import PAIRWISE_INTERACTIVE_CELLS, PriorityCalculator
+
+# Weight sensitivity of the ranking: the card inputs (decision matrix) are fixed, the
+# priority weights vary. Scores for many weight vectors are computed as (cards x weights)
+# arrays with the same formulas as PriorityCalculator.score_matrix (elementwise, so tied
+# cards stay tied exactly as in rank_table). Weight vectors are rows with one weight per
+# criterion, in PriorityCalculator.criteria_ids order (the built-in CRITERIA first).
+
+CRITERIA = ["impact", "urgency", "uncertainty"]
+
+def base_weights(weights: Dict[str, float], criteria: List[str] = None) -> np.ndarray:
+    return np.array([float(weights.get(k, 1.0)) for k in (criteria or CRITERIA)])
+
+def weight_grid(steps: int = 10, total: float = 3.0, k: int = 3) -> np.ndarray:
+    """All weight vectors on the simplex of k criteria with the given resolution (sum = total)."""
+    # Stars and bars: positions of the k - 1 separators among steps + k - 1 slots
+    bars = np.array(list(itertools.combinations(range(steps + k - 1), k - 1)), dtype=int).reshape(-1, k - 1)
+    edges = np.hstack([np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), steps + k - 1)])
+    return (np.diff(edges, axis=1) - 1).astype(float) * (total / steps)
+
+def grid_steps(k: int, max_points: int = 5000, limit: int = 60) -> int:
+    """Finest grid resolution (<= limit) whose weight_grid stays under max_points vectors."""
+    steps = limit
+    while steps > 1 and math.comb(steps + k - 1, k - 1) > max_points:
+        steps -= 1
+    return steps
+
+def sample_weights(n: int, weights: Any = None, concentration: Optional[float] = None,
+                   seed: Optional[int] = None) -> np.ndarray:
+    """
+    n Dirichlet samples of the simplex, scaled to the sum of `weights` (default 1/1/1).
+    weights: built-in weights by name, or one weight per criterion (PriorityCalculator.weights).
+    concentration=None samples uniformly; a value c samples around `weights` (alpha = c * w/sum(w)),
+    larger c = closer to the current weights.
+    """
+    base = np.asarray(weights, dtype=float) if weights is not None and not isinstance(weights, dict) else base_weights(weights or {})
+    total = base.sum()
+    rng = np.random.default_rng(seed)
+    alpha = np.ones(len(base)) if concentration is None else np.maximum(concentration * base / total, 1e-3)
+    return rng.dirichlet(alpha, size=n) * total
+
+def _ranks(score: np.ndarray) -> np.ndarray:
+    """0-based ranks per column (stable descending, as CardTable.set_ranking)."""
+    order = np.argsort(-score, axis=0, kind="stable")
+    ranks = np.empty(score.shape, dtype=np.int32)
+    np.put_along_axis(ranks, order, np.arange(score.shape[0], dtype=np.int32)[:, None], axis=0)
+    return ranks
+
+def _normalized(weights: np.ndarray) -> np.ndarray:
+    """Rows scaled to sum 1 (equal weights for an all-zero row), as PriorityCalculator._unit_weights."""
+    w_sum = weights.sum(axis=1)
+    safe = np.where(w_sum != 0, w_sum, 1.0)
+    return np.where(w_sum[:, None] != 0, weights / safe[:, None], 1.0 / weights.shape[1])
+
+def score_batch(impact: np.ndarray, urgency: np.ndarray, uncertainty: np.ndarray,
+                weights: np.ndarray, method: str = "SAW", ensemble: List[str] = None) -> np.ndarray:
+    """score_matrix_batch for the three built-in criteria only."""
+    calc = PriorityCalculator({}, ensemble)
+    return score_matrix_batch(calc, calc.decision_matrix(impact, urgency, uncertainty), weights, method)
+
+def score_matrix_batch(calc: PriorityCalculator, x: np.ndarray, weights: np.ndarray, method: str = "SAW",
+                       memo: Dict[str, Any] = None) -> np.ndarray:
+    """
+    (cards x weight vectors) scores of a raw decision matrix (cards x criteria) under calc's criteria
+    and ensemble; column j equals calc.with_weights(weights[j]).score_matrix(x, method).
+    ELECTRE's pairwise comparisons don't depend on the weights: they are counted once per matrix
+    (PriorityCalculator._electre_patterns) and kept in `memo` for further batches on the same x.
+    Beyond ELECTRE_PATTERN_CRITERIA criteria ELECTRE is scored per weight vector.
+    """
+    weights = np.asarray(weights, dtype=float)
+    if len(x) == 0:
+        return np.zeros((0, len(weights)))
+    return _batch(calc, calc.normalize(x), weights, method, {} if memo is None else memo)
+
+def per_vector(calc: PriorityCalculator, method: str) -> bool:
+    """True when score_matrix_batch runs the full pairwise comparison for every weight vector."""
+    return calc.uses_pairwise(method) and len(calc.criteria_ids) > calc.ELECTRE_PATTERN_CRITERIA
+
+def vector_budget(calc: PriorityCalculator, method: str, n_cards: int, requested: int) -> int:
+    """Weight vectors for an interactive run: all requested, unless each one needs its own pairwise pass."""
+    if not per_vector(calc, method) or n_cards < 2:
+        return requested
+    return min(requested, max(1, PAIRWISE_INTERACTIVE_CELLS // (n_cards * n_cards)))
+
+def _batch(calc: PriorityCalculator, x: np.ndarray, weights: np.ndarray, method: str, memo: Dict[str, Any]) -> np.ndarray:
+    n, k = x.shape
+    m = len(weights)
+
+    if "TOPSIS" in method:
+        # Weighted normalized column j is w_j * v_j with w_j >= 0, so the ideal/anti-ideal
+        # points are w_j * max/min(v_j) and the distances factor per weight vector.
+        w = _normalized(weights)
+        denom = np.sqrt((x * x).sum(axis=0))
+        v = np.divide(x, denom, out=np.zeros_like(x), where=denom != 0)
+        d_pos, d_neg = np.zeros((n, m)), np.zeros((n, m))
+        for j in range(k):
+            col = v[:, j][:, None] * w[:, j]
+            high, low = col.max(axis=0), col.min(axis=0)
+            best, worst = (high, low) if calc.benefit[j] else (low, high)
+            d_pos += (col - best) ** 2
+            d_neg += (col - worst) ** 2
+        d_pos, d_neg = np.sqrt(d_pos), np.sqrt(d_neg)
+        total = d_pos + d_neg
+        return np.divide(d_neg, total, out=np.zeros_like(total), where=total != 0)
+    if "Composite" in method:
+        avg = sum(_ranks(_batch(calc, x, weights, member, memo)) for member in calc.ensemble) / float(len(calc.ensemble))
+        return np.maximum(0.0, 1.0 - avg / n)
+    if "PROMETHEE" in method:
+        # Per-criterion flows don't depend on the weights
+        plus, minus = calc._promethee_flows(calc._oriented(x))
+        w = _normalized(weights)
+        phi_plus, phi_minus = plus @ w.T, minus @ w.T
+        if n > 1:
+            phi_plus /= n - 1
+            phi_minus /= n - 1
+        return phi_plus - phi_minus
+    if "VIKOR" in method:
+        x = calc._oriented(x)
+        w = _normalized(weights)
+        best, worst = x.max(axis=0), x.min(axis=0)
+        spread = best - worst
+        unweighted = np.divide(best - x, spread, out=np.zeros_like(x), where=spread != 0)
+        s, r = np.zeros((n, m)), np.zeros((n, m))
+        for j in range(k):
+            gap = unweighted[:, j][:, None] * w[:, j]
+            s += gap
+            r = np.maximum(r, gap)
+        span_s, span_r = s.max(axis=0) - s.min(axis=0), r.max(axis=0) - r.min(axis=0)
+        q = (calc.VIKOR_V * np.divide(s - s.min(axis=0), span_s, out=np.zeros_like(s), where=span_s != 0)
+             + (1 - calc.VIKOR_V) * np.divide(r - r.min(axis=0), span_r, out=np.zeros_like(r), where=span_r != 0))
+        return 1.0 - q
+    if "ELECTRE" in method:
+        if k > calc.ELECTRE_PATTERN_CRITERIA:
+            return np.column_stack([calc.with_weights(w)._score(x, method)[0] for w in weights])
+        if "electre" not in memo:
+            memo["electre"] = calc._electre_patterns(x)
+        patterns, balance = memo["electre"]
+        concordant = (patterns @ _normalized(weights).T >= calc.ELECTRE_CONCORDANCE - 1e-12).astype(float)
+        net = balance @ concordant # Exact: integer counts
+        return net / (n - 1) if n > 1 else np.zeros((n, m))
+
+    # SAW / WASPAS: terms summed (multiplied) in criterion order, as PriorityCalculator._saw / _wpm
+    signed = np.where(calc.benefit, weights, -weights)
+    saw = x[:, 0][:, None] * signed[:, 0]
+    for j in range(1, k):
+        saw = saw + x[:, j][:, None] * signed[:, j]
+    if "WASPAS" in method:
+        eps = 0.01
+        oriented = np.maximum(eps, np.where(calc.benefit, x, 1.0 - x))
+        wpm = oriented[:, 0][:, None] ** weights[:, 0]
+        for j in range(1, k):
+            wpm = wpm * oriented[:, j][:, None] ** weights[:, j]
+        return 0.5 * saw + 0.5 * wpm
+    return saw
+
+class SensitivityResult:
+    """Per-card rank statistics over the sampled weight vectors (ranks 1-based in to_frame)."""
+    def __init__(self, ids: List[str], titles: List[str], base_rank: np.ndarray, method: str, top_k: int, n_weights: int):
+        n = len(ids)
+        self.ids = ids
+        self.titles = titles
+        self.base_rank = base_rank
+        self.method = method
+        self.top_k = top_k
+        self.n_weights = n_weights
+        self.rank_min = np.full(n, n, dtype=np.int64)
+        self.rank_max = np.zeros(n, dtype=np.int64)
+        self._sum = np.zeros(n)
+        self._sq = np.zeros(n)
+        self._top = np.zeros(n, dtype=np.int64)
+        self._same = np.zeros(n, dtype=np.int64)
+
+    def _add(self, ranks: np.ndarray):
+        self.rank_min = np.minimum(self.rank_min, ranks.min(axis=1, initial=len(self.ids)))
+        self.rank_max = np.maximum(self.rank_max, ranks.max(axis=1, initial=0))
+        self._sum += ranks.sum(axis=1)
+        self._sq += (ranks.astype(np.float64) ** 2).sum(axis=1)
+        self._top += (ranks < self.top_k).sum(axis=1)
+        self._same += (ranks == self.base_rank[:, None]).sum(axis=1)
+
+    @property
+    def rank_mean(self) -> np.ndarray:
+        return self._sum / max(self.n_weights, 1)
+
+    @property
+    def rank_std(self) -> np.ndarray:
+        return np.sqrt(np.maximum(self._sq / max(self.n_weights, 1) - self.rank_mean ** 2, 0.0))
+
+    @property
+    def top_k_probability(self) -> np.ndarray:
+        return self._top / max(self.n_weights, 1)
+
+    @property
+    def rank_stability(self) -> np.ndarray:
+        """Share of weight vectors that keep the card at its current rank."""
+        return self._same / max(self.n_weights, 1)
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame({
+            "id": self.ids,
+            "title": self.titles,
+            "rank": self.base_rank + 1,
+            "rank_min": self.rank_min + 1,
+            "rank_max": self.rank_max + 1,
+            "rank_mean": self.rank_mean + 1,
+            "rank_std": self.rank_std,
+            f"p_top_{self.top_k}": self.top_k_probability,
+            "p_same_rank": self.rank_stability,
+        })
+        return df.sort_values("rank", kind="stable").reset_index(drop=True)
+
+class WeightSensitivity:
+    """Rank stability of a ranked CardTable under changes of the priority weights."""
+    def __init__(self, priority_calc: Any, chunk: int = 256):
+        self.calc = priority_calc
+        self.chunk = chunk # Weight vectors per (cards x chunk) block
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self.calc.weights
+
+    @traced("sensitivity.sweep")
+    def sweep(self, table: Any, weights: np.ndarray, method: str = None, top_k: int = 10) -> SensitivityResult:
+        """Rank every card for every weight vector (rows of `weights`); table must be ranked."""
+        method = method or table.method or "SAW"
+        result = SensitivityResult(table.ids, [c.title for c in table.cards], table.ranks, method, top_k, len(weights))
+        x = self.calc.table_matrix(table)
+        memo = {}
+        for start in range(0, len(weights), self.chunk):
+            result._add(_ranks(score_matrix_batch(self.calc, x, weights[start:start + self.chunk], method, memo)))
+        return result
+
+    @traced("sensitivity.critical_changes")
+    def critical_changes(self, table: Any, method: str = None, pairs: Optional[int] = None, steps: int = 200) -> pd.DataFrame:
+        """
+        For each pair of adjacent cards in the current order (top `pairs` pairs, default all):
+        the smallest change of a single weight that puts the lower card above the upper one.
+        SAW is linear in the weights, so its thresholds are exact; the other methods scan
+        `steps` values per weight in [-w, +sum(w)] (thresholds at that resolution).
+        delta_<criterion> is NaN when no change of that weight (keeping it >= 0) flips the pair.
+        """
+        method = method or table.method or "SAW"
+        order = table.order
+        n_pairs = max(len(order) - 1, 0) if pairs is None else min(pairs, max(len(order) - 1, 0))
+        upper, lower = order[:n_pairs], order[1:n_pairs + 1]
+        w = self.weights
+        criteria = self.calc.criteria_ids
+        raw = self.calc.table_matrix(table)
+        deltas = np.full((n_pairs, len(w)), np.nan)
+
+        if n_pairs and not ("WASPAS" in method or self.calc.is_relative(method)):
+            x = self.calc.normalize(raw) * np.where(self.calc.benefit, 1.0, -1.0)
+            gap = (x[upper] - x[lower]) @ w # >= 0
+            diff = x[upper] - x[lower]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                delta = -gap[:, None] / diff # gap + delta * diff = 0
+            feasible = (diff != 0) & (w + delta >= 0) & ((delta != 0) | (gap == 0)[:, None])
+            deltas = np.where(feasible, delta, np.nan)
+        elif n_pairs:
+            memo = {}
+            for k in range(len(w)):
+                grid = np.linspace(-w[k], w.sum(), steps)
+                grid = grid[np.argsort(np.abs(grid), kind="stable")]
+                grid = grid[grid != 0]
+                trial = np.repeat(w[None, :], len(grid), axis=0)
+                trial[:, k] += grid
+                score = score_matrix_batch(self.calc, raw, trial, method, memo)
+                flipped = score[lower] > score[upper] # (pairs x grid), grid sorted by |delta|
+                hit = flipped.any(axis=1)
+                deltas[hit, k] = grid[flipped.argmax(axis=1)[hit]]
+
+        filled = np.where(np.isnan(deltas), np.inf, np.abs(deltas))
+        best = filled.argmin(axis=1)
+        has = np.isfinite(filled.min(axis=1, initial=np.inf))
+        best_delta = np.take_along_axis(deltas, best[:, None], axis=1)[:, 0]
+        df = pd.DataFrame({
+            "rank": np.arange(1, n_pairs + 1),
+            "id": [table.ids[i] for i in upper.tolist()],
+            "next_id": [table.ids[i] for i in lower.tolist()],
+            "score_gap": table.score[upper] - table.score[lower],
+            **{f"delta_{c}": deltas[:, k] for k, c in enumerate(criteria)},
+            "critical_weight": np.where(has, np.array(criteria)[best], None),
+            "critical_delta": np.where(has, best_delta, np.nan),
+        })
+        with np.errstate(divide="ignore", invalid="ignore"):
+            df["critical_change_pct"] = 100 * df["critical_delta"].to_numpy() / w[best]
+        return df
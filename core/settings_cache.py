@@ -0,0 +1,153 @@
+import os
+import atexit
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+class CachedFileStore:
+    """
+    In-process cache for a small dict persisted in one file (prefs, secrets).
+    - Reads are served from memory, revalidated by file mtime/size.
+    - Writes are coalesced: update() queues changes and a short timer (or
+      batch()/flush()) writes them in one go, merged onto the latest disk state.
+    - One store per path, shared by all Streamlit sessions (thread-safe).
+    """
+    _registry: Dict[str, "CachedFileStore"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: str,
+        load_fn: Callable[[bytes], Dict[str, Any]],
+        dump_fn: Callable[[Dict[str, Any]], bytes],
+        flush_delay: float = 0.05
+    ):
+        self.path = path
+        self.load_fn = load_fn
+        self.dump_fn = dump_fn
+        self.flush_delay = flush_delay
+
+        self._lock = threading.RLock()
+        self._data: Dict[str, Any] = {}
+        self._signature: Optional[Tuple[int, int]] = None # (mtime_ns, size) of the cached read
+        self._loaded = False
+        self._pending: Dict[str, Any] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._batch_depth = 0
+
+    @classmethod
+    def for_path(cls, path: str, load_fn, dump_fn, **kwargs) -> "CachedFileStore":
+        with cls._registry_lock:
+            store = cls._registry.get(path)
+            if store is None:
+                store = cls(path, load_fn, dump_fn, **kwargs)
+                cls._registry[path] = store
+            return store
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _revalidate(self):
+        sig = self._stat(self.path)
+        if self._loaded and sig == self._signature:
+            return
+        data = {}
+        if sig is not None:
+            try:
+                with open(self.path, "rb") as f:
+                    data = self.load_fn(f.read())
+            except Exception as e:
+                # Corrupt or undecryptable file -> behave as empty (same as before)
+                print(f"Failed to read {self.path}: {e}")
+                data = {}
+        self._data = data
+        self._signature = sig
+        self._loaded = True
+
+    def read(self) -> Dict[str, Any]:
+        """Copy of the current contents including unflushed changes (change them via update())."""
+        with self._lock:
+            self._revalidate()
+            merged = dict(self._data)
+            merged.update(self._pending)
+            return merged
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            self._revalidate()
+            return self._data.get(key, default)
+
+    def update(self, changes: Dict[str, Any]):
+        with self._lock:
+            self._pending.update(changes)
+            if self._batch_depth or self.flush_delay <= 0:
+                if not self._batch_depth:
+                    self.flush()
+                return
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def set(self, key: str, value: Any):
+        self.update({key: value})
+
+    def flush(self):
+        """Write queued changes (merged onto the current file) in a single write."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            self._revalidate()
+            data = dict(self._data)
+            data.update(self._pending)
+
+            dirname = os.path.dirname(self.path)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self.dump_fn(data))
+            os.replace(tmp_path, self.path)
+
+            self._data = data
+            self._signature = self._stat(self.path)
+            self._pending = {}
+
+    @contextmanager
+    def batch(self):
+        """Group several update() calls into one write on exit."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.flush()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+
+    @classmethod
+    def flush_all(cls):
+        with cls._registry_lock:
+            stores = list(cls._registry.values())
+        for store in stores:
+            try:
+                store.flush()
+            except Exception as e:
+                print(f"Failed to flush {store.path}: {e}")
+
+atexit.register(CachedFileStore.flush_all)
@@ -12,6 +12,7 @@ def render_sidebar():
         st.page_link("pages/3_Settings.py", label=I18nManager.get("sidebar.settings", "Settings"), icon="⚙️")
         st.page_link("pages/4_Freeze_Report.py", label=I18nManager.get("sidebar.freeze_report", "Freeze Report"), icon="📑")
         st.page_link("pages/5_Data_Tools.py", label=I18nManager.get("sidebar.data_tools", "Data Tools"), icon="🛠️")
+        st.page_link("pages/6_Scenarios.py", label=I18nManager.get("sidebar.scenarios", "What-If Scenarios"), icon="🔮")
         
         st.markdown("---")
         
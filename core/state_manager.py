@@ -1,11 +1,13 @@
 import os
 import json
 from data.models import AppConfig
+from core.perf import traced
 
 class StatePersistence:
     DEFAULT_PATH = "data/runtime_state.json"
     
     @staticmethod
+    @traced("state.save")
     def save(config: AppConfig, path: str = DEFAULT_PATH):
         os.makedirs(os.path.dirname(path), exist_ok=True)
         with open(path, "w", encoding="utf-8") as f:
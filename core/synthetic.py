@@ -0,0 +1,195 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Iterator
+from data.models import AppConfig
+
+# Default segment columns (name -> categories); segment effects shift driver means
+DEFAULT_SEGMENTS = {
+    "Department": ["Sales", "Eng", "HR", "Ops", "Finance"],
+    "Tenure": ["<1y", "1-3y", "3-5y", "5y+"],
+}
+
+# KPI level heuristics by name keyword: (base, noise sd)
+KPI_PROFILES = [
+    ("rate", (0.10, 0.02)),
+    ("overtime", (30.0, 5.0)),
+    ("hours", (30.0, 5.0)),
+    ("span", (8.0, 1.0)),
+]
+
+class SyntheticSurveyGenerator:
+    """
+    Reproducible, vectorized synthetic evidence generator driven by an AppConfig.
+    - Survey: one latent factor per driver; item loadings chosen so the
+      driver's Cronbach's alpha is ~target_alpha; mapped onto the driver's Likert range.
+    - Segments shift each driver's latent mean; missingness is MCAR + break-off.
+    - KPIs: AR(1) monthly series per segment for every KPI referenced by cards.
+    Output is produced in chunks so memory stays bounded for 10^7 respondents.
+    """
+    def __init__(
+        self,
+        config: AppConfig,
+        seed: int = 0,
+        target_alpha: float = 0.8,
+        segments: Dict[str, List[str]] = None,
+        missing_rate: float = 0.02,
+        dropout_rate: float = 0.01,
+        segment_effect_sd: float = 0.3
+    ):
+        self.config = config
+        self.seed = seed
+        self.target_alpha = target_alpha
+        self.segments = DEFAULT_SEGMENTS if segments is None else segments
+        self.missing_rate = missing_rate
+        self.dropout_rate = dropout_rate
+
+        # Item -> driver layout (first driver wins for shared items)
+        self.items: List[str] = []
+        self.item_driver: List[int] = []
+        for d_idx, d in enumerate(config.drivers):
+            for item in d.survey_items:
+                if item not in self.items:
+                    self.items.append(item)
+                    self.item_driver.append(d_idx)
+        self.item_driver_arr = np.array(self.item_driver, dtype=np.intp)
+
+        # Standardized alpha = k*rho / (1 + (k-1)*rho)  ->  rho = alpha / (k - (k-1)*alpha)
+        loadings = np.empty(len(self.items))
+        for d_idx in range(len(config.drivers)):
+            mask = self.item_driver_arr == d_idx
+            k = int(mask.sum())
+            if k == 0:
+                continue
+            rho = target_alpha / (k - (k - 1) * target_alpha) if k > 1 else target_alpha
+            loadings[mask] = np.sqrt(np.clip(rho, 0.0, 1.0))
+        self.loadings = loadings
+
+        lo = np.array([config.drivers[d].range[0] for d in self.item_driver], dtype=float)
+        hi = np.array([config.drivers[d].range[1] for d in self.item_driver], dtype=float)
+        self.item_lo, self.item_hi = lo, hi
+
+        # Fixed per-config effects (independent of chunking)
+        rng = np.random.default_rng([seed, 0])
+        self.driver_means = rng.normal(0.0, 0.5, len(config.drivers))
+        self.segment_effects = {
+            name: rng.normal(0.0, segment_effect_sd, (len(cats), len(config.drivers)))
+            for name, cats in self.segments.items()
+        }
+
+    @property
+    def survey_columns(self) -> List[str]:
+        return ["employee_id"] + self.items + list(self.segments.keys())
+
+    def survey_chunk(self, start: int, n: int, chunk_index: int = 0) -> pd.DataFrame:
+        """Respondents [start, start+n). Deterministic per (seed, chunk_index)."""
+        rng = np.random.default_rng([self.seed, 1, chunk_index])
+        n_drivers = len(self.config.drivers)
+
+        # Segments
+        seg_codes = {}
+        latent_mean = np.broadcast_to(self.driver_means, (n, n_drivers)).copy()
+        for name, cats in self.segments.items():
+            codes = rng.integers(0, len(cats), n)
+            seg_codes[name] = codes
+            latent_mean += self.segment_effects[name][codes]
+
+        # Latent driver factors -> correlated items (item = mean + lam*f + sqrt(1-lam^2)*e)
+        factors = rng.standard_normal((n, n_drivers))
+        lam = self.loadings
+        noise = rng.standard_normal((n, len(self.items)))
+        cols = self.item_driver_arr
+        z = latent_mean[:, cols] + lam * factors[:, cols] + np.sqrt(1.0 - lam ** 2) * noise
+
+        # Map z onto the Likert range (z=0 -> midpoint, +-2.5 sd -> ends)
+        span = self.item_hi - self.item_lo
+        values = np.rint(self.item_lo + span * (z + 2.5) / 5.0)
+        values = np.clip(values, self.item_lo, self.item_hi)
+
+        # Missingness: item-level MCAR + break-off (all items after a random point)
+        if self.missing_rate > 0:
+            values[rng.random(values.shape) < self.missing_rate] = np.nan
+        if self.dropout_rate > 0 and len(self.items) > 1:
+            drop = rng.random(n) < self.dropout_rate
+            cut = rng.integers(1, len(self.items), n)
+            values[drop[:, None] & (np.arange(len(self.items)) >= cut[:, None])] = np.nan
+
+        df = pd.DataFrame(values, columns=self.items)
+        df.insert(0, "employee_id", np.char.add("u", np.arange(start, start + n).astype(str)))
+        for name, cats in self.segments.items():
+            df[name] = pd.Categorical.from_codes(seg_codes[name], categories=cats)
+        return df
+
+    def iter_survey(self, n: int, chunk_size: int = 100_000) -> Iterator[pd.DataFrame]:
+        for chunk_index, start in enumerate(range(0, n, chunk_size)):
+            yield self.survey_chunk(start, min(chunk_size, n - start), chunk_index)
+
+    def kpi_names(self) -> List[str]:
+        names = []
+        for card in self.config.decision_cards:
+            for k in card.required_evidence.get("kpis", []):
+                if k not in names:
+                    names.append(k)
+        return names
+
+    @staticmethod
+    def _kpi_profile(name: str):
+        for keyword, profile in KPI_PROFILES:
+            if keyword in name.lower():
+                return profile
+        return (50.0, 5.0)
+
+    def kpi_series(self, months: int = 24, start: str = "2023-01-01", segment: str = "Department", phi: float = 0.7) -> pd.DataFrame:
+        """Monthly AR(1) series (with a small trend) per segment value for each KPI."""
+        rng = np.random.default_rng([self.seed, 2])
+        dates = pd.date_range(start=start, periods=months, freq=pd.offsets.MonthEnd()) # "ME" alias needs pandas >= 2.2
+        cats = self.segments.get(segment, ["All"])
+        names = self.kpi_names()
+
+        frame = {
+            "Date": np.tile(dates, len(cats)),
+            segment: np.repeat(cats, months),
+        }
+        for name in names:
+            base, sd = self._kpi_profile(name)
+            level = base * (1 + rng.normal(0, 0.2, len(cats)))          # per segment
+            trend = rng.normal(0, sd * 0.05, len(cats))                   # per month
+            shocks = rng.normal(0, sd, (len(cats), months))
+            dev = np.zeros((len(cats), months))
+            for t in range(months):                                       # AR(1) over time only
+                dev[:, t] = (phi * dev[:, t - 1] if t else 0.0) + shocks[:, t]
+            series = level[:, None] + trend[:, None] * np.arange(months) + dev
+            frame[name] = np.maximum(series, 0.0).ravel()
+        return pd.DataFrame(frame)
+
+    def write_survey(self, path: str, n: int, chunk_size: int = 100_000) -> int:
+        """
+        Stream n respondents to CSV or Parquet (by extension) chunk by chunk.
+        Returns rows written. Parquet requires pyarrow.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        written = 0
+        if path.endswith(".parquet"):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Parquet output requires 'pyarrow' (pip install pyarrow).")
+            writer = None
+            try:
+                for chunk in self.iter_survey(n, chunk_size):
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(path, table.schema)
+                    writer.write_table(table)
+                    written += len(chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+            return written
+
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for i, chunk in enumerate(self.iter_survey(n, chunk_size)):
+                chunk.to_csv(f, header=(i == 0), index=False)
+                written += len(chunk)
+        return written
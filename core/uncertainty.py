@@ -0,0 +1,180 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from core.card_table import STATUS_CODES
+from core.decision import DecisionEngine
+from core.perf import traced
+from core.priority import PAIRWISE_INTERACTIVE_CELLS, PriorityCalculator
+from core.scenario import ScenarioEngine
+from data.models import DecisionCardConfig
+
+# Probabilistic ranking: the evidence context is an estimate, not a fixed number.
+# Driver scores are survey means (standard error from the respondents), KPIs are the
+# latest value of a noisy series (noise from the recent month-over-month changes).
+# Samples of the whole context are pushed through rule evaluation and ranking in
+# batches (ScenarioEngine.evaluate, one column per sample), optionally in worker
+# processes; the result gives per-card status probabilities and rank distributions.
+# 1 - P(most likely status) is the card's own uncertainty term for the ranking.
+
+MC_SAMPLES = 200
+MC_MIN_SAMPLES = 10
+
+def sample_budget(priority_calc: Any, method: str, n_cards: int, samples: int = MC_SAMPLES) -> int:
+    """Samples for an interactive run: ELECTRE compares all card pairs per sample, so large boards get fewer."""
+    if not priority_calc.uses_pairwise(method) or n_cards < 2:
+        return samples
+    return min(samples, max(MC_MIN_SAMPLES, PAIRWISE_INTERACTIVE_CELLS // (n_cards * n_cards)))
+
+def kpi_standard_errors(kpi_df: pd.DataFrame, names: List[str], window: int = 12) -> Dict[str, float]:
+    """
+    Noise of the latest value of each KPI column: std of the last `window` changes / sqrt(2)
+    (differences of independent noise have twice its variance; a slow trend mostly cancels).
+    """
+    if kpi_df is None: return {}
+    errors = {}
+    for name in names:
+        if name not in kpi_df.columns:
+            continue
+        values = pd.to_numeric(kpi_df[name], errors="coerce").to_numpy(dtype=float)
+        changes = np.diff(values[~np.isnan(values)][-(window + 1):])
+        errors[name] = float(changes.std(ddof=1) / np.sqrt(2)) if len(changes) > 1 else 0.0
+    return errors
+
+class EvidenceDistribution:
+    """Independent normal sampling distribution per evidence value (sd 0 = fixed value)."""
+    def __init__(self, context: Dict[str, float], errors: Dict[str, float] = None):
+        errors = errors or {}
+        self.names = list(context)
+        self.mean = np.array([context[k] for k in self.names], dtype=float)
+        self.sd = np.array([errors.get(k, 0.0) for k in self.names], dtype=float)
+        self.sd = np.where(np.isfinite(self.sd) & np.isfinite(self.mean), self.sd, 0.0)
+
+    @classmethod
+    def from_evidence(cls, context: Dict[str, float], driver_matrix: Any, survey_df: pd.DataFrame = None,
+                      kpi_df: pd.DataFrame = None, window: int = 12) -> 'EvidenceDistribution':
+        """context as built by the pages; drivers from survey_df, everything else looked up in kpi_df."""
+        errors = driver_matrix.standard_errors(survey_df) if survey_df is not None else {}
+        kpis = [k for k in context if k not in errors]
+        errors.update(kpi_standard_errors(kpi_df, kpis, window))
+        return cls(context, errors)
+
+    def key(self) -> Tuple:
+        """Hashable identity of the distribution (for caching results drawn from it)."""
+        return (tuple(self.names), self.mean.tobytes(), self.sd.tobytes())
+
+    def sample(self, n: int, seed: Optional[int] = None) -> np.ndarray:
+        """values[variable, sample]."""
+        rng = np.random.default_rng(seed)
+        return self.mean[:, None] + self.sd[:, None] * rng.standard_normal((len(self.names), n))
+
+class MonteCarloResult:
+    """Status counts and ranks per sample; ranks are 0-based, (samples, cards)."""
+    def __init__(self, cards: List[DecisionCardConfig], status_counts: np.ndarray, ranks: np.ndarray, method: str):
+        self.cards = cards
+        self.ids = [c.id for c in cards]
+        self.status_counts = status_counts # (cards, len(STATUS_CODES))
+        self.ranks = ranks
+        self.method = method
+        self.n_samples = ranks.shape[0]
+
+    @property
+    def status_probability(self) -> np.ndarray:
+        return self.status_counts / max(self.n_samples, 1)
+
+    @property
+    def status_uncertainty(self) -> np.ndarray:
+        """1 - P(most likely status): 0 when every sample agrees."""
+        return 1.0 - self.status_probability.max(axis=1, initial=0.0)
+
+    def rank_percentiles(self, q: List[float]) -> np.ndarray:
+        """(len(q), cards), 0-based ranks."""
+        if self.n_samples == 0:
+            return np.zeros((len(q), len(self.ids)))
+        return np.percentile(self.ranks, q, axis=0)
+
+    def to_frame(self) -> pd.DataFrame:
+        prob = self.status_probability
+        p5, p50, p95 = self.rank_percentiles([5, 50, 95]) + 1
+        return pd.DataFrame({
+            "id": self.ids,
+            "title": [c.title for c in self.cards],
+            **{f"p_{s.value}": prob[:, k] for k, s in enumerate(STATUS_CODES)},
+            "likely_status": [STATUS_CODES[k].value for k in prob.argmax(axis=1).tolist()] if len(self.ids) else [],
+            "status_uncertainty": self.status_uncertainty,
+            "rank_mean": self.ranks.mean(axis=0) + 1 if self.n_samples else np.zeros(len(self.ids)),
+            "rank_p5": p5,
+            "rank_p50": p50,
+            "rank_p95": p95,
+        })
+
+_worker_state: Dict[str, Any] = {}
+
+def _init_worker(cards: List[DecisionCardConfig], priority_calc: PriorityCalculator):
+    """Process pool initializer: cards are sent once per worker, the decision engine is built there
+    (compiled rule code objects don't pickle)."""
+    _worker_state["cards"] = cards
+    _worker_state["engine"] = ScenarioEngine(DecisionEngine(), priority_calc)
+
+def _evaluate_samples(args: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """Worker: (names, values, penalty, method) -> (status, ranks) of one sample batch."""
+    names, values, penalty, method = args
+    status, _, _, ranks = _worker_state["engine"].evaluate(
+        _worker_state["cards"], names, values, np.ones(values.shape, dtype=bool), penalty, method)
+    return status, ranks.astype(np.int32)
+
+class MonteCarloRanking:
+    def __init__(self, decision_engine: Any, priority_calc: Any, chunk: int = 100):
+        self.engine = decision_engine
+        self.calc = priority_calc
+        self.chunk = chunk # Samples per batch
+
+    @traced("uncertainty.monte_carlo")
+    def run(self, cards: List[DecisionCardConfig], distribution: EvidenceDistribution, quality_penalty: float = 0.0,
+            method: str = "SAW", samples: int = MC_SAMPLES, seed: Optional[int] = 0, workers: Optional[int] = None) -> MonteCarloResult:
+        """
+        workers > 1 evaluates the batches in a process pool. The samples are drawn here,
+        so results do not depend on the number of workers.
+        """
+        values = distribution.sample(samples, seed)
+        batches = [values[:, start:start + self.chunk] for start in range(0, samples, self.chunk)]
+        if workers and workers > 1 and len(batches) > 1:
+            jobs = [(distribution.names, batch, quality_penalty, method) for batch in batches]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cards, self.calc)) as executor:
+                results = list(executor.map(_evaluate_samples, jobs))
+        else:
+            engine = ScenarioEngine(self.engine, self.calc)
+            results = []
+            for batch in batches:
+                status, _, _, ranks = engine.evaluate(cards, distribution.names, batch, np.ones(batch.shape, dtype=bool), quality_penalty, method)
+                results.append((status, ranks.astype(np.int32)))
+
+        n = len(cards)
+        counts = np.zeros((n, len(STATUS_CODES)), dtype=np.int64)
+        for status, _ in results:
+            for k in range(len(STATUS_CODES)):
+                counts[:, k] += (status == k).sum(axis=0)
+        ranks = np.vstack([r for _, r in results]) if results else np.zeros((0, n), dtype=np.int32)
+        return MonteCarloResult(cards, counts, ranks, method)
+
+def session_monte_carlo(session_state: Any, artifacts: Any, cards: List[DecisionCardConfig], distribution: EvidenceDistribution,
+                        quality_penalty: float = 0.0, method: str = "SAW", samples: int = MC_SAMPLES) -> MonteCarloResult:
+    """
+    MonteCarloRanking.run on the session's shared artifacts (core.registry), kept in session_state
+    until its inputs change: pages rerun on every click, the sampling only when the evidence,
+    config, simulation sliders or ranking settings do. Samples are capped by sample_budget.
+    """
+    samples = sample_budget(artifacts.priority_calc, method, len(cards), samples)
+    key = (artifacts.config_hash, method, distribution.key(), float(quality_penalty), samples,
+           tuple((c.simulation_impact, c.simulation_urgency) for c in cards))
+    cached = session_state.get("_mc_result")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    result = MonteCarloRanking(artifacts.engine, artifacts.priority_calc).run(cards, distribution, quality_penalty, method, samples)
+    session_state["_mc_result"] = (key, result)
+    return result
+
+def apply_uncertainty(table: Any, result: MonteCarloResult, quality_penalty: float = 0.0) -> Any:
+    """Per-card uncertainty (quality penalty + status uncertainty, capped at 1) on a CardTable; re-rank afterwards."""
+    table.uncertainty = np.minimum(float(quality_penalty) + result.status_uncertainty, 1.0)
+    return table
@@ -1,88 +1,320 @@
-import graphviz
+import threading
+from collections import OrderedDict
+from core.lazy import lazy_import
 import streamlit as st
-from typing import List, Dict
+from typing import List, Dict, Optional
 from data.models import DecisionCardConfig, DriverConfig
+from core.perf import traced
+
+graphviz = lazy_import("graphviz", "Install it with 'pip install graphviz'.")
 
 class CausalVisualizer:
+    """
+    Driver/KPI -> Decision Card graph.
+    The structure (labels + card -> drivers/KPIs adjacency) is indexed once in __init__;
+    the full graph and per-card neighbourhoods are emitted from the index, so a card
+    subgraph costs O(degree) instead of re-walking every card and driver.
+    Rendered DOT sources are cached by structure + the scores that drive their colours.
+    """
+    _dot_cache: "OrderedDict[tuple, str]" = OrderedDict()
+    _cache_lock = threading.Lock()
+    _cache_size = 512
+
     def __init__(self, drivers: List[DriverConfig], cards: List[DecisionCardConfig]):
         self.drivers = {d.id: d.label for d in drivers}
         self.cards = cards
 
+        # Adjacency indexes
+        self.card_index: Dict[str, DecisionCardConfig] = {}
+        self.card_drivers: Dict[str, List[str]] = {}
+        self.card_kpis: Dict[str, List[str]] = {}
+        for card in cards:
+            self.card_index[card.id] = card
+            evidence = card.required_evidence or {}
+            self.card_drivers[card.id] = [d_id for d_id in evidence.get('drivers', []) if d_id in self.drivers]
+            self.card_kpis[card.id] = list(evidence.get('kpis', []))
+
+        # Structure signature: anything that changes node labels, edges or clusters
+        self.signature = hash((
+            tuple(self.drivers.items()),
+            tuple((c.id, c.title, tuple(c.stakeholders), tuple(self.card_drivers[c.id]), tuple(self.card_kpis[c.id]))
+                  for c in cards)
+        ))
+
+    # --- Styling (shared by full graph and subgraphs) ---
+
+    @staticmethod
+    def _driver_style(label: str, score: Optional[float]):
+        if score is None:
+            return label, 'lightblue'
+        # Simple heatmap (1-5 range assumption)
+        if score < 2.5: fill_color = '#ffcccc' # Redish
+        elif score < 3.5: fill_color = '#ffffcc' # Yellowish
+        else: fill_color = '#ccffcc' # Greenish
+        return label + f"\n({score:.2f})", fill_color
+
+    @staticmethod
+    def _card_style(title: str, score: Optional[float]):
+        if score is None:
+            return title, 'lightyellow'
+        # Using total priority or rank? Assuming priority 0-1
+        fill_color = 'lightyellow'
+        if score > 0.7: fill_color = '#ff9999' # Red/High Priority
+        elif score > 0.4: fill_color = '#ffcc99' # Orange
+        return title + f"\n(Pri: {score:.2f})", fill_color
+
+    def _scope(self, target_card_id: str = None):
+        """(card ids, driver ids) to render."""
+        if target_card_id is None:
+            return list(self.card_index), list(self.drivers)
+        if target_card_id not in self.card_index:
+            return [], []
+        return [target_card_id], self.card_drivers[target_card_id]
+
+    @traced("visualizer.render_causal_graph")
     def render_causal_graph(self, driver_scores: Dict[str, float] = None, card_scores: Dict[str, float] = None, target_card_id: str = None):
+        driver_scores = driver_scores or {}
+        card_scores = card_scores or {}
+        card_ids, driver_ids = self._scope(target_card_id)
+
         dot = graphviz.Digraph(comment='Causal Model')
         dot.attr(rankdir='LR')
-        
-        # Determine scope
-        cards_to_render = self.cards
-        drivers_to_render = self.drivers # ID -> label
-        
-        if target_card_id:
-            # Filter cards
-            cards_to_render = [c for c in self.cards if c.id == target_card_id]
-            
-            # Filter drivers to only those relevant to the target card(s)
-            # Gather all required drivers from selected cards
-            req_d_ids = set()
-            for c in cards_to_render:
-                if c.required_evidence:
-                    req_d_ids.update(c.required_evidence.get('drivers', []))
-            
-            drivers_to_render = {d_id: l for d_id, l in self.drivers.items() if d_id in req_d_ids}
 
         # Nodes: Drivers (Evidence)
         with dot.subgraph(name='cluster_evidence') as c:
             c.attr(label='Evidence Layer', color='lightgrey')
-            for d_id, label in drivers_to_render.items():
-                display_label = label
-                fill_color = 'lightblue'
-                
-                if driver_scores and d_id in driver_scores:
-                    score = driver_scores[d_id]
-                    display_label += f"\n({score:.2f})"
-                    # Simple heatmap (1-5 range assumption)
-                    if score < 2.5: fill_color = '#ffcccc' # Redish
-                    elif score < 3.5: fill_color = '#ffffcc' # Yellowish
-                    else: fill_color = '#ccffcc' # Greenish
-                
+            for d_id in driver_ids:
+                display_label, fill_color = self._driver_style(self.drivers[d_id], driver_scores.get(d_id))
                 c.node(d_id, display_label, shape='ellipse', style='filled', color=fill_color)
 
         # Nodes: Decision Cards
         with dot.subgraph(name='cluster_decision') as c:
             c.attr(label='Decision Layer', color='lightgrey')
-            for card in cards_to_render:
-                display_label = card.title
-                fill_color = 'lightyellow'
-                
-                if card_scores and card.id in card_scores:
-                    # Using total priority or rank? Assuming priority 0-1
-                    score = card_scores[card.id]
-                    display_label += f"\n(Pri: {score:.2f})"
-                    if score > 0.7: fill_color = '#ff9999' # Red/High Priority
-                    elif score > 0.4: fill_color = '#ffcc99' # Orange
-                
-                c.node(card.id, display_label, shape='box', style='filled', color=fill_color)
+            for card_id in card_ids:
+                display_label, fill_color = self._card_style(self.card_index[card_id].title, card_scores.get(card_id))
+                c.node(card_id, display_label, shape='box', style='filled', color=fill_color)
 
         # Edges
-        for card in cards_to_render:
-            # Connect drivers to card
-            if card.required_evidence and 'drivers' in card.required_evidence:
-                for d_id in card.required_evidence['drivers']:
-                    if d_id in drivers_to_render:
-                        edge_color = 'black'
-                        edge_label = "" # No explicit coefficient in Rule-based model
-                        
-                        # Highlight edge if driver is low
-                        if driver_scores and d_id in driver_scores:
-                            if driver_scores[d_id] < 3.0: edge_color = 'red'
-                            
-                        dot.edge(d_id, card.id, color=edge_color, label=edge_label)
-            
-            # Connect KPIs to card (Simple node for KPIs)
-            if card.required_evidence and 'kpis' in card.required_evidence:
-                for kpi in card.required_evidence['kpis']:
-                    kpi_id = f"kpi_{kpi}"
+        kpi_nodes = set()
+        for card_id in card_ids:
+            # Connect drivers to card (highlight edge if driver is low)
+            for d_id in self.card_drivers[card_id]:
+                score = driver_scores.get(d_id)
+                edge_color = 'red' if score is not None and score < 3.0 else 'black'
+                dot.edge(d_id, card_id, color=edge_color, label="")
+
+            # Connect KPIs to card (Simple node for KPIs, emitted once)
+            for kpi in self.card_kpis[card_id]:
+                kpi_id = f"kpi_{kpi}"
+                if kpi_id not in kpi_nodes:
+                    kpi_nodes.add(kpi_id)
                     # User requested non-diamond shape due to width. Using 'box' (rect).
                     dot.node(kpi_id, kpi, shape='box', style='rounded,filled', fillcolor='#e6e6e6')
-                    dot.edge(kpi_id, card.id)
+                dot.edge(kpi_id, card_id)
 
         return dot
+
+    def render_dot(self, driver_scores: Dict[str, float] = None, card_scores: Dict[str, float] = None, target_card_id: str = None) -> str:
+        """DOT source for the full graph or one card's neighbourhood, cached across reruns."""
+        driver_scores = driver_scores or {}
+        card_scores = card_scores or {}
+        card_ids, driver_ids = self._scope(target_card_id)
+        # Only the scores that affect colours/labels of this view are part of the key
+        key = (
+            self.signature,
+            target_card_id,
+            tuple(driver_scores.get(d_id) for d_id in driver_ids),
+            tuple(card_scores.get(card_id) for card_id in card_ids),
+        )
+        return self._cached(key, lambda: self.render_causal_graph(driver_scores, card_scores, target_card_id).source)
+
+    @classmethod
+    def _cached(cls, key: tuple, build) -> str:
+        with cls._cache_lock:
+            source = cls._dot_cache.get(key)
+            if source is not None:
+                cls._dot_cache.move_to_end(key)
+                return source
+
+        source = build()
+        with cls._cache_lock:
+            cls._dot_cache[key] = source
+            while len(cls._dot_cache) > cls._cache_size:
+                cls._dot_cache.popitem(last=False)
+        return source
+
+    # --- Aggregated view (large configs) ---
+
+    @staticmethod
+    def _card_band(score: Optional[float]) -> str:
+        # Same thresholds as the card heat colouring
+        if score is None: return "No score"
+        if score > 0.7: return "High priority"
+        if score > 0.4: return "Medium priority"
+        return "Low priority"
+
+    @staticmethod
+    def _driver_band(score: Optional[float]) -> str:
+        # Same thresholds as the driver heat colouring
+        if score is None: return "No data"
+        if score < 2.5: return "Low drivers"
+        if score < 3.5: return "Mid drivers"
+        return "High drivers"
+
+    def card_clusters(self, group_by: str = "status", card_scores: Dict[str, float] = None, card_statuses: Dict[str, str] = None) -> Dict[str, List[str]]:
+        """Cluster key -> card ids. group_by: 'status', 'stakeholder' or 'score_band'."""
+        card_scores = card_scores or {}
+        card_statuses = card_statuses or {}
+        clusters: Dict[str, List[str]] = {}
+        for card_id, card in self.card_index.items():
+            if group_by == "stakeholder":
+                key = card.stakeholders[0] if card.stakeholders else "Unassigned"
+            elif group_by == "score_band":
+                key = self._card_band(card_scores.get(card_id))
+            else:
+                key = card_statuses.get(card_id, "UNKNOWN")
+            clusters.setdefault(key, []).append(card_id)
+        return clusters
+
+    def driver_clusters(self, driver_scores: Dict[str, float] = None) -> Dict[str, List[str]]:
+        """Heat band -> driver ids."""
+        driver_scores = driver_scores or {}
+        clusters: Dict[str, List[str]] = {}
+        for d_id in self.drivers:
+            clusters.setdefault(self._driver_band(driver_scores.get(d_id)), []).append(d_id)
+        return clusters
+
+    @staticmethod
+    def _cap_groups(groups: Dict[str, List[str]], limit: int) -> Dict[str, List[str]]:
+        if len(groups) <= limit:
+            return groups
+        ordered = sorted(groups.items(), key=lambda kv: -len(kv[1]))
+        capped = dict(ordered[:limit - 1])
+        capped["Other"] = [i for _, ids in ordered[limit - 1:] for i in ids]
+        return capped
+
+    @staticmethod
+    def _mean(values) -> Optional[float]:
+        values = [v for v in values if v is not None]
+        return sum(values) / len(values) if values else None
+
+    def render_aggregated_graph(
+        self,
+        driver_scores: Dict[str, float] = None,
+        card_scores: Dict[str, float] = None,
+        card_statuses: Dict[str, str] = None,
+        group_by: str = "status",
+        expand: List[str] = None,
+        max_nodes: int = 60
+    ):
+        """
+        Clustered view: cards grouped by status/stakeholder/score band, drivers by heat band,
+        edges weighted by the number of card -> driver links between clusters.
+        Clusters listed in `expand` ("card:<key>" / "driver:<key>") show their members,
+        highest score first, until max_nodes is reached; the rest stay in a "+N more" node.
+        """
+        driver_scores = driver_scores or {}
+        card_scores = card_scores or {}
+        expand = set(expand or [])
+        driver_groups = self.driver_clusters(driver_scores)
+        # Too many clusters (e.g. stakeholders) -> keep the largest, fold the rest into "Other";
+        # at most half the budget goes to collapsed card clusters
+        card_limit = max(1, (max_nodes - len(driver_groups) - 1) // 2)
+        card_groups = self._cap_groups(self.card_clusters(group_by, card_scores, card_statuses), card_limit)
+
+        # Collapsed super-nodes always shown (+1 for the KPI node)
+        budget = max_nodes - len(card_groups) - len(driver_groups) - 1
+
+        def assign(groups, prefix, score_of):
+            nonlocal budget
+            node_of, members = {}, {}
+            for key, ids in groups.items():
+                cluster_id = f"{prefix}:{key}"
+                shown = []
+                if cluster_id in expand and budget > 0:
+                    shown = sorted(ids, key=lambda i: -(score_of(i) or 0.0))[:budget]
+                    budget -= len(shown)
+                for i in shown:
+                    node_of[i] = i
+                rest = [i for i in ids if i not in node_of] if shown else ids
+                for i in rest:
+                    node_of[i] = cluster_id
+                if rest:
+                    members[cluster_id] = (key, rest, bool(shown))
+            return node_of, members
+
+        driver_node, driver_members = assign(driver_groups, "driver", driver_scores.get)
+        card_node, card_members = assign(card_groups, "card", card_scores.get)
+
+        dot = graphviz.Digraph(comment='Causal Model (Aggregated)')
+        dot.attr(rankdir='LR')
+
+        with dot.subgraph(name='cluster_evidence') as c:
+            c.attr(label='Evidence Layer', color='lightgrey')
+            for cluster_id, (key, ids, partial) in driver_members.items():
+                title = f"{key} (+{len(ids)} more)" if partial else f"{key} ({len(ids)})"
+                label, fill = self._driver_style(title, self._mean(driver_scores.get(i) for i in ids))
+                c.node(cluster_id, label, shape='ellipse', style='filled,bold', color=fill, peripheries='2')
+            for d_id, node in driver_node.items():
+                if node == d_id:
+                    label, fill = self._driver_style(self.drivers[d_id], driver_scores.get(d_id))
+                    c.node(d_id, label, shape='ellipse', style='filled', color=fill)
+
+        with dot.subgraph(name='cluster_decision') as c:
+            c.attr(label='Decision Layer', color='lightgrey')
+            for cluster_id, (key, ids, partial) in card_members.items():
+                title = f"{key} (+{len(ids)} more)" if partial else f"{key} ({len(ids)} cards)"
+                label, fill = self._card_style(title, self._mean(card_scores.get(i) for i in ids))
+                c.node(cluster_id, label, shape='box3d', style='filled', color=fill)
+            for card_id, node in card_node.items():
+                if node == card_id:
+                    label, fill = self._card_style(self.card_index[card_id].title, card_scores.get(card_id))
+                    c.node(card_id, label, shape='box', style='filled', color=fill)
+
+        # Weighted edges between (possibly collapsed) endpoints
+        driver_edges: Dict[tuple, int] = {}
+        kpi_edges: Dict[str, int] = {}
+        kpis = set()
+        for card_id, c_node in card_node.items():
+            for d_id in self.card_drivers[card_id]:
+                pair = (driver_node[d_id], c_node)
+                driver_edges[pair] = driver_edges.get(pair, 0) + 1
+            if self.card_kpis[card_id]:
+                kpis.update(self.card_kpis[card_id])
+                kpi_edges[c_node] = kpi_edges.get(c_node, 0) + len(self.card_kpis[card_id])
+
+        max_weight = max(list(driver_edges.values()) + list(kpi_edges.values()) + [1])
+        def width(w):
+            return f"{1.0 + 4.0 * w / max_weight:.2f}"
+
+        for (d_node, c_node), w in driver_edges.items():
+            d_score = driver_scores.get(d_node) if d_node in self.drivers else None
+            edge_color = 'red' if (d_score is not None and d_score < 3.0) or d_node == "driver:Low drivers" else 'black'
+            dot.edge(d_node, c_node, color=edge_color, penwidth=width(w), label=str(w) if w > 1 else "")
+
+        if kpis:
+            dot.node("kpi_all", f"KPIs ({len(kpis)})", shape='box', style='rounded,filled', fillcolor='#e6e6e6')
+            for c_node, w in kpi_edges.items():
+                dot.edge("kpi_all", c_node, penwidth=width(w), label=str(w) if w > 1 else "")
+
+        return dot
+
+    def render_aggregated_dot(
+        self,
+        driver_scores: Dict[str, float] = None,
+        card_scores: Dict[str, float] = None,
+        card_statuses: Dict[str, str] = None,
+        group_by: str = "status",
+        expand: List[str] = None,
+        max_nodes: int = 60
+    ) -> str:
+        driver_scores = driver_scores or {}
+        card_scores = card_scores or {}
+        card_statuses = card_statuses or {}
+        key = (
+            self.signature, "aggregated", group_by, tuple(sorted(expand or [])), max_nodes,
+            tuple(driver_scores.get(d_id) for d_id in self.drivers),
+            tuple((card_scores.get(c_id), card_statuses.get(c_id)) for c_id in self.card_index),
+        )
+        return self._cached(key, lambda: self.render_aggregated_graph(
+            driver_scores, card_scores, card_statuses, group_by, expand, max_nodes).source)
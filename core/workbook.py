@@ -0,0 +1,170 @@
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+from core.lazy import lazy_import
+from core.converter import DataConverter
+from core.quality import QualityGateway
+from data.models import DecisionCardConfig, DriverConfig, QualityCheckResult
+
+openpyxl = lazy_import("openpyxl", "Install it with 'pip install openpyxl'.")
+
+# One .xlsx workbook -> drivers, cards (+ long-format rules), survey and KPI frames.
+# Sheets are streamed in openpyxl read-only mode row by row into per-column lists,
+# which become typed numpy columns (float/int/datetime/object) of the final frame.
+# Each sheet is then validated through DataConverter / QualityGateway; problems are
+# collected per sheet instead of aborting the whole workbook.
+
+# Accepted sheet names per role (compared lower-case, ignoring spaces, '_' and '-')
+SHEET_ROLES = {
+    "drivers": ["drivers", "driver"],
+    "cards": ["cards", "decisioncards", "card"],
+    "rules": ["rules", "cardrules"],
+    "survey": ["survey", "surveys", "responses"],
+    "kpi": ["kpi", "kpis"],
+}
+
+def _normalize(name: str) -> str:
+    return "".join(ch for ch in name.lower() if ch not in " _-")
+
+def match_sheets(sheet_names: List[str], sheet_map: Dict[str, str] = None) -> Dict[str, str]:
+    """role -> sheet name. sheet_map overrides the name matching per role."""
+    by_name = {_normalize(s): s for s in sheet_names}
+    roles = {}
+    for role, aliases in SHEET_ROLES.items():
+        if sheet_map and role in sheet_map:
+            roles[role] = sheet_map[role]
+            continue
+        for alias in aliases:
+            if alias in by_name:
+                roles[role] = by_name[alias]
+                break
+    return roles
+
+def _typed_column(values: List[Any]) -> np.ndarray:
+    """Cell values of one column -> int64/float64/datetime64 when uniform, else object."""
+    kinds = {type(v) for v in values if v is not None}
+    if kinds and kinds <= {int, float}:
+        if kinds == {int} and None not in values:
+            return np.array(values, dtype=np.int64)
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    if kinds and kinds <= {datetime.datetime, datetime.date}:
+        return np.array(values, dtype="datetime64[ns]")
+    return np.array(values, dtype=object)
+
+def _header(cells: Tuple[Any, ...]) -> List[str]:
+    """Trailing empty cells dropped; blank names numbered, duplicates suffixed like read_csv."""
+    last = max(i for i, c in enumerate(cells) if c is not None)
+    names, seen = [], {}
+    for i, cell in enumerate(cells[:last + 1]):
+        name = str(cell).strip() if cell is not None else f"column_{i + 1}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def read_sheet(ws) -> pd.DataFrame:
+    """
+    Stream a (read-only) worksheet into a frame. The first non-empty row is the
+    header; fully empty rows are skipped (formatted but blank rows are common).
+    """
+    rows = ws.iter_rows(values_only=True)
+    names = None
+    for cells in rows:
+        if any(c is not None for c in cells):
+            names = _header(cells)
+            break
+    if names is None:
+        return pd.DataFrame()
+
+    width = len(names)
+    columns: List[List[Any]] = [[] for _ in range(width)]
+    for cells in rows:
+        cells = cells[:width]
+        if all(c is None for c in cells):
+            continue
+        if len(cells) < width:
+            cells = cells + (None,) * (width - len(cells))
+        for col, value in zip(columns, cells):
+            # Blank text cells count as missing, like empty CSV fields
+            col.append(None if isinstance(value, str) and not value.strip() else value)
+
+    return pd.DataFrame({name: _typed_column(values) for name, values in zip(names, columns)}, copy=False)
+
+class WorkbookImport:
+    """Parsed and validated content of one workbook. errors: sheet role -> message."""
+    def __init__(self):
+        self.sheets: Dict[str, str] = {} # role -> sheet name
+        self.unused_sheets: List[str] = []
+        self.drivers: Optional[List[DriverConfig]] = None
+        self.cards: Optional[List[DecisionCardConfig]] = None
+        self.survey: Optional[pd.DataFrame] = None
+        self.kpi: Optional[pd.DataFrame] = None
+        self.survey_quality: Optional[Dict[str, Any]] = None # {"penalty", "checks"} as in Evidence Input
+        self.kpi_checks: List[QualityCheckResult] = []
+        self.errors: Dict[str, str] = {}
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+def load_workbook(source: Any, quality_gates: Dict[str, Any] = None, drivers: List[DriverConfig] = None,
+                  roles: List[str] = None, sheet_map: Dict[str, str] = None) -> WorkbookImport:
+    """
+    source: path or binary file object (e.g. a Streamlit upload).
+    roles: only read these roles (default all); other sheets are never streamed.
+    drivers: used for the survey reliability checks when the workbook has no drivers sheet.
+    """
+    result = WorkbookImport()
+    try:
+        wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    except Exception as e:
+        # Corrupt or non-xlsx upload (BadZipFile, InvalidFileException, missing parts...)
+        result.errors["workbook"] = f"Not a readable .xlsx workbook: {e}"
+        return result
+    try:
+        matched = match_sheets(wb.sheetnames, sheet_map)
+        wanted = roles or list(SHEET_ROLES)
+        result.sheets = {role: name for role, name in matched.items() if role in wanted}
+        result.unused_sheets = [s for s in wb.sheetnames if s not in matched.values()]
+        frames: Dict[str, pd.DataFrame] = {}
+        for role, name in result.sheets.items():
+            if name not in wb.sheetnames:
+                result.errors[role] = f"Sheet '{name}' not found"
+                continue
+            frames[role] = read_sheet(wb[name])
+    finally:
+        wb.close()
+
+    if "drivers" in frames:
+        try:
+            result.drivers = DataConverter.csv_to_drivers(frames["drivers"])
+        except Exception as e:
+            result.errors["drivers"] = str(e)
+
+    if "cards" in frames:
+        try:
+            result.cards = DataConverter.csv_to_decision_card(frames["cards"], rules_df=frames.get("rules"))
+        except Exception as e:
+            result.errors["cards"] = str(e)
+    elif "rules" in frames:
+        result.errors["rules"] = "Rules sheet without a cards sheet"
+
+    gateway = QualityGateway(quality_gates or {})
+    if "survey" in frames:
+        result.survey = frames["survey"]
+        penalty, checks = gateway.check_survey_data(result.survey)
+        alpha_penalty, alpha_checks = gateway.check_cronbach_alpha(result.survey, result.drivers or drivers or [])
+        result.survey_quality = {"penalty": min(penalty + alpha_penalty, 1.0), "checks": checks + alpha_checks}
+
+    if "kpi" in frames:
+        result.kpi = frames["kpi"]
+        values = result.kpi.select_dtypes("number")
+        _, result.kpi_checks = gateway.check_kpi_series(values.stack().tolist())
+        if values.shape[1] == 0:
+            result.errors["kpi"] = "KPI sheet has no numeric columns"
+
+    return result
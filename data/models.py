@@ -52,9 +52,27 @@ class DecisionCardConfig(BaseModel):
     # Mutable State Fields (Persisted)
     simulation_impact: Optional[float] = None
     simulation_urgency: Optional[float] = None
+    criteria_values: Dict[str, float] = {} # Values of the extra ranking criteria (AppConfig.criteria), by criterion id
     manual_override_reason: Optional[str] = None
     manual_override_status: Optional[str] = None
 
+class CriterionConfig(BaseModel):
+    id: str # Key into DecisionCardConfig.criteria_values
+    label: str = ""
+    weight: float = 1.0
+    direction: str = "benefit" # "benefit" (higher = more urgent to act) | "cost"
+    range: List[float] = [0.0, 1.0] # [min, max], values are rescaled to 0-1 and clipped
+
+class EvidencePerturbation(BaseModel):
+    variable: str # Evidence context key (driver id or KPI name)
+    op: str = "add" # "add" | "mul" | "set"
+    value: float
+
+class ScenarioConfig(BaseModel):
+    name: str
+    description: str = ""
+    perturbations: List[EvidencePerturbation] = []
+
 class AppConfig(BaseModel):
     version: str
     customer_name: str
@@ -62,6 +80,9 @@ class AppConfig(BaseModel):
     quality_gates: Dict[str, Any]
     decision_cards: List[DecisionCardConfig]
     drivers: List[DriverConfig]
+    scenarios: List[ScenarioConfig] = [] # What-if scenarios (see core.scenario)
+    ranking_ensemble: List[str] = ["SAW", "WASPAS", "TOPSIS"] # Methods averaged by the Composite ranking
+    criteria: List[CriterionConfig] = [] # Ranking criteria beyond impact / urgency / uncertainty (cost, effort, ...)
 
 # Runtime Data Models
 class QualityCheckResult(BaseModel):
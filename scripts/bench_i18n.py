@@ -0,0 +1,24 @@
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.i18n import I18nManager
+
+# Micro-benchmark: I18nManager.get vs. a plain dict lookup
+# Usage: python scripts/bench_i18n.py
+
+N = 200_000
+KEYS = ["sidebar.home", "sidebar.decision_board", "home.title", "common.save", "missing.key"]
+
+def bench(label, fn):
+    t = timeit.timeit(fn, number=N)
+    print(f"{label:<32} {t / N * 1e9:8.1f} ns/call")
+    return t
+
+if __name__ == "__main__":
+    table = I18nManager.table("ja")
+    t_dict = bench("dict.get (baseline)", lambda: [table.get(k) for k in KEYS])
+    t_get = bench("I18nManager.get(lang='ja')", lambda: [I18nManager.get(k, lang="ja") for k in KEYS])
+    print(f"overhead vs dict: x{t_get / t_dict:.2f}")
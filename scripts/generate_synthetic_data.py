@@ -0,0 +1,41 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.io import ConfigLoader
+from core.synthetic import SyntheticSurveyGenerator
+
+# Large, reproducible synthetic datasets for load testing.
+# Example: python scripts/generate_synthetic_data.py --n 1000000 --format parquet
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic survey + KPI data from a config.")
+    parser.add_argument("--config", default="configs/customer_default.yaml")
+    parser.add_argument("--n", type=int, default=10_000, help="Number of respondents")
+    parser.add_argument("--months", type=int, default=24, help="KPI months per segment")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--alpha", type=float, default=0.8, help="Target Cronbach's alpha per driver")
+    parser.add_argument("--missing", type=float, default=0.02, help="Item-level missing rate")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--out", default="data/synthetic")
+    args = parser.parse_args()
+
+    config = ConfigLoader(args.config).load_config()
+    gen = SyntheticSurveyGenerator(config, seed=args.seed, target_alpha=args.alpha, missing_rate=args.missing)
+
+    os.makedirs(args.out, exist_ok=True)
+    survey_path = os.path.join(args.out, f"survey_{args.n}.{args.format}")
+    start = time.perf_counter()
+    rows = gen.write_survey(survey_path, args.n, chunk_size=args.chunk_size)
+    print(f"Wrote {rows} respondents to {survey_path} in {time.perf_counter() - start:.1f}s")
+
+    kpi_path = os.path.join(args.out, "kpi.csv")
+    gen.kpi_series(months=args.months).to_csv(kpi_path, index=False)
+    print(f"Wrote KPI series to {kpi_path}")
+
+if __name__ == "__main__":
+    main()
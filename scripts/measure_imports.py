@@ -0,0 +1,57 @@
+import ast
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+# Cold-start import cost per Streamlit page, via `python -X importtime`.
+# Runs each page's top-level import statements in a fresh interpreter and reports
+# total import time plus which heavy optional dependencies got loaded eagerly.
+# Usage: python scripts/measure_imports.py [--repeat 3]
+
+PAGES = ["app/main.py"] + sorted(os.path.join("app/pages", f) for f in os.listdir(os.path.join(ROOT, "app/pages")) if f.endswith(".py"))
+HEAVY = ["openai", "google.generativeai", "docx", "graphviz", "cryptography"]
+
+def page_imports(path: str) -> str:
+    """Top-level import statements of a page (minus the sys.path tweak)."""
+    with open(os.path.join(ROOT, path), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    lines = [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(["import sys", f"sys.path.insert(0, {ROOT!r})"] + lines)
+
+def measure(code: str):
+    """(total import seconds, set of loaded module names)"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    total_us, loaded = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = [p.strip() for p in line[len("import time:"):].split("|")]
+        total_us += int(self_us)
+        loaded.add(name)
+    return total_us / 1e6, loaded
+
+def reload_overhead(n: int = 20) -> float:
+    """Seconds per rerun of the old unconditional importlib.reload(core.priority/io/visualizer)."""
+    import importlib
+    import core.priority, core.io, core.visualizer
+    start = time.perf_counter()
+    for _ in range(n):
+        for m in (core.priority, core.io, core.visualizer):
+            importlib.reload(m)
+    return (time.perf_counter() - start) / n
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[sys.argv.index("--repeat") + 1]) if "--repeat" in sys.argv else 3
+    print(f"{'page':<32} {'import (ms)':>12}  eager heavy deps")
+    for page in PAGES:
+        runs = [measure(page_imports(page)) for _ in range(repeat)]
+        best = min(t for t, _ in runs)
+        heavy = [h for h in HEAVY if h in runs[0][1]]
+        print(f"{page:<32} {best * 1e3:12.1f}  {', '.join(heavy) or '-'}")
+    print(f"\nper-rerun importlib.reload (priority, io, visualizer): {reload_overhead() * 1e3:.2f} ms")
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from benchmarks.bench_pipeline import make_config_dict
+from data.models import AppConfig
+
+# Ranking methods the table-level tests check against the per-card path
+METHODS = ["SAW (Transparent)", "WASPAS", "TOPSIS", "Composite"]
+PAIRWISE_METHODS = ["VIKOR", "PROMETHEE", "ELECTRE"]
+
+@pytest.fixture(params=METHODS)
+def method(request):
+    return request.param
+
+@pytest.fixture(params=METHODS + PAIRWISE_METHODS)
+def any_method(request):
+    return request.param
+
+@pytest.fixture
+def make_board():
+    """
+    Factory: make_board(cards, drivers=6, items=2, kpis=4, seed=1) -> (config, context).
+    Synthetic config (see benchmarks.bench_pipeline) with driver scores drawn in 1-5 and
+    kpi_{k}_rate in 0-0.3 for every KPI but the last, so the cards on the last KPI are UNKNOWN.
+    """
+    def make(cards=60, drivers=6, items=2, kpis=4, seed=1):
+        config = AppConfig(**make_config_dict(drivers=drivers, items=items, cards=cards, kpis=kpis))
+        rng = np.random.default_rng(seed)
+        context = {d.id: float(rng.uniform(1, 5)) for d in config.drivers}
+        context.update({f"kpi_{k}_rate": float(rng.uniform(0, 0.3)) for k in range(kpis - 1)})
+        return config, context
+    return make
@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubState:
+    """Scripted behaviour + recorded requests for the stub server."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = []
+        self.statuses = [] # Queue of status codes to return before succeeding
+        self.reply = "id1,Label,Q1,1-5"
+        self.delay = 0.0
+        self.reject_system_role = False
+        self.inflight = 0
+        self.max_inflight = 0
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.endswith("/models"):
+            self._send(200, {"object": "list", "data": [
+                {"id": "gpt-4o", "object": "model", "created": 0, "owned_by": "stub"},
+                {"id": "text-embedding-3", "object": "model", "created": 0, "owned_by": "stub"}
+            ]})
+        else:
+            self._send(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        state = self.server.state
+        length = int(self.headers.get("Content-Length", 0))
+        req = json.loads(self.rfile.read(length) or b"{}")
+        with state.lock:
+            state.requests.append(req)
+            status = state.statuses.pop(0) if state.statuses else 200
+            state.inflight += 1
+            state.max_inflight = max(state.max_inflight, state.inflight)
+        try:
+            if state.delay:
+                time.sleep(state.delay)
+            if status == 429:
+                self._send(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                           headers={"Retry-After": "0"})
+                return
+            if status != 200:
+                self._send(status, {"error": {"message": "stub error", "type": "server_error"}})
+                return
+            if state.reject_system_role and any(m["role"] == "system" for m in req.get("messages", [])):
+                self._send(400, {"error": {"message": "Developer instruction is not enabled", "type": "invalid_request_error"}})
+                return
+            self.respond(req, state)
+        finally:
+            with state.lock:
+                state.inflight -= 1
+
+    def respond(self, req, state):
+        self._send(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": req.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": state.reply},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        })
+
+class StubServer:
+    """Local server mimicking the OpenAI chat-completions API (/v1)."""
+    handler = _Handler
+
+    def __init__(self):
+        self.state = StubState()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class _StreamingHandler(_Handler):
+    """Adds SSE streaming (stream=true) in the OpenAI chunk format."""
+    def respond(self, req, state):
+        if not req.get("stream"):
+            return super().respond(req, state)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for piece in state.chunks:
+            event = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": req.get("model"),
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(state.chunk_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+class StreamingStubServer(StubServer):
+    handler = _StreamingHandler
+
+    def __init__(self):
+        super().__init__()
+        self.state.chunks = []
+        self.state.chunk_delay = 0.0
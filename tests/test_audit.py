@@ -0,0 +1,58 @@
+import json
+from datetime import datetime, timedelta
+from core.audit import AuditLogger, AuditIndex
+
+def test_audit_query_by_index(tmp_path):
+    log_path = str(tmp_path / "audit.log")
+    logger = AuditLogger(log_path)
+    logger.log_action("D001", "S1", "Approve", "ok", user_target="alice")
+    logger.log_action("D002", "S1", "Override", "bad data", user_target="bob")
+    logger.log_action("D001", "S2", "Override", "changed", user_target="bob")
+
+    assert [e["snapshot_id"] for e in logger.query(card_id="D001")] == ["S1", "S2"]
+    assert len(list(logger.query(user="bob"))) == 2
+    assert [e["card_id"] for e in logger.query(snapshot_id="S1", action="Override")] == ["D002"]
+    assert list(logger.query(card_id="missing")) == []
+
+    # Most recent first
+    assert logger.card_history("D001")[0]["snapshot_id"] == "S2"
+
+def test_audit_time_range(tmp_path):
+    logger = AuditLogger(str(tmp_path / "audit.log"))
+    logger.log_action("D001", "S1", "Approve", "ok")
+
+    now = datetime.now()
+    assert len(list(logger.query(since=now - timedelta(days=1)))) == 1
+    assert list(logger.query(since=now + timedelta(days=1))) == []
+    assert list(logger.query(until=now - timedelta(days=40))) == []
+
+def test_audit_index_catches_up_external_appends(tmp_path):
+    log_path = str(tmp_path / "audit.log")
+    AuditLogger(log_path).log_action("D001", "S1", "Approve", "ok")
+
+    # Another process appends without touching the sidecar
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"timestamp": datetime.now().isoformat(), "card_id": "D009",
+                            "snapshot_id": "S1", "action": "Edit", "reason": "", "user": "x"}) + "\n")
+
+    logger = AuditLogger(log_path)
+    assert [e["card_id"] for e in logger.query(snapshot_id="S1")] == ["D001", "D009"]
+
+    # Sidecar persisted the new entry
+    index = AuditIndex(log_path)
+    assert "D009" in index.fields["card_id"]
+
+def test_audit_index_checkpoints_and_history_limit(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "audit.log")
+    logger = AuditLogger(log_path)
+    saves = []
+    monkeypatch.setattr(logger.index, "save", lambda: saves.append(1))
+    for i in range(200):
+        logger.log_action(f"D{i % 3}", "S1", "Edit", str(i))
+    assert saves == [] # Appends don't rewrite the sidecar
+
+    # A fresh logger re-indexes the unsaved tail
+    reopened = AuditLogger(log_path)
+    assert len(list(reopened.query(card_id="D1"))) == 67
+    assert [e["reason"] for e in reopened.card_history("D0", limit=3)] == ["198", "195", "192"]
+    assert len(AuditIndex(log_path).fields["card_id"]["D2"]) == 66
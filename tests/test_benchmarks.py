@@ -0,0 +1,16 @@
+from benchmarks.bench_pipeline import SIZES, run_size, compare
+
+def test_benchmark_suite_runs_all_stages(tmp_path):
+    results = run_size(SIZES["tiny"], repeat=1, workdir=str(tmp_path))
+    expected = {"load_config", "load_config_uncached", "quality_gate", "driver_scores", "evaluate_cards", "prepare_candidates",
+                "rank_SAW", "rank_WASPAS", "rank_TOPSIS", "rank_Composite", "generate_docx", "snapshot_freeze"}
+    assert expected <= set(results)
+    assert all(r["min"] >= 0 for r in results.values())
+
+def test_benchmark_compare_flags_regressions():
+    old = {"commit": "aaa", "sizes": {"tiny": {"n": 1}}, "results": {"tiny": {"rank_SAW": {"min": 0.010}}}}
+    new = {"commit": "bbb", "sizes": {"tiny": {"n": 1}}, "results": {"tiny": {"rank_SAW": {"min": 0.020}}}}
+    lines = compare(new, [old])
+    assert len(lines) == 1 and "REGRESSION" in lines[0]
+    # Different size parameters are not comparable
+    assert compare(new, [dict(old, sizes={"tiny": {"n": 2}})]) == []
@@ -0,0 +1,91 @@
+import math
+from types import SimpleNamespace
+import numpy as np
+from core.board import filter_mask, paginate_table, stakeholder_options, table_status_counts
+from core.card_table import CardTable, STATUS_INDEX
+from data.models import CardStatus
+
+def make_states(n=25):
+    rows = []
+    for i in range(n):
+        card = SimpleNamespace(id=f"C{i}", title=f"Card {i}", stakeholders=["HR"] if i % 2 else ["Finance", "HR"])
+        state = SimpleNamespace(status=["RED", "YELLOW", "GREEN"][i % 3], total_priority=i / 10)
+        rows.append((card, state, {}, 0.5, 0.5))
+    return rows
+
+def make_table(rows, score=None, top_k=None):
+    n = len(rows)
+    status = np.array([STATUS_INDEX[CardStatus(r[1].status)] for r in rows], dtype=np.int8)
+    table = CardTable([r[0] for r in rows], status, np.zeros(n, dtype=np.int16), np.full(n, 0.5), np.full(n, 0.5), np.zeros(n))
+    if score is None:
+        score = np.array([r[1].total_priority for r in rows])
+    table.set_ranking(score, "SAW", {}, None, top_k=top_k)
+    return table
+
+# Reference implementations over plain (card, state, ...) rows in ranking order
+
+def reference_filter(rows, statuses=None, stakeholders=None, min_score=None, query=""):
+    query = query.strip().lower()
+    return [r for r in rows
+            if (not statuses or r[1].status in statuses)
+            and (not stakeholders or set(stakeholders) & set(r[0].stakeholders))
+            and (min_score is None or r[1].total_priority >= min_score)
+            and (not query or query in r[0].title.lower() or query in r[0].id.lower())]
+
+def reference_paginate(items, page, page_size):
+    pages = max(1, math.ceil(len(items) / page_size))
+    page = min(max(1, page), pages)
+    return items[(page - 1) * page_size:page * page_size], page, pages
+
+def filtered_ids(table, **kwargs):
+    keep = filter_mask(table, **kwargs)
+    return [table.ids[i] for i in table.order[keep[table.order]]]
+
+def test_filters_combine_and_preserve_order():
+    table = make_table(make_states())
+    assert filtered_ids(table) == [f"C{i}" for i in range(24, -1, -1)]
+    assert filtered_ids(table, statuses=["RED"]) == [f"C{i}" for i in range(24, -1, -3)]
+    assert filtered_ids(table, stakeholders=["Finance"], min_score=1.5) == ["C24", "C22", "C20", "C18", "C16"]
+    assert filtered_ids(table, query="card 1")[-2:] == ["C10", "C1"]
+    assert filtered_ids(table, statuses=["PURPLE"]) == []
+
+def test_paginate_clamps_page():
+    table = make_table(make_states())
+    keep = np.ones(25, dtype=bool)
+    rows, page, pages, total = paginate_table(table, keep, 3, 10)
+    assert [table.ids[i] for i in rows] == ["C4", "C3", "C2", "C1", "C0"] and (page, pages, total) == (3, 3, 25)
+    assert paginate_table(table, keep, 99, 10)[1] == 3
+    rows, page, pages, total = paginate_table(table, np.zeros(25, dtype=bool), 1, 10)
+    assert len(rows) == 0 and (page, pages, total) == (1, 1, 0)
+
+def test_options_and_counts():
+    rows = make_states(6)
+    assert stakeholder_options([r[0] for r in rows]) == ["Finance", "HR"]
+    assert table_status_counts(make_table(rows)) == {"RED": 2, "YELLOW": 2, "GREEN": 2}
+    assert table_status_counts(make_table(make_states())) == {"RED": 9, "YELLOW": 8, "GREEN": 8}
+
+def test_table_filters_match_reference():
+    rows = make_states()
+    table = make_table(rows)
+    ranked = [rows[i] for i in table.order]
+    for kwargs in [{}, {"statuses": ["RED"]}, {"stakeholders": ["Finance"], "min_score": 1.5}, {"query": "card 1"},
+                   {"statuses": ["GREEN", "YELLOW"], "query": "2"}]:
+        assert filtered_ids(table, **kwargs) == [r[0].id for r in reference_filter(ranked, **kwargs)]
+
+def test_paginate_table_orders_only_what_is_shown():
+    rows = make_states(200)
+    score = np.round(np.random.default_rng(4).uniform(0, 3, 200), 1) # Many ties
+    for r, s in zip(rows, score):
+        r[1].total_priority = s
+    full = make_table(rows, score)
+    ranked = [rows[i] for i in full.order]
+    for kwargs in [{}, {"statuses": ["RED"]}, {"stakeholders": ["Finance"], "min_score": 1.5}, {"query": "card 1"}]:
+        matching = [int(r[0].id[1:]) for r in reference_filter(ranked, **kwargs)]
+        for page in (1, 2, 5, 99):
+            table = make_table(rows, score, top_k=20)
+            got = paginate_table(table, filter_mask(table, **kwargs), page, 10)
+            expected = reference_paginate(matching, page, 10)
+            assert got[0].tolist() == expected[0] and got[1:3] == expected[1:] and got[3] == len(matching)
+    table = make_table(rows, score, top_k=20)
+    paginate_table(table, filter_mask(table), 2, 10)
+    assert table.ranked == 20 # First pages come from the top-k alone
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from core.decision import DecisionEngine
+from core.priority import PriorityCalculator
+from core.card_table import top_order
+from core.scoring import prepare_candidates, prepare_card_table
+
+def _setup(make_board, cards=60):
+    config, context = make_board(cards)
+    config.decision_cards[3].simulation_impact = 0.15
+    config.decision_cards[4].simulation_urgency = 1.0
+    for card in config.decision_cards[::5]:
+        card.rules[0].message = "Junior turnover risk"
+        card.rules[1].message = "Overtime high"
+    return config, context
+
+def test_card_table_matches_candidate_dicts(make_board, method):
+    config, context = _setup(make_board)
+    engine, calc = DecisionEngine(), PriorityCalculator(config.priority_weights)
+    ranked = calc.rank_candidates(prepare_candidates(config.decision_cards, engine, context, 0.2), method=method)
+    table = calc.rank_table(prepare_card_table(config.decision_cards, engine, context, 0.2), method=method)
+
+    assert [table.ids[i] for i in table.order] == [c["id"] for c in ranked]
+    np.testing.assert_allclose(table.score[table.order], [c["score"] for c in ranked], rtol=1e-12, atol=1e-12)
+
+    rows = table.rows(table.order)
+    for (card, state, details, impact, urgency), item in zip(rows, ranked):
+        assert card is item["_card"]
+        expected = item["_state"]
+        assert (state.status, state.key_evidence, state.recommendation_draft) == (expected.status, expected.key_evidence, expected.recommendation_draft)
+        assert (impact, urgency) == (item["impact"], item["urgency"])
+        assert details.keys() == dict(item["_details"], score=0).keys()
+        assert state.total_priority == pytest.approx(item["score"])
+    assert {s.status for _, s, _, _, _ in rows} >= {"RED", "UNKNOWN"}
+
+def test_card_table_ranks_maps_and_memory(make_board):
+    config, context = _setup(make_board, cards=200)
+    engine, calc = DecisionEngine(), PriorityCalculator(config.priority_weights)
+    table = calc.rank_table(prepare_card_table(config.decision_cards, engine, context, 0.0), "SAW")
+    assert table.ranks[table.order[0]] == 0 and sorted(table.ranks.tolist()) == list(range(200))
+    assert table.score_map()[table.ids[5]] == table.score[5]
+    assert set(table.status_map().values()) <= {"RED", "YELLOW", "GREEN", "UNKNOWN"}
+    assert table.nbytes() / len(table) < 64
+    empty = calc.rank_table(prepare_card_table([], engine, context, 0.0), "TOPSIS")
+    assert len(empty) == 0 and empty.rows(empty.order) == []
+
+def test_top_order_matches_stable_sort_prefix():
+    rng = np.random.default_rng(3)
+    for score in (np.round(rng.uniform(0, 1, 500), 2), np.zeros(50), rng.uniform(0, 1, 300)):
+        full = np.argsort(-score, kind="stable")
+        for k in (0, 1, 7, 49, 50, len(score), len(score) + 5):
+            np.testing.assert_array_equal(top_order(score, k), full[:k])
+
+@pytest.mark.parametrize("method", ["SAW", "TOPSIS"])
+def test_top_k_ranking_is_lazy(make_board, method):
+    config, context = _setup(make_board, cards=200)
+    engine, calc = DecisionEngine(), PriorityCalculator(config.priority_weights)
+    full = calc.rank_table(prepare_card_table(config.decision_cards, engine, context, 0.2), method)
+    table = calc.rank_table(prepare_card_table(config.decision_cards, engine, context, 0.2), method, top_k=15)
+    assert table.ranked == 15
+    assert [table.rank_of(i) for i in range(len(table))] == full.ranks.tolist()
+    np.testing.assert_array_equal(table.head(10), full.order[:10])
+    np.testing.assert_array_equal(table.head(40), full.order[:40]) # Past the top-k: extended, not fully sorted
+    assert table.ranked == 40
+    np.testing.assert_array_equal(table.order, full.order)
+    np.testing.assert_array_equal(table.ranks, full.ranks)
+
+    candidates = prepare_candidates(config.decision_cards, engine, context, 0.2)
+    top = calc.rank_candidates(candidates, method, top_k=15)
+    assert [c["id"] for c in top] == [full.ids[i] for i in full.order[:15]]
+    assert all("score" in c for c in candidates) and sum("_details" in c for c in candidates) == 15
+
+def test_decision_memo_lists_every_card(make_board):
+    from docx import Document
+    from core.report import ReportGenerator
+    config, context = make_board(120)
+    table = PriorityCalculator(config.priority_weights).rank_table(
+        prepare_card_table(config.decision_cards, DecisionEngine(), context, 0.2), top_k=20)
+    order = table.order # As on the Freeze page: the memo is an audit artifact, not a top-k view
+    buffer = ReportGenerator(config).generate_docx({"status": "DRAFT"}, [row[:3] for row in table.rows(order)], "S1")
+    memo = Document(buffer).tables[0]
+    assert [r.cells[0].text for r in memo.rows[1:]] == [table.ids[i] for i in order]
+    assert len(memo.rows) == len(table) + 1
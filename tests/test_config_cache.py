@@ -0,0 +1,57 @@
+import os
+import shutil
+import pytest
+from core import io as core_io
+from core.io import ConfigLoader
+
+CONFIG = "configs/customer_default.yaml"
+
+@pytest.fixture
+def config_copy(tmp_path):
+    path = str(tmp_path / "config.yaml")
+    shutil.copy(CONFIG, path)
+    return path, str(tmp_path / "cache")
+
+def test_cache_hit_skips_parsing(config_copy, monkeypatch):
+    path, cache_dir = config_copy
+    first = ConfigLoader(path, cache_dir=cache_dir).load_config()
+    assert len(os.listdir(cache_dir)) == 1
+
+    def fail(*a, **k):
+        raise AssertionError("parsed despite warm cache")
+    monkeypatch.setattr(ConfigLoader, "_parse", fail)
+    second = ConfigLoader(path, cache_dir=cache_dir).load_config()
+    assert second == first and second is not first # Fresh, independent objects
+
+    # Touched but unchanged content -> still a hit (content hash)
+    os.utime(path, ns=(0, 0))
+    assert ConfigLoader(path, cache_dir=cache_dir).load_config() == first
+
+def test_changed_content_invalidates(config_copy):
+    path, cache_dir = config_copy
+    first = ConfigLoader(path, cache_dir=cache_dir).load_config()
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace(first.customer_name, "Changed Co", 1))
+    assert ConfigLoader(path, cache_dir=cache_dir).load_config().customer_name == "Changed Co"
+
+def test_corrupt_or_stale_cache_is_ignored(config_copy, monkeypatch):
+    path, cache_dir = config_copy
+    loader = ConfigLoader(path, cache_dir=cache_dir)
+    expected = loader.load_config()
+    with open(loader._cache_path(), "wb") as f:
+        f.write(b"not a pickle")
+    assert ConfigLoader(path, cache_dir=cache_dir).load_config() == expected
+
+    monkeypatch.setattr(core_io, "CONFIG_CACHE_VERSION", 999)
+    calls = []
+    original = ConfigLoader._parse
+    monkeypatch.setattr(ConfigLoader, "_parse", lambda self, raw: calls.append(1) or original(self, raw))
+    assert ConfigLoader(path, cache_dir=cache_dir).load_config() == expected
+    assert calls == [1]
+
+def test_uncached_matches_cached(config_copy):
+    path, cache_dir = config_copy
+    assert ConfigLoader(path, use_cache=False).load_config() == ConfigLoader(path, cache_dir=cache_dir).load_config()
+    assert not os.path.exists(os.path.join(os.path.dirname(path), ".cache"))
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.converter import DataConverter
+from core.io import ConfigLoader
+from data.models import CardStatus, DecisionCardConfig, RuleConfig, RecommendationTemplate
+
+def test_cards_round_trip_default_config():
+    config = ConfigLoader("configs/customer_default.yaml", use_cache=False).load_config()
+    df = DataConverter.decision_card_to_csv(config.decision_cards, include_templates=True)
+    cards = DataConverter.csv_to_decision_card(df)
+    assert [c.model_dump() for c in cards] == [c.model_dump() for c in config.decision_cards]
+    # Validated and bulk-constructed models compare equal
+    assert cards == config.decision_cards
+
+def test_cards_round_trip_survives_csv_text():
+    card = DecisionCardConfig(
+        id="C1", title="Pipes | colons: ok", decision_question="Why?", stakeholders=["HR", "CEO"],
+        required_evidence={"drivers": ["d1"], "kpis": []},
+        rules=[RuleConfig(condition="d1 < 3", status=CardStatus.RED, message="Low: act | now"),
+               RuleConfig(condition="d1 < 4", status=CardStatus.YELLOW, message="")],
+        recommendation_templates=[RecommendationTemplate(id="R1", action="Do it", risks="None")]
+    )
+    csv_text = DataConverter.decision_card_to_csv([card], include_templates=True).to_csv(index=False)
+    from io import StringIO
+    back = DataConverter.csv_to_decision_card(pd.read_csv(StringIO(csv_text)))
+    assert back[0].model_dump() == card.model_dump()
+
+def test_cards_round_trip_keeps_criteria_values():
+    base = dict(title="T", decision_question="Q", stakeholders=["HR"], required_evidence={"drivers": ["d1"], "kpis": []}, rules=[])
+    cards = [DecisionCardConfig(id="C1", criteria_values={"cost": 0.7, "headcount": 12.0}, **base),
+             DecisionCardConfig(id="C2", **base)]
+    df = DataConverter.decision_card_to_csv(cards, include_templates=True)
+    assert [c.criteria_values for c in DataConverter.csv_to_decision_card(df)] == [{"cost": 0.7, "headcount": 12.0}, {}]
+    from io import StringIO
+    back = DataConverter.csv_to_decision_card(pd.read_csv(StringIO(df.to_csv(index=False))))
+    assert [c.model_dump() for c in back] == [c.model_dump() for c in cards]
+
+def test_card_parsing_rules_and_missing_cells():
+    df = pd.DataFrame({
+        "id": [1, 2], "title": ["A", "B"], "decision_question": ["q", "q"],
+        "stakeholders": [" HR , ,CEO", np.nan],
+        "drivers": ["d1,d2", None], "kpis": [np.nan, "k1"],
+        "rules": ["d1 < 3:red|k1 > 0.1:YELLOW:msg: with colon| ", np.nan],
+    })
+    a, b = DataConverter.csv_to_decision_card(df)
+    assert a.id == "1" and a.stakeholders == ["HR", "CEO"]
+    assert a.required_evidence == {"drivers": ["d1", "d2"], "kpis": []}
+    assert [(r.condition, r.status, r.message) for r in a.rules] == [
+        ("d1 < 3", CardStatus.RED, "Rule triggered: d1 < 3"),
+        ("k1 > 0.1", CardStatus.YELLOW, "msg: with colon"),
+    ]
+    assert b.stakeholders == [] and b.rules == [] and b.required_evidence == {"drivers": [], "kpis": ["k1"]}
+    assert DataConverter.csv_to_decision_card(df.iloc[0:0]) == []
+
+def test_drivers_round_trip_and_ranges():
+    config = ConfigLoader("configs/customer_default.yaml", use_cache=False).load_config()
+    assert DataConverter.csv_to_drivers(DataConverter.drivers_to_csv(config.drivers)) == config.drivers
+
+    df = pd.DataFrame({"id": ["a", "b", "c"], "label": ["A", "B", "C"],
+                       "survey_items": ["q1, q2", np.nan, "q3"], "range": ["0-10", np.nan, "7"]})
+    a, b, c = DataConverter.csv_to_drivers(df)
+    assert a.range == [0.0, 10.0] and a.survey_items == ["q1", "q2"]
+    assert b.range == [1.0, 5.0] and b.survey_items == []
+    assert c.range == [1.0, 5.0]
+    with pytest.raises(ValueError):
+        DataConverter.csv_to_drivers(pd.DataFrame({"id": ["x"], "label": ["X"], "survey_items": ["q"], "range": ["1-high"]}))
+
+def test_row_path_matches_columnar_path():
+    cards_df = pd.DataFrame({
+        "id": ["C1", "C2"], "title": ["A", "B"], "decision_question": ["q", "q"],
+        "stakeholders": ["HR,CEO", ""], "drivers": ["d1, d2", np.nan], "kpis": ["k1", ""],
+        "rules": ["d1 < 3:red:Low \\| act|k1 > 1:GREEN", ""],
+    })
+    for row, card in zip(cards_df.to_dict("records"), DataConverter.csv_to_decision_card(cards_df)):
+        assert DataConverter.card_from_row(row) == card
+    drivers_df = pd.DataFrame({"id": ["a", "b"], "label": ["A", "B"], "survey_items": ["q1,q2", np.nan], "range": ["1-7", "x"]})
+    for row, driver in zip(drivers_df.to_dict("records"), DataConverter.csv_to_drivers(drivers_df)):
+        assert DataConverter.driver_from_row(row) == driver
+    assert DataConverter.validate_row({"id": "x", "label": "X", "survey_items": "q", "range": "1-high"}, "Drivers")
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from core.decision import DecisionEngine
+from core.priority import PriorityCalculator, criteria_from_frame, criteria_to_frame
+from core.scenario import ScenarioEngine
+from core.scoring import prepare_candidates, prepare_card_table
+from core.sensitivity import WeightSensitivity, grid_steps, sample_weights, score_matrix_batch, weight_grid
+from data.models import CriterionConfig, ScenarioConfig
+
+CRITERIA = [
+    CriterionConfig(id="cost", weight=0.7, direction="cost", range=[0, 50000]),
+    CriterionConfig(id="strategic_fit", weight=1.2),
+    CriterionConfig(id="headcount", weight=0.4, range=[0, 200]),
+]
+
+def _setup(make_board, cards=50):
+    config, context = make_board(cards, drivers=4, kpis=3, seed=11)
+    config.criteria = CRITERIA
+    rng = np.random.default_rng(11)
+    for i, card in enumerate(config.decision_cards):
+        card.criteria_values = {"cost": float(rng.uniform(0, 60000)), "strategic_fit": float(rng.uniform(0, 1)),
+                                "headcount": float(rng.integers(0, 200))}
+        if i % 7 == 0:
+            del card.criteria_values["strategic_fit"] # Unset -> middle of the range
+    calc = PriorityCalculator(config.priority_weights, ensemble=["SAW", "TOPSIS", "ELECTRE"], criteria=config.criteria)
+    return config, context, calc
+
+def test_table_matches_candidates_with_extra_criteria(make_board, any_method):
+    config, context, calc = _setup(make_board)
+    engine = DecisionEngine()
+    ranked = calc.rank_candidates(prepare_candidates(config.decision_cards, engine, context, 0.2), method=any_method)
+    table = calc.rank_table(prepare_card_table(config.decision_cards, engine, context, 0.2), method=any_method)
+    assert [table.ids[i] for i in table.order] == [c["id"] for c in ranked]
+    np.testing.assert_allclose(table.score[table.order], [c["score"] for c in ranked], rtol=1e-12, atol=1e-12)
+    for i, item in zip(table.order.tolist(), ranked):
+        assert dict(table.details(i), score=0) == dict(item["_details"], score=0)
+
+def test_saw_terms_ranges_and_directions(make_board):
+    config, _, calc = _setup(make_board)
+    res = calc.calculate_saw(0.8, 0.5, 0.2, {"cost": 60000, "headcount": 50})
+    assert res["inputs"] == {"impact": 0.8, "urgency": 0.5, "uncertainty": 0.2, "cost": 1.0, "strategic_fit": 0.5, "headcount": 0.25}
+    assert res["breakdown"]["cost_term"] == -0.7 and res["breakdown"]["headcount_term"] == 0.1
+    assert res["score"] == pytest.approx(0.8 * 1.0 + 0.5 * 1.5 - 0.2 * 1.0 - 0.7 + 0.5 * 1.2 + 0.1)
+    score, _ = calc.score_arrays(np.array([0.8]), np.array([0.5]), np.array([0.2]), "SAW", np.array([[60000, np.nan, 50]]))
+    assert score[0] == res["score"]
+
+def test_topsis_and_electre_any_number_of_criteria():
+    rng = np.random.default_rng(5)
+    for k in (4, 10, 18): # uint8 / uint16 concordance patterns / summed weights
+        extra = [CriterionConfig(id=f"c{j}", weight=float(rng.uniform(0.1, 2)), direction="cost" if j % 3 == 0 else "benefit")
+                 for j in range(k - 3)]
+        calc = PriorityCalculator({"impact": 1.0, "urgency": 0.5, "uncertainty": 0.8}, criteria=extra)
+        x = rng.uniform(0, 1, (45, k))
+        x[:, 2] = x[0, 2] # Constant column
+        sign = np.where(calc.benefit, 1.0, -1.0)
+        w = calc.weights / calc.weights.sum()
+
+        m = x / np.linalg.norm(x, axis=0) * w
+        ideal, anti = np.where(calc.benefit, m.max(0), m.min(0)), np.where(calc.benefit, m.min(0), m.max(0))
+        d_pos, d_neg = np.linalg.norm(m - ideal, axis=1), np.linalg.norm(m - anti, axis=1)
+        np.testing.assert_allclose(calc.score_matrix(x, "TOPSIS")[0], d_neg / (d_pos + d_neg))
+
+        o = x * sign
+        concordance = (o[:, None, :] >= o[None, :, :]) @ w
+        veto = ((o[None, :, :] - o[:, None, :]) > calc.ELECTRE_DISCORDANCE * np.ptp(o, axis=0)).any(axis=2)
+        s = (concordance >= calc.ELECTRE_CONCORDANCE - 1e-12) & ~veto
+        np.fill_diagonal(s, False)
+        calc.PAIRWISE_BLOCK = 400
+        _, aux = calc.score_matrix(x, "ELECTRE")
+        np.testing.assert_array_equal(aux["outranks"], s.sum(axis=1))
+        np.testing.assert_array_equal(aux["outranked_by"], s.sum(axis=0))
+
+def test_weight_batches_with_extra_criteria(make_board, any_method):
+    config, context, calc = _setup(make_board, cards=30)
+    table = calc.rank_table(prepare_card_table(config.decision_cards, DecisionEngine(), context, 0.1), any_method)
+    weights = sample_weights(4, calc.weights, seed=2)
+    assert weights.shape == (4, 6) and np.allclose(weights.sum(axis=1), calc.weights.sum())
+    batch = score_matrix_batch(calc, calc.table_matrix(table), weights, any_method)
+    for j, w in enumerate(weights):
+        np.testing.assert_allclose(batch[:, j], calc.with_weights(w).score_matrix(calc.table_matrix(table), any_method)[0], atol=1e-12)
+
+def test_sensitivity_and_scenarios_with_extra_criteria(make_board):
+    config, context, calc = _setup(make_board)
+    engine = DecisionEngine()
+    table = calc.rank_table(prepare_card_table(config.decision_cards, engine, context, 0.0), "SAW")
+    df = WeightSensitivity(calc).critical_changes(table, pairs=10)
+    assert {"delta_cost", "delta_strategic_fit", "delta_headcount"} <= set(df.columns)
+    for row in df[df["critical_weight"].notna()].itertuples():
+        k = calc.criteria_ids.index(row.critical_weight)
+        a, b = table.ids.index(row.id), table.ids.index(row.next_id)
+        w = calc.weights.copy()
+        w[k] += 1.01 * row.critical_delta
+        score = calc.with_weights(w).score_matrix(calc.table_matrix(table), "SAW")[0]
+        assert score[b] > score[a]
+
+    grid = weight_grid(grid_steps(6), total=6.0, k=6)
+    assert 0 < len(grid) <= 5000 and grid.shape[1] == 6 and np.allclose(grid.sum(axis=1), 6.0)
+
+    batch = ScenarioEngine(engine, calc).run(config.decision_cards, context, [ScenarioConfig(name="s")])
+    np.testing.assert_allclose(batch.score[0], table.score)
+
+def test_criteria_validation():
+    with pytest.raises(ValueError):
+        PriorityCalculator({}, criteria=[CriterionConfig(id="impact")])
+    with pytest.raises(ValueError):
+        PriorityCalculator({}, criteria=[CriterionConfig(id="effort", direction="down")])
+    with pytest.raises(ValueError):
+        PriorityCalculator({}, criteria=[CriterionConfig(id="effort", range=[5, 5])])
+
+def test_criteria_frame_round_trip():
+    df = criteria_to_frame(CRITERIA)
+    assert criteria_from_frame(df) == CRITERIA
+    df.loc[len(df)] = [None, "", 1.0, "benefit", 0.0, 1.0] # Blank row skipped
+    assert len(criteria_from_frame(df)) == 3
+    for column, value in (("id", "urgency"), ("direction", "down"), ("max", -1.0)):
+        bad = criteria_to_frame(CRITERIA)
+        bad.loc[1, column] = value
+        with pytest.raises(ValueError, match="row 1"):
+            criteria_from_frame(bad)
@@ -0,0 +1,44 @@
+import json
+import os
+import pytest
+from core.i18n import I18nManager
+
+@pytest.fixture
+def locales(tmp_path, monkeypatch):
+    path = tmp_path / "locales.json"
+    path.write_text(json.dumps({
+        "en": {"sidebar": {"home": "Home", "board": "Board"}, "common": {"save": "Save"}},
+        "ja": {"sidebar": {"home": "ホーム"}}
+    }), encoding="utf-8")
+    monkeypatch.setattr(I18nManager, "_file_path", str(path))
+    monkeypatch.setattr(I18nManager, "_cache", {})
+    monkeypatch.setattr(I18nManager, "_flat", {})
+    monkeypatch.setattr(I18nManager, "_mtime", None)
+    monkeypatch.setattr(I18nManager, "_checked_at", 0.0)
+    return path
+
+def test_i18n_flat_lookup_with_fallback(locales):
+    assert I18nManager.get("sidebar.home", lang="ja") == "ホーム"
+    assert I18nManager.get("sidebar.board", lang="ja") == "Board" # English fallback
+    assert I18nManager.get("missing.key", "Default", lang="ja") == "Default"
+    assert I18nManager.get("missing.key", lang="en") == "missing.key"
+    assert I18nManager.get("sidebar", lang="en") == "sidebar" # Non-leaf keys are not strings
+
+def test_i18n_invalidated_by_mtime(locales):
+    assert I18nManager.get("common.save", lang="en") == "Save"
+
+    data = json.loads(locales.read_text(encoding="utf-8"))
+    data["en"]["common"]["save"] = "Store"
+    locales.write_text(json.dumps(data), encoding="utf-8")
+    st = os.stat(locales)
+    os.utime(locales, (st.st_atime, st.st_mtime + 5))
+
+    I18nManager._revalidate(force=True)
+    assert I18nManager.get("common.save", lang="en") == "Store"
+
+def test_i18n_save_rebuilds_table(locales):
+    assert I18nManager.get("sidebar.home", lang="ja") == "ホーム"
+    data = I18nManager.load()
+    data["ja"]["sidebar"]["home"] = "家"
+    I18nManager.save(data)
+    assert I18nManager.get("sidebar.home", lang="ja") == "家"
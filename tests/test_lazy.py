@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+import pytest
+from core.lazy import LazyModule, lazy_import, is_loaded, dev_reload, DEBUG_ENV
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def test_core_modules_do_not_import_heavy_deps_eagerly():
+    code = ("import sys; import core.llm, core.report, core.visualizer; "
+            "print(','.join(m for m in ('openai', 'docx', 'graphviz') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+def test_lazy_module_loads_on_first_attribute():
+    mod = LazyModule("json")
+    assert not is_loaded(mod)
+    assert mod.dumps({"a": 1}) == '{"a": 1}'
+    assert is_loaded(mod)
+    assert lazy_import("os") is os # Already imported -> real module
+
+def test_missing_module_error_carries_hint():
+    mod = lazy_import("ebda_no_such_module", "Install it with 'pip install nothing'.")
+    with pytest.raises(ImportError, match="pip install nothing"):
+        mod.anything
+
+def test_dev_reload_requires_debug_flag(monkeypatch):
+    import core.board
+    monkeypatch.delenv(DEBUG_ENV, raising=False)
+    assert dev_reload(core.board) is None
+    monkeypatch.setenv(DEBUG_ENV, "1")
+    assert dev_reload(core.board) == [core.board]
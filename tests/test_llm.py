@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from core.llm import LLMClient, LLMClientPool, RetryPolicy
+from llm_stub import StubServer
+
+@pytest.fixture
+def stub():
+    with StubServer() as server:
+        yield server
+
+@pytest.fixture
+def pool():
+    return LLMClientPool(max_concurrency=3, retry=RetryPolicy(max_retries=3, base_delay=0.01, max_delay=0.05))
+
+def _client(stub, pool, model="gpt-4o"):
+    return LLMClient("OpenAI", "sk-test", model, base_url=stub.base_url, pool=pool, use_cache=False)
+
+def test_llm_reuses_pooled_client(stub, pool):
+    a = _client(stub, pool)
+    b = _client(stub, pool)
+    assert a.generate_suggestions("ctx", "Drivers") == stub.state.reply
+    assert b.generate_suggestions("ctx", "Drivers") == stub.state.reply
+    assert pool.openai_client("OpenAI", "sk-test", stub.base_url) is pool.openai_client("OpenAI", "sk-test", stub.base_url)
+    assert len(pool._clients) == 1
+
+def test_llm_retries_429_with_backoff(stub, pool):
+    stub.state.statuses = [429, 429]
+    assert _client(stub, pool).generate_suggestions("ctx", "Drivers") == stub.state.reply
+    assert len(stub.state.requests) == 3
+
+def test_llm_reports_busy_when_retries_exhausted(stub, pool):
+    stub.state.statuses = [429] * 10
+    res = _client(stub, pool).generate_suggestions("ctx", "Drivers")
+    assert "429" in res
+    assert len(stub.state.requests) == pool.retry.max_retries + 1
+
+def test_llm_system_role_fallback_is_remembered(stub, pool):
+    stub.state.reject_system_role = True
+    client = _client(stub, pool, model="strict-model")
+    assert client.generate_suggestions("ctx", "Drivers") == stub.state.reply
+    assert client.generate_suggestions("ctx", "Drivers") == stub.state.reply
+    # 1 rejected + 1 fallback, then straight to the merged prompt
+    assert len(stub.state.requests) == 3
+    assert [m["role"] for m in stub.state.requests[-1]["messages"]] == ["user"]
+
+def test_llm_fallback_only_recorded_when_it_works(stub, pool):
+    # A 400 unrelated to the system role is not retried and not remembered
+    stub.state.statuses = [400]
+    assert _client(stub, pool).generate_suggestions("ctx", "Drivers").startswith("Error calling LLM")
+    assert len(stub.state.requests) == 1
+
+    # Rejected system role, but the merged retry fails too
+    stub.state.reject_system_role = True
+    stub.state.statuses = [200] + [500] * 10
+    assert _client(stub, pool, model="strict-model").generate_suggestions("ctx", "Drivers").startswith("Error")
+    assert pool.no_system_role == set()
+
+def test_llm_concurrency_cap(stub, pool):
+    stub.state.delay = 0.05
+    client = _client(stub, pool)
+    results = client.generate_many([("ctx", "Drivers")] * 9, max_concurrency=9)
+    assert results == [stub.state.reply] * 9
+    assert stub.state.max_inflight <= pool.max_concurrency
+
+def test_llm_async_generation(stub, pool):
+    client = _client(stub, pool)
+
+    async def run():
+        return await asyncio.gather(*[client.agenerate_suggestions("ctx", "Cards") for _ in range(4)])
+
+    assert asyncio.run(run()) == [stub.state.reply] * 4
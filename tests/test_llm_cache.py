@@ -0,0 +1,62 @@
+import time
+import pytest
+from core.llm import LLMClient, LLMClientPool, RetryPolicy
+from core.llm_cache import ResponseCache
+from llm_stub import StubServer
+
+@pytest.fixture
+def stub():
+    with StubServer() as server:
+        yield server
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "cache.sqlite"))
+
+def _client(stub, cache, **kwargs):
+    pool = LLMClientPool(retry=RetryPolicy(max_retries=0))
+    return LLMClient("OpenAI", "sk-test", "gpt-4o", base_url=stub.base_url, pool=pool, cache=cache, **kwargs)
+
+def test_repeated_prompt_served_from_cache(stub, cache):
+    client = _client(stub, cache)
+    first = client.generate_suggestions("ctx", "Drivers")
+    second = client.generate_suggestions("ctx", "Drivers")
+    assert first == second == stub.state.reply
+    assert len(stub.state.requests) == 1
+
+    # Different prompt or temperature -> miss
+    client.generate_suggestions("other ctx", "Drivers")
+    _client(stub, cache, temperature=0.2).generate_suggestions("ctx", "Drivers")
+    assert len(stub.state.requests) == 3
+
+def test_cache_opt_out_and_errors_not_cached(stub, cache):
+    client = _client(stub, cache)
+    client.generate_suggestions("ctx", "Survey Data", use_cache=False)
+    client.generate_suggestions("ctx", "Survey Data", use_cache=False)
+    assert len(stub.state.requests) == 2
+
+    stub.state.statuses = [500]
+    assert client.generate_suggestions("ctx2", "Drivers").startswith("Error")
+    assert client.generate_suggestions("ctx2", "Drivers") == stub.state.reply
+
+def test_model_list_cached_with_ttl(stub, cache):
+    assert LLMClient.cached_models("OpenAI", "sk-test", stub.base_url, cache=cache) is None
+    models = LLMClient.fetch_available_models("OpenAI", "sk-test", base_url=stub.base_url, cache=cache)
+    assert models == ["gpt-4o"]
+    assert LLMClient.cached_models("OpenAI", "sk-test", stub.base_url, cache=cache) == ["gpt-4o"]
+
+    key = LLMClient._models_cache_key("OpenAI", "sk-test", stub.base_url)
+    cache.set(key, ["stale"], ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get(key) is None
+
+def test_lru_eviction_under_budget(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=250)
+    for i in range(5):
+        cache.set(f"k{i}", "x" * 80)
+        time.sleep(0.001)
+        cache.get("k0") # Keep k0 hot
+    stats = cache.stats()
+    assert stats["bytes"] <= 250
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None
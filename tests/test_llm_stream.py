@@ -0,0 +1,71 @@
+import time
+import pytest
+from core.llm import LLMClient, LLMClientPool, RetryPolicy
+from core.llm_cache import ResponseCache
+from core.converter import StreamingRowParser, DRIVER_COLUMNS, CARD_COLUMNS
+from llm_stub import StreamingStubServer
+
+@pytest.fixture
+def stub():
+    with StreamingStubServer() as server:
+        yield server
+
+def _client(stub, tmp_path):
+    pool = LLMClientPool(retry=RetryPolicy(max_retries=0))
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    return LLMClient("OpenAI", "sk-test", "gpt-4o", base_url=stub.base_url, pool=pool, cache=cache)
+
+def test_stream_first_row_before_completion(stub, tmp_path):
+    stub.state.chunks = ["```csv\n", "engagement,Engage", "ment,\"Q1,Q2\",1-5\n", "wl,Workload,Q3,1-5\n"] + ["x"] * 8
+    stub.state.chunk_delay = 0.05
+    parser = StreamingRowParser(DRIVER_COLUMNS, "Drivers")
+
+    # Clock starts at the first chunk: client setup (lazy openai import) is not streaming latency
+    started = None
+    first_row_at = None
+    rows = []
+    for chunk in _client(stub, tmp_path).stream_suggestions("ctx", "Drivers"):
+        if started is None:
+            started = time.perf_counter()
+        for row, error in parser.feed(chunk):
+            rows.append((row, error))
+            if first_row_at is None:
+                first_row_at = time.perf_counter() - started
+    total = time.perf_counter() - started
+
+    assert rows[0] == ({"id": "engagement", "label": "Engagement", "survey_items": "Q1,Q2", "range": "1-5"}, None)
+    assert first_row_at < total / 2
+    assert parser.close()[0][1] is not None # Trailing garbage reported, not dropped
+
+def test_stream_result_is_cached(stub, tmp_path):
+    stub.state.chunks = ["a,b,", "c,1-5\n"]
+    client = _client(stub, tmp_path)
+    assert "".join(client.stream_suggestions("ctx", "Drivers")) == "a,b,c,1-5\n"
+    assert list(client.stream_suggestions("ctx", "Drivers")) == ["a,b,c,1-5\n"]
+    assert len(stub.state.requests) == 1
+
+def test_row_parser_quotes_and_validation():
+    parser = StreamingRowParser(CARD_COLUMNS, "Decision Cards")
+    rows = parser.feed('D9,"Title, with comma","Q?",HR,"d1,d2",k1,"x < 1 : RED : msg"\nD10,only,')
+    assert len(rows) == 1 and rows[0][1] is None
+    assert rows[0][0]["drivers"] == "d1,d2"
+
+    # Quoted field spanning a line break is held back until closed
+    assert parser.feed('three\n') != []
+    assert parser.feed('D11,"multi\n') == []
+    assert parser.feed('line",Q,HR,d1,k1,r\n')[0][0]["title"] == "multi\nline"
+
+    bad = StreamingRowParser(DRIVER_COLUMNS, "Drivers").feed("x,X,Q1,1-high\n")
+    assert bad[0][1] is not None
+
+def test_stream_holds_pool_slot_until_closed(stub, tmp_path):
+    stub.state.chunks = ["a,b,", "c,1-5\n"]
+    client = _client(stub, tmp_path)
+    stream = client.stream_suggestions("ctx", "Drivers", use_cache=False)
+    assert next(stream) == "a,b,"
+    sem = client.pool._semaphore("OpenAI")
+    assert sem._value == client.pool.max_concurrency - 1
+    stream.close()
+    assert sem._value == client.pool.max_concurrency
+    assert list(client.stream_suggestions("ctx", "Drivers", use_cache=False)) == ["a,b,", "c,1-5\n"]
+    assert sem._value == client.pool.max_concurrency
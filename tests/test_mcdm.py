@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from core.priority import PriorityCalculator
+from core.sensitivity import CRITERIA, sample_weights, score_batch
+
+WEIGHTS = {"impact": 1.0, "urgency": 0.8, "uncertainty": 0.5}
+
+def _inputs(n=60, seed=3):
+    rng = np.random.default_rng(seed)
+    impact, urgency, uncertainty = rng.uniform(-0.1, 1.1, n), rng.uniform(0, 1, n), rng.uniform(0, 0.6, n)
+    urgency[:5] = urgency[5] # Ties
+    return impact, urgency, uncertainty
+
+def _matrix(calc, impact, urgency, uncertainty):
+    x = np.column_stack([np.clip(impact, 0, 1), np.clip(urgency, 0, 1), -np.clip(uncertainty, 0, 1)])
+    w = np.array([calc.w_impact, calc.w_urgency, calc.w_uncertainty])
+    return x, w / w.sum()
+
+def test_vikor_formula():
+    calc = PriorityCalculator(WEIGHTS)
+    inputs = _inputs()
+    score, aux = calc.score_arrays(*inputs, "VIKOR (Compromise)")
+    x, w = _matrix(calc, *inputs)
+    gaps = w * (x.max(axis=0) - x) / (x.max(axis=0) - x.min(axis=0))
+    s, r = gaps.sum(axis=1), gaps.max(axis=1)
+    q = 0.5 * (s - s.min()) / np.ptp(s) + 0.5 * (r - r.min()) / np.ptp(r)
+    np.testing.assert_allclose(aux["S"], s)
+    np.testing.assert_allclose(aux["R"], r)
+    np.testing.assert_allclose(score, 1 - q)
+
+def test_promethee_flows_match_pairwise_definition():
+    calc = PriorityCalculator(WEIGHTS)
+    inputs = _inputs()
+    score, aux = calc.score_arrays(*inputs, "PROMETHEE")
+    x, w = _matrix(calc, *inputs)
+    n = len(x)
+    d = x[:, None, :] - x[None, :, :]
+    pref = np.clip((d - calc.PROMETHEE_Q) / (calc.PROMETHEE_P - calc.PROMETHEE_Q), 0, 1) @ w
+    np.testing.assert_allclose(aux["phi+"], pref.sum(axis=1) / (n - 1), atol=1e-12)
+    np.testing.assert_allclose(aux["phi-"], pref.sum(axis=0) / (n - 1), atol=1e-12)
+    np.testing.assert_allclose(score, aux["phi+"] - aux["phi-"], atol=1e-12)
+
+def test_electre_blocks_match_dense_outranking():
+    calc = PriorityCalculator(WEIGHTS)
+    inputs = _inputs(n=97)
+    x, w = _matrix(calc, *inputs)
+    concordance = (x[:, None, :] >= x[None, :, :]) @ w
+    veto = ((x[None, :, :] - x[:, None, :]) > calc.ELECTRE_DISCORDANCE * np.ptp(x, axis=0)).any(axis=2)
+    s = (concordance >= calc.ELECTRE_CONCORDANCE - 1e-12) & ~veto
+    np.fill_diagonal(s, False)
+
+    score, aux = calc.score_arrays(*inputs, "ELECTRE")
+    calc.PAIRWISE_BLOCK = 250 # Two rows per block
+    blocked, blocked_aux = calc.score_arrays(*inputs, "ELECTRE")
+    np.testing.assert_array_equal(aux["outranks"], s.sum(axis=1))
+    np.testing.assert_array_equal(aux["outranked_by"], s.sum(axis=0))
+    np.testing.assert_array_equal(blocked_aux["outranks"], aux["outranks"])
+    np.testing.assert_allclose(blocked, score)
+
+@pytest.mark.parametrize("method", ["VIKOR", "PROMETHEE", "ELECTRE"])
+def test_rank_candidates_match_arrays(method):
+    calc = PriorityCalculator(WEIGHTS)
+    impact, urgency, uncertainty = _inputs(n=30)
+    candidates = [{"id": f"c{i}", "impact": impact[i], "urgency": urgency[i], "uncertainty": uncertainty[i]} for i in range(30)]
+    ranked = calc.rank_candidates(candidates, method)
+    score, aux = calc.score_arrays(impact, urgency, uncertainty, method)
+    assert [c["id"] for c in ranked] == [f"c{i}" for i in np.argsort(-score, kind="stable")]
+    for c in ranked:
+        assert c["_details"] == calc._pairwise_details(method, aux, int(c["id"][1:]))
+
+@pytest.mark.parametrize("method", ["VIKOR", "PROMETHEE", "ELECTRE"])
+def test_score_batch_matches_new_methods(method):
+    impact, urgency, uncertainty = _inputs(n=40)
+    weights = np.vstack([sample_weights(4, seed=1), [[1.0, 0.0, 0.0], [0.0, 0.0, 0.0]]])
+    batch = score_batch(impact, urgency, uncertainty, weights, method)
+    for j, w in enumerate(weights):
+        expected, _ = PriorityCalculator(dict(zip(CRITERIA, w))).score_arrays(impact, urgency, uncertainty, method)
+        np.testing.assert_allclose(batch[:, j], expected, atol=1e-12)
+
+def test_composite_custom_ensemble():
+    inputs = _inputs()
+    calc = PriorityCalculator(WEIGHTS, ensemble=["VIKOR", "PROMETHEE", "ELECTRE"])
+    score, aux = calc.score_arrays(*inputs, "Composite (Ensemble)")
+    ranks = []
+    for method in calc.ensemble:
+        member, _ = calc.score_arrays(*inputs, method)
+        rank = np.empty(len(member), dtype=int)
+        rank[np.argsort(-member, kind="stable")] = np.arange(len(member))
+        np.testing.assert_array_equal(aux[f"rank_{method}"], rank)
+        ranks.append(rank)
+    np.testing.assert_allclose(score, 1 - np.mean(ranks, axis=0) / len(score))
+    batch = score_batch(*inputs, np.array([[1.0, 0.8, 0.5]]), "Composite", ensemble=calc.ensemble)
+    np.testing.assert_allclose(batch[:, 0], score)
+    with pytest.raises(ValueError):
+        PriorityCalculator(WEIGHTS, ensemble=["SAW", "AHP"])
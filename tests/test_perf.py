@@ -0,0 +1,57 @@
+import json
+import pandas as pd
+from core import perf
+from core.perf import span, traced, start_run, end_run
+from core.scoring import compute_driver_scores
+from data.models import DriverConfig
+
+@traced("test.work")
+def work(x):
+    with span("test.inner", x=x):
+        return x * 2
+
+def test_spans_are_noop_without_active_run():
+    assert perf.current() is None
+    assert work(2) == 4
+    assert span("anything") is span("other") # Shared null span
+
+def test_run_aggregates_spans_and_exports_chrome_trace():
+    rec = start_run("unit")
+    for i in range(3):
+        work(i)
+    df = pd.DataFrame({"q1": [4, 5], "q2": [3, 3]})
+    compute_driver_scores(df, [DriverConfig(id="d1", label="D1", survey_items=["q1", "q2"], range=[1, 5])])
+    assert end_run() is rec
+    assert perf.current() is None
+
+    rows = {r["span"]: r for r in rec.summary()}
+    assert rows["test.work"]["calls"] == 3
+    assert rows["test.inner"]["calls"] == 3
+    assert rows["scoring.compute_driver_scores"]["calls"] == 1
+    assert rows["test.work"]["total_ms"] >= rows["test.inner"]["total_ms"]
+
+    trace = json.loads(rec.chrome_trace_json())
+    spans = [e for e in trace["traceEvents"] if e.get("cat") == "span"]
+    assert len(spans) == 7
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in spans)
+    inner = next(e for e in spans if e["name"] == "test.inner")
+    assert inner["args"] == {"x": "0"}
+
+def test_profile_capture():
+    start_run("prof", profile=True)
+    sum(i * i for i in range(1000))
+    rec = end_run()
+    assert rec.profile_text and "function calls" in rec.profile_text
+
+def test_begin_page_run_disabled_drops_stale_run(monkeypatch):
+    import sys
+    import streamlit as st
+    from contextlib import nullcontext
+    rec = start_run("cut short", profile=True) # e.g. ended by st.rerun() before end_run
+    monkeypatch.setattr(st.sidebar, "expander", lambda *a, **k: nullcontext())
+    monkeypatch.setattr(st, "checkbox", lambda *a, **k: False)
+    assert perf.begin_page_run("page") is None
+    assert perf.current() is None
+    work(1)
+    assert rec.summary() == []
+    assert sys.getprofile() is None
@@ -0,0 +1,101 @@
+import gc
+import shutil
+import numpy as np
+import pandas as pd
+from core import registry
+from core.registry import ArtifactRegistry, config_changed, config_hash, session_artifacts
+from core.scoring import DriverItemMatrix, compute_driver_scores
+
+CONFIG = "configs/customer_default.yaml"
+
+def test_config_hash_ignores_session_state():
+    a = ArtifactRegistry.load_config(CONFIG)
+    b = ArtifactRegistry.load_config(CONFIG)
+    assert a is not b and a.decision_cards[0] is not b.decision_cards[0] # Independent copies
+    b.decision_cards[0].simulation_impact = 0.9
+    b.decision_cards[0].manual_override_status = "APPROVED"
+    assert config_hash(a) == config_hash(b)
+    b.priority_weights["impact"] = 9.0
+    assert config_hash(a) != config_hash(b)
+
+def test_artifacts_shared_and_refcounted():
+    ArtifactRegistry.clear()
+    config = ArtifactRegistry.load_config(CONFIG)
+    h1 = ArtifactRegistry.acquire(config)
+    h2 = ArtifactRegistry.acquire(ArtifactRegistry.load_config(CONFIG))
+    assert h1.artifacts is h2.artifacts
+    assert h1.engine is h2.engine and h1.visualizer is h2.visualizer
+    assert ArtifactRegistry.stats()["artifacts"] == {h1.config_hash: 2}
+
+    h1.release()
+    h1.release() # Idempotent
+    assert ArtifactRegistry.stats()["artifacts"] == {h1.config_hash: 1}
+    del h2
+    gc.collect()
+    stats = ArtifactRegistry.stats()
+    assert stats["artifacts"] == {h1.config_hash: 0} and stats["idle"] == [h1.config_hash]
+
+def test_idle_artifacts_evicted_lru():
+    ArtifactRegistry.clear()
+    keys = []
+    for i in range(ArtifactRegistry._max_idle + 2):
+        config = ArtifactRegistry.load_config(CONFIG)
+        config.priority_weights["impact"] = float(i)
+        handle = ArtifactRegistry.acquire(config)
+        keys.append(handle.config_hash)
+        handle.release()
+    remaining = set(ArtifactRegistry.stats()["artifacts"])
+    assert remaining == set(keys[-ArtifactRegistry._max_idle:])
+
+def test_session_artifacts_follow_config_changes():
+    ArtifactRegistry.clear()
+    state = {}
+    config = ArtifactRegistry.load_config(CONFIG)
+    h = session_artifacts(state, config)
+    assert session_artifacts(state, config) is h
+    config.decision_cards[0].simulation_urgency = 0.1 # Session-only change
+    assert session_artifacts(state, config) is h
+    config.decision_cards[0].title = "Renamed"
+    config_changed(state)
+    h2 = session_artifacts(state, config)
+    assert h2 is not h and h.released
+    assert ArtifactRegistry.stats()["artifacts"][h.config_hash] == 0
+
+def test_session_config_hash_is_cached_per_config(monkeypatch):
+    state = {}
+    config = ArtifactRegistry.load_config(CONFIG)
+    calls = []
+    monkeypatch.setattr(registry, "config_hash", lambda c: calls.append(1) or config_hash(c))
+    key = registry.session_config_hash(state, config)
+    assert registry.session_config_hash(state, config) == key and len(calls) == 1
+    config.priority_weights = {"impact": 9.0, "urgency": 1.0, "uncertainty": 1.0}
+    config_changed(state)
+    assert registry.session_config_hash(state, config) != key and len(calls) == 2
+    # A replaced config object is rehashed without an explicit edit
+    assert registry.session_config_hash(state, ArtifactRegistry.load_config(CONFIG)) == key and len(calls) == 3
+
+def test_load_config_reparses_changed_file(tmp_path):
+    path = str(tmp_path / "config.yaml")
+    shutil.copy(CONFIG, path)
+    first = ArtifactRegistry.load_config(path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n# touched\n")
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read().replace(first.customer_name, "Changed Co", 1)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    assert ArtifactRegistry.load_config(path).customer_name == "Changed Co"
+
+def test_driver_matrix_matches_compute_driver_scores():
+    config = ArtifactRegistry.load_config(CONFIG)
+    items = list(dict.fromkeys(i for d in config.drivers for i in d.survey_items))
+    rng = np.random.default_rng(0)
+    values = rng.integers(1, 6, (200, len(items))).astype(float)
+    values[rng.random(values.shape) < 0.2] = np.nan
+    df = pd.DataFrame(values, columns=items).drop(columns=items[-1])
+    expected = compute_driver_scores(df, config.drivers)
+    actual = DriverItemMatrix(config.drivers).scores(df)
+    assert expected.keys() == actual.keys()
+    for k in expected:
+        assert np.isclose(expected[k], actual[k], equal_nan=True)
+    assert DriverItemMatrix(config.drivers).scores(None) == {}
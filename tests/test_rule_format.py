@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.converter import DataConverter
+from core.rule_format import (
+    RuleFormatError, parse_rule_column, parse_rules_cell, rules_from_long, rules_to_json, rules_to_long
+)
+from data.models import CardStatus, DecisionCardConfig, RuleConfig
+
+def _card(cid, rules):
+    return DecisionCardConfig(id=cid, title="T", decision_question="Q?", stakeholders=[],
+                              required_evidence={"drivers": [], "kpis": []}, rules=rules)
+
+TRICKY = [
+    RuleConfig(condition="ratio('a:b') > 1", status=CardStatus.RED, message="Low: act | now \\| here"),
+    RuleConfig(condition="[x] < 2", status=CardStatus.GREEN, message=""),
+]
+
+def test_json_cells_round_trip_colons_and_pipes():
+    cards = [_card("C1", TRICKY), _card("C2", [])]
+    df = DataConverter.decision_card_to_csv(cards)
+    assert df["rules"][1] == "[]"
+    from io import StringIO
+    back = DataConverter.csv_to_decision_card(pd.read_csv(StringIO(df.to_csv(index=False))))
+    assert [c.rules for c in back] == [TRICKY, []]
+    assert parse_rules_cell(rules_to_json(TRICKY)) == TRICKY
+
+def test_auto_detection_mixes_formats_per_cell():
+    col = pd.Series([rules_to_json(TRICKY[:1]), "d1 < 3:red:Low", "", "  [ ]"])
+    rules = parse_rule_column(col, ["a", "b", "c", "d"])
+    assert rules[0] == TRICKY[:1]
+    assert rules[1] == [RuleConfig(condition="d1 < 3", status=CardStatus.RED, message="Low")]
+    assert rules[2] == [] and rules[3] == []
+    # Forced legacy reads a JSON cell as legacy text and reports it
+    with pytest.raises(RuleFormatError):
+        parse_rule_column(col, ["a", "b", "c", "d"], rules_format="legacy")
+
+def test_errors_are_reported_per_row_and_column():
+    col = pd.Series([
+        '[{"condition": "x", "status": "PURPLE", "message": "m"}]',
+        "d1 < 3:RED",
+        '[{"condition": "x", "status": "RED"',
+        "d1 < 3:bogus:msg|no status",
+    ])
+    with pytest.raises(RuleFormatError) as info:
+        parse_rule_column(col, ["A", "B", "C", "D"])
+    errors = info.value.errors
+    assert [(e["row"], e["id"], e["column"]) for e in errors] == [(0, "A", "rules"), (2, "C", "rules"), (3, "D", "rules"), (3, "D", "rules")]
+    assert "rule 1 status" in errors[0]["error"]
+    assert "unknown status 'bogus'" in errors[2]["error"]
+    assert "expected condition:STATUS" in errors[3]["error"]
+    assert "row 0 (id=A), column 'rules'" in str(info.value)
+    with pytest.raises(ValueError, match="unknown status"):
+        DataConverter.card_from_row({"id": "x", "title": "t", "decision_question": "q", "rules": "a < 1:MAYBE"})
+
+def test_legacy_column_without_any_message_or_status():
+    # Every segment lacks a message (or status): those split columns come back all-missing
+    rules = parse_rule_column(pd.Series(["d1 < 3:RED", "d2 > 4:green"]), ["A", "B"], rules_format="legacy")
+    assert rules == [[RuleConfig(condition="d1 < 3", status=CardStatus.RED, message="Rule triggered: d1 < 3")],
+                     [RuleConfig(condition="d2 > 4", status=CardStatus.GREEN, message="Rule triggered: d2 > 4")]]
+    with pytest.raises(RuleFormatError, match="expected condition:STATUS"):
+        parse_rule_column(pd.Series(["d1 < 3", "d2 > 4"]), ["A", "B"], rules_format="legacy")
+
+def test_long_format_round_trip_and_order():
+    cards = [_card("C1", TRICKY), _card("C2", TRICKY[::-1]), _card("C3", [])]
+    long_df = rules_to_long(cards)
+    assert list(long_df["card_id"]) == ["C1", "C1", "C2", "C2"]
+    shuffled = long_df.iloc[[3, 0, 2, 1]]
+    assert rules_from_long(shuffled, ["C1", "C2", "C3"]) == [TRICKY, TRICKY[::-1], []]
+
+    cards_df = DataConverter.decision_card_to_csv(cards).drop(columns=["rules"])
+    back = DataConverter.csv_to_decision_card(cards_df, rules_df=long_df)
+    assert [c.rules for c in back] == [c.rules for c in cards]
+
+    bad = pd.DataFrame({"card_id": ["C1", "C9", "C2"], "order": [0, 1, "x"],
+                        "condition": ["a", "b", ""], "status": ["red", "RED", "GRAY"], "message": [np.nan, "m", "m"]})
+    with pytest.raises(RuleFormatError) as info:
+        rules_from_long(bad, ["C1", "C2"])
+    assert {(e["row"], e["column"]) for e in info.value.errors} == {(1, "card_id"), (2, "condition"), (2, "status"), (2, "order")}
+    with pytest.raises(ValueError, match="missing column"):
+        rules_from_long(bad.drop(columns=["status"]), ["C1"])
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.decision import DecisionEngine
+from core.priority import PriorityCalculator
+from core.scenario import BASELINE, ScenarioEngine, apply_perturbations, scenarios_from_frame, scenarios_to_frame
+from core.scoring import prepare_card_table
+from data.models import EvidencePerturbation, ScenarioConfig
+
+def _setup(make_board, cards=80):
+    config, context = make_board(cards, seed=3)
+    config.decision_cards[3].simulation_impact = 0.15
+    config.decision_cards[1].rules[0].condition = "1.0 < driver_1 < 3.5" # Chained: scalar fallback
+    config.decision_cards[2].rules.insert(0, config.decision_cards[2].rules[0].model_copy(update={"condition": "driver_2 / (driver_3 - driver_3) > 1"}))
+    for card in config.decision_cards[::5]:
+        card.rules[0].message = "Junior turnover risk"
+    scenarios = [
+        ScenarioConfig(name="Drivers down", perturbations=[EvidencePerturbation(variable=d.id, op="add", value=-1.5) for d in config.drivers]),
+        ScenarioConfig(name="KPI doubled", perturbations=[EvidencePerturbation(variable=f"kpi_{k}_rate", op="mul", value=2) for k in range(3)]),
+        ScenarioConfig(name="KPI 3 measured", perturbations=[EvidencePerturbation(variable="kpi_3_rate", op="set", value=0.5)]),
+        ScenarioConfig(name="No-op"),
+    ]
+    return config, context, scenarios
+
+def test_each_scenario_matches_card_table(make_board, method):
+    config, context, scenarios = _setup(make_board)
+    engine, calc = DecisionEngine(), PriorityCalculator(config.priority_weights)
+    batch = ScenarioEngine(engine, calc, max_cells=500).run(config.decision_cards, context, scenarios, 0.2, method)
+    assert batch.names == [BASELINE] + [s.name for s in scenarios]
+
+    for s, perturbations in enumerate([[]] + [sc.perturbations for sc in scenarios]):
+        ctx = apply_perturbations(context, perturbations)
+        table = calc.rank_table(prepare_card_table(config.decision_cards, engine, ctx, 0.2), method)
+        np.testing.assert_array_equal(batch.status[s], table.status)
+        np.testing.assert_array_equal(batch.matched_rule[s], table.matched_rule)
+        np.testing.assert_allclose(batch.score[s], table.score, rtol=1e-12, atol=1e-12)
+        np.testing.assert_array_equal(batch.ranks[s], table.ranks)
+
+def test_summary_and_changes(make_board):
+    config, context, scenarios = _setup(make_board)
+    batch = ScenarioEngine(DecisionEngine(), PriorityCalculator(config.priority_weights)).run(config.decision_cards, context, scenarios)
+    summary = batch.summary().set_index("scenario")
+    assert summary.loc[BASELINE, "status_changes"] == 0 and summary.loc["No-op", "rank_changes"] == 0
+    assert summary.loc["Drivers down", "to_red"] > 0
+    assert summary.loc["KPI 3 measured", "status_changes"] == 20 # The UNKNOWN cards get evaluated
+
+    changes = batch.changes("Drivers down")
+    s = batch.index("Drivers down")
+    moved = (batch.status[s] != batch.status[0]) | (batch.ranks[s] != batch.ranks[0])
+    assert set(changes["id"]) == {batch.ids[i] for i in np.flatnonzero(moved)}
+    assert (changes["rank_change"].abs().diff().dropna() <= 0).all()
+    assert len(batch.changes("No-op")) == 0 and len(batch.changes("No-op", only_changed=False)) == 80
+
+def test_scenario_frame_round_trip_and_errors(make_board):
+    _, _, scenarios = _setup(make_board)
+    df = scenarios_to_frame(scenarios)
+    assert [s.model_dump() for s in scenarios_from_frame(df)] == [s.model_dump() for s in scenarios]
+    bad = pd.DataFrame([{"scenario": "x", "description": "", "variable": "a", "op": "pow", "value": 2}])
+    with pytest.raises(ValueError, match="row 0: unknown op"):
+        scenarios_from_frame(bad)
+    with pytest.raises(ValueError, match="reserved"):
+        scenarios_from_frame(bad.assign(scenario=BASELINE))
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from core.decision import DecisionEngine
+from core.priority import PriorityCalculator
+from core.scoring import prepare_card_table
+from core.sensitivity import (
+    CRITERIA, WeightSensitivity, per_vector, sample_weights, score_batch, score_matrix_batch, vector_budget, weight_grid
+)
+from data.models import CriterionConfig
+
+def _table(make_board, method, cards=40, weights=None):
+    config, context = make_board(cards, drivers=4, kpis=3, seed=7)
+    rng = np.random.default_rng(7)
+    for card in config.decision_cards[::2]:
+        card.simulation_impact = float(rng.uniform(0, 1))
+        card.simulation_urgency = float(rng.uniform(0, 1))
+    calc = PriorityCalculator(weights or {"impact": 1.0, "urgency": 0.8, "uncertainty": 0.5})
+    table = prepare_card_table(config.decision_cards, DecisionEngine(), context, 0.0)
+    table.uncertainty = rng.uniform(0, 0.5, len(table))
+    return calc.rank_table(table, method), calc
+
+def test_score_batch_matches_priority_calculator(make_board, method):
+    table, _ = _table(make_board, method)
+    weights = np.vstack([sample_weights(5, seed=2), [[1.0, 0.0, 0.0], [0.0, 0.0, 0.0]]])
+    batch = score_batch(table.impact, table.urgency, table.uncertainty, weights, method)
+    for j, w in enumerate(weights):
+        expected, _ = PriorityCalculator(dict(zip(CRITERIA, w))).score_arrays(table.impact, table.urgency, table.uncertainty, method)
+        np.testing.assert_allclose(batch[:, j], expected, rtol=1e-12, atol=1e-12)
+        np.testing.assert_array_equal(np.argsort(-batch[:, j], kind="stable"), np.argsort(-expected, kind="stable"))
+
+def test_sweep_rank_statistics(make_board):
+    table, calc = _table(make_board, "SAW")
+    sens = WeightSensitivity(calc, chunk=7)
+    result = sens.sweep(table, np.repeat([[1.0, 0.8, 0.5]], 10, axis=0), top_k=5)
+    assert (result.rank_min == table.ranks).all() and (result.rank_max == table.ranks).all()
+    assert result.rank_stability.tolist() == [1.0] * len(table)
+    assert result.top_k_probability.sum() == 5
+
+    grid = weight_grid(steps=8, total=2.3)
+    assert len(grid) == 45 and np.allclose(grid.sum(axis=1), 2.3)
+    result = sens.sweep(table, grid, top_k=5)
+    df = result.to_frame()
+    assert (df["rank_min"] <= df["rank"]).all() and (df["rank"] <= df["rank_max"]).all()
+    assert np.isclose(df["p_top_5"].sum(), 5) and (df["rank_std"] > 0).any()
+
+def test_saw_critical_changes_are_exact_thresholds(make_board):
+    table, calc = _table(make_board, "SAW")
+    df = WeightSensitivity(calc).critical_changes(table, pairs=10)
+    assert len(df) == 10 and df["critical_weight"].notna().any()
+    base = np.array([calc.w_impact, calc.w_urgency, calc.w_uncertainty])
+    for row in df[df["critical_weight"].notna()].itertuples():
+        k = CRITERIA.index(row.critical_weight)
+        a, b = table.ids.index(row.id), table.ids.index(row.next_id)
+        for factor, flipped in ((0.99, False), (1.01, True)):
+            w = base.copy()
+            w[k] += factor * row.critical_delta
+            score = score_batch(table.impact, table.urgency, table.uncertainty, w[None, :])[:, 0]
+            assert (score[b] > score[a]) == flipped
+
+@pytest.mark.parametrize("method", ["WASPAS", "TOPSIS"])
+def test_scanned_critical_changes_flip_the_pair(make_board, method):
+    table, calc = _table(make_board, method)
+    df = WeightSensitivity(calc).critical_changes(table, pairs=15, steps=400)
+    found = df[df["critical_weight"].notna()]
+    assert len(found)
+    base = np.array([calc.w_impact, calc.w_urgency, calc.w_uncertainty])
+    for row in found.itertuples():
+        w = base.copy()
+        w[CRITERIA.index(row.critical_weight)] += row.critical_delta
+        score = score_batch(table.impact, table.urgency, table.uncertainty, w[None, :], method)[:, 0]
+        assert score[table.ids.index(row.next_id)] > score[table.ids.index(row.id)]
+
+@pytest.mark.parametrize("k", [3, 7, 10, 12])
+def test_electre_batch_reuses_patterns(k, monkeypatch):
+    rng = np.random.default_rng(k)
+    extra = [CriterionConfig(id=f"c{j}", weight=float(rng.uniform(0.1, 2)), direction="cost" if j % 2 else "benefit")
+             for j in range(k - 3)]
+    calc = PriorityCalculator({"impact": 1.0, "urgency": 0.7, "uncertainty": 0.4}, criteria=extra)
+    calc.PAIRWISE_BLOCK = 300 # Several row blocks
+    x = np.round(rng.uniform(0, 1, (70, k)), 1) # Ties
+    weights = np.vstack([sample_weights(6, calc.weights, seed=k), np.zeros(k), np.eye(k)[:2]])
+    calls = []
+    patterns = calc._electre_patterns
+    monkeypatch.setattr(calc, "_electre_patterns", lambda m: calls.append(1) or patterns(m))
+    memo = {}
+    for part in (weights[:4], weights[4:]):
+        batch = score_matrix_batch(calc, x, part, "ELECTRE", memo)
+        for j, w in enumerate(part):
+            np.testing.assert_array_equal(batch[:, j], calc.with_weights(w).score_matrix(x, "ELECTRE")[0])
+    assert len(calls) == (1 if k <= calc.ELECTRE_PATTERN_CRITERIA else 0)
+    if calls:
+        kept, balance = memo["electre"]
+        assert balance.shape == (70, len(kept)) and len(np.unique(kept, axis=0)) == len(kept)
+        assert balance.dtype == np.int32 and balance.sum() == 0 # Each counted pair adds +1 to a and -1 to b
+        # Only the patterns that occur are kept: comonotone criteria give two of 2**k
+        ordered = np.repeat(np.linspace(0, 1, 70)[:, None], k, axis=1)
+        assert len(patterns(calc.normalize(ordered))[0]) <= 2
+    assert per_vector(calc, "ELECTRE") == (k > calc.ELECTRE_PATTERN_CRITERIA)
+    assert vector_budget(calc, "ELECTRE", 5000, 1000) == (10 if per_vector(calc, "ELECTRE") else 1000)
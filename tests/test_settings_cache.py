@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+from core.settings_cache import CachedFileStore
+
+def _json_store(path, **kwargs):
+    return CachedFileStore(
+        str(path),
+        load_fn=lambda raw: json.loads(raw.decode("utf-8")),
+        dump_fn=lambda data: json.dumps(data).encode("utf-8"),
+        **kwargs
+    )
+
+def test_store_reads_from_memory_until_file_changes(tmp_path):
+    path = tmp_path / "prefs.json"
+    path.write_text(json.dumps({"language": "en"}))
+    calls = []
+    store = CachedFileStore(
+        str(path),
+        load_fn=lambda raw: calls.append(1) or json.loads(raw),
+        dump_fn=lambda data: json.dumps(data).encode()
+    )
+
+    assert store.get("language") == "en"
+    assert store.get("language") == "en"
+    assert len(calls) == 1
+
+    # External edit (different size) -> reloaded
+    path.write_text(json.dumps({"language": "ja", "x": 1}))
+    assert store.get("language") == "ja"
+    assert len(calls) == 2
+
+def test_store_batches_saves_into_one_write(tmp_path):
+    path = tmp_path / "prefs.json"
+    writes = []
+    store = CachedFileStore(
+        str(path),
+        load_fn=lambda raw: json.loads(raw),
+        dump_fn=lambda data: writes.append(dict(data)) or json.dumps(data).encode()
+    )
+
+    with store.batch():
+        store.set("a", 1)
+        store.set("b", 2)
+        assert store.get("a") == 1 # Visible before flush
+        assert not path.exists()
+
+    assert len(writes) == 1
+    assert json.loads(path.read_text()) == {"a": 1, "b": 2}
+
+def test_store_delayed_flush_merges_disk_state(tmp_path):
+    path = tmp_path / "prefs.json"
+    store = _json_store(path, flush_delay=10.0)
+    store.set("a", 1)
+
+    # Another process wrote meanwhile; flush must not clobber it
+    path.write_text(json.dumps({"other": True}))
+    store.flush()
+    assert json.loads(path.read_text()) == {"other": True, "a": 1}
+
+def test_store_thread_safe_updates(tmp_path):
+    path = tmp_path / "prefs.json"
+    store = _json_store(path, flush_delay=0.01)
+
+    def worker(i):
+        for j in range(20):
+            store.set(f"k{i}_{j}", j)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    store.flush()
+
+    assert len(json.loads(path.read_text())) == 8 * 20
+
+def test_read_returns_a_copy(tmp_path):
+    store = _json_store(tmp_path / "secrets.json", flush_delay=0)
+    store.set("openai", "k1")
+    data = store.read()
+    data["openai"] = "tampered"
+    data["extra"] = 1
+    assert store.read() == {"openai": "k1"}
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+from core.io import ConfigLoader
+from core.quality import QualityGateway
+from core.synthetic import SyntheticSurveyGenerator
+
+@pytest.fixture
+def config():
+    return ConfigLoader("configs/customer_default.yaml").load_config()
+
+def test_synthetic_survey_reproducible_and_on_scale(config):
+    a = SyntheticSurveyGenerator(config, seed=7).survey_chunk(0, 500)
+    b = SyntheticSurveyGenerator(config, seed=7).survey_chunk(0, 500)
+    pd.testing.assert_frame_equal(a, b)
+
+    items = [i for d in config.drivers for i in d.survey_items]
+    assert list(a.columns) == ["employee_id"] + items + ["Department", "Tenure"]
+    values = a[items].stack()
+    assert values.min() >= 1 and values.max() <= 5
+    assert 0 < a[items].isna().mean().mean() < 0.1
+
+def test_synthetic_survey_hits_target_alpha(config):
+    df = SyntheticSurveyGenerator(config, seed=1, target_alpha=0.8, missing_rate=0.0, dropout_rate=0.0).survey_chunk(0, 5000)
+    _, checks = QualityGateway({}).check_cronbach_alpha(df, config.drivers)
+    alphas = [c.details["alpha"] for c in checks]
+    assert alphas and all(0.65 < a < 0.95 for a in alphas)
+
+def test_synthetic_chunked_csv_and_kpis(config, tmp_path):
+    gen = SyntheticSurveyGenerator(config, seed=3)
+    path = str(tmp_path / "survey.csv")
+    assert gen.write_survey(path, 2500, chunk_size=1000) == 2500
+    df = pd.read_csv(path)
+    assert len(df) == 2500 and df["employee_id"].is_unique
+
+    kpi = gen.kpi_series(months=6)
+    assert len(kpi) == 6 * len(gen.segments["Department"])
+    assert {"turnover_rate_junior", "avg_overtime_hours"} <= set(kpi.columns)
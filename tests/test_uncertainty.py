@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.decision import DecisionEngine
+from core.priority import PriorityCalculator
+from core.scoring import DriverItemMatrix, get_kpi_latest, prepare_card_table
+from core.synthetic import SyntheticSurveyGenerator
+from core.uncertainty import EvidenceDistribution, MonteCarloRanking, apply_uncertainty, kpi_standard_errors
+
+def _setup(make_board, cards=60):
+    config, _ = make_board(cards, drivers=5, items=3) # Evidence comes from synthetic survey/KPI data instead
+    gen = SyntheticSurveyGenerator(config, seed=0)
+    survey, kpi = gen.survey_chunk(0, 80), gen.kpi_series(months=18)
+    matrix = DriverItemMatrix(config.drivers)
+    context = matrix.scores(survey)
+    context.update({k: get_kpi_latest(kpi, k) for k in gen.kpi_names()[:3]}) # Last KPI missing -> UNKNOWN cards
+    # Thresholds near the observed values so that sampling flips statuses
+    for card in config.decision_cards:
+        for rule in card.rules:
+            name, op, _ = rule.condition.split()
+            if name in context:
+                rule.condition = f"{name} {op} {context[name]:.4f}"
+    return config, context, EvidenceDistribution.from_evidence(context, matrix, survey, kpi)
+
+def test_standard_errors(make_board):
+    config, _, _ = _setup(make_board)
+    survey = SyntheticSurveyGenerator(config, seed=1).survey_chunk(0, 50)
+    survey.iloc[::7, 0] = np.nan
+    errors = DriverItemMatrix(config.drivers).standard_errors(survey)
+    for d in config.drivers:
+        row_means = survey[d.survey_items].mean(axis=1).dropna()
+        assert errors[d.id] == pytest.approx(row_means.std(ddof=1) / np.sqrt(len(row_means)))
+    assert DriverItemMatrix(config.drivers).standard_errors(survey.head(1)) == {d.id: 0.0 for d in config.drivers}
+
+    kpi = pd.DataFrame({"k": 0.1 * np.arange(30) + np.tile([0.0, 1.0], 15), "flat": 1.0})
+    errors = kpi_standard_errors(kpi, ["k", "flat", "absent"], window=12)
+    assert errors["flat"] == 0.0 and "absent" not in errors and errors["k"] == pytest.approx(1.0 / np.sqrt(2), rel=0.1)
+
+def test_samples_match_card_table_per_sample(make_board):
+    config, context, dist = _setup(make_board)
+    engine, calc = DecisionEngine(), PriorityCalculator(config.priority_weights)
+    result = MonteCarloRanking(engine, calc, chunk=7).run(config.decision_cards, dist, 0.1, "WASPAS", samples=30, seed=5)
+    values = dist.sample(30, 5)
+    status = np.zeros((30, len(config.decision_cards)), dtype=int)
+    for s in range(30):
+        table = calc.rank_table(prepare_card_table(config.decision_cards, engine, dict(zip(dist.names, values[:, s])), 0.1), "WASPAS")
+        np.testing.assert_array_equal(result.ranks[s], table.ranks)
+        status[s] = table.status
+    np.testing.assert_array_equal(result.status_counts, np.stack([(status == k).sum(axis=0) for k in range(4)], axis=1))
+    assert 0 < result.status_uncertainty.max() <= 0.75
+    assert result.status_probability[:, 3].tolist().count(1.0) == len(config.decision_cards) // 4 # kpi_3 cards
+
+def test_fixed_evidence_gives_certain_ranking(make_board):
+    config, context, _ = _setup(make_board)
+    engine, calc = DecisionEngine(), PriorityCalculator(config.priority_weights)
+    result = MonteCarloRanking(engine, calc).run(config.decision_cards, EvidenceDistribution(context), 0.0, "TOPSIS", samples=20)
+    table = calc.rank_table(prepare_card_table(config.decision_cards, engine, context, 0.0), "TOPSIS")
+    assert (result.ranks == table.ranks).all() and (result.status_uncertainty == 0).all()
+    df = result.to_frame()
+    assert df["likely_status"].tolist() == list(table.status_map().values())
+    assert (df["rank_p5"] == df["rank_p95"]).all()
+
+def test_process_pool_and_per_card_uncertainty(make_board):
+    config, _, dist = _setup(make_board, cards=20)
+    engine, calc = DecisionEngine(), PriorityCalculator(config.priority_weights)
+    mc = MonteCarloRanking(engine, calc, chunk=10)
+    local = mc.run(config.decision_cards, dist, 0.1, "Composite", samples=40, seed=3)
+    pooled = mc.run(config.decision_cards, dist, 0.1, "Composite", samples=40, seed=3, workers=2)
+    assert (local.ranks == pooled.ranks).all() and (local.status_counts == pooled.status_counts).all()
+
+    table = prepare_card_table(config.decision_cards, engine, dict(zip(dist.names, dist.mean)), 0.1)
+    apply_uncertainty(table, local, 0.1)
+    np.testing.assert_allclose(table.uncertainty, np.minimum(0.1 + local.status_uncertainty, 1.0))
+
+def test_session_monte_carlo_reuses_result_until_inputs_change(make_board, monkeypatch):
+    from types import SimpleNamespace
+    from core import uncertainty
+    config, context, dist = _setup(make_board, cards=20)
+    artifacts = SimpleNamespace(config_hash="h1", engine=DecisionEngine(), priority_calc=PriorityCalculator(config.priority_weights))
+    artifacts.engine.compile_rules(config.decision_cards)
+    runs = []
+    run = uncertainty.MonteCarloRanking.run
+    monkeypatch.setattr(uncertainty.MonteCarloRanking, "run", lambda self, *a, **k: runs.append(1) or run(self, *a, **k))
+    state = {}
+    first = uncertainty.session_monte_carlo(state, artifacts, config.decision_cards, dist, 0.1, "SAW", samples=20)
+    assert uncertainty.session_monte_carlo(state, artifacts, config.decision_cards, EvidenceDistribution(context, dict(zip(dist.names, dist.sd))),
+                                           0.1, "SAW", samples=20) is first
+    assert len(runs) == 1
+    uncertainty.session_monte_carlo(state, artifacts, config.decision_cards, dist, 0.1, "TOPSIS", samples=20)
+    config.decision_cards[0].simulation_impact = 0.9
+    uncertainty.session_monte_carlo(state, artifacts, config.decision_cards, dist, 0.1, "TOPSIS", samples=20)
+    artifacts.config_hash = "h2"
+    uncertainty.session_monte_carlo(state, artifacts, config.decision_cards, dist, 0.1, "TOPSIS", samples=20)
+    assert len(runs) == 4
+
+def test_sample_budget_caps_pairwise_methods():
+    from core.uncertainty import MC_SAMPLES, sample_budget
+    calc = PriorityCalculator({}, ensemble=["SAW", "ELECTRE"])
+    assert sample_budget(calc, "SAW", 5000) == MC_SAMPLES
+    assert sample_budget(calc, "ELECTRE", 5000) == 10 and sample_budget(calc, "Composite", 5000) == 10
+    assert sample_budget(calc, "ELECTRE", 500) == MC_SAMPLES
+    assert sample_budget(PriorityCalculator({}), "Composite", 5000) == MC_SAMPLES
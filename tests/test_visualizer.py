@@ -0,0 +1,81 @@
+from core.visualizer import CausalVisualizer
+from data.models import DriverConfig, DecisionCardConfig
+
+def make_viz():
+    drivers = [DriverConfig(id=f"d{i}", label=f"Driver {i}", survey_items=[f"q{i}"], range=[1, 5]) for i in range(3)]
+    cards = [
+        DecisionCardConfig(id="C1", title="Card 1", decision_question="?", stakeholders=[],
+                           required_evidence={"drivers": ["d0", "d1"], "kpis": ["turnover_rate"]}, rules=[]),
+        DecisionCardConfig(id="C2", title="Card 2", decision_question="?", stakeholders=[],
+                           required_evidence={"drivers": ["d2", "unknown"], "kpis": ["turnover_rate"]}, rules=[]),
+    ]
+    return CausalVisualizer(drivers, cards)
+
+def test_card_subgraph_only_contains_neighbourhood():
+    viz = make_viz()
+    src = viz.render_dot({"d0": 2.0, "d1": 4.0, "d2": 3.0}, {"C1": 0.8, "C2": 0.2}, target_card_id="C1")
+    assert "d0 -> C1" in src and "d1 -> C1" in src and "kpi_turnover_rate -> C1" in src
+    assert "C2" not in src and "d2" not in src
+    assert "#ffcccc" in src # d0 low -> red fill
+    assert "#ff9999" in src # C1 high priority
+
+def test_full_graph_emits_shared_kpi_once():
+    src = make_viz().render_dot()
+    assert src.count('kpi_turnover_rate [label=') == 1
+    assert "unknown" not in src
+    assert "d2 -> C2" in src
+
+def test_dot_cache_keyed_by_relevant_scores():
+    viz = make_viz()
+    CausalVisualizer._dot_cache.clear()
+    a = viz.render_dot({"d0": 2.0, "d1": 4.0, "d2": 3.0}, {"C1": 0.8}, target_card_id="C1")
+    # d2 / C2 don't affect C1's view -> cache hit, same object
+    b = viz.render_dot({"d0": 2.0, "d1": 4.0, "d2": 1.0}, {"C1": 0.8, "C2": 0.9}, target_card_id="C1")
+    assert a is b and len(CausalVisualizer._dot_cache) == 1
+    c = viz.render_dot({"d0": 4.5, "d1": 4.0}, {"C1": 0.8}, target_card_id="C1")
+    assert c != a and len(CausalVisualizer._dot_cache) == 2
+
+def make_large_viz(n_cards=2000, n_drivers=300):
+    drivers = [DriverConfig(id=f"d{i}", label=f"Driver {i}", survey_items=[f"q{i}"], range=[1, 5]) for i in range(n_drivers)]
+    cards = [
+        DecisionCardConfig(id=f"C{c}", title=f"Card {c}", decision_question="?", stakeholders=[f"Team {c % 50}"],
+                           required_evidence={"drivers": [f"d{c % n_drivers}", f"d{(c * 7) % n_drivers}"], "kpis": [f"k{c % 5}"]},
+                           rules=[])
+        for c in range(n_cards)
+    ]
+    return CausalVisualizer(drivers, cards)
+
+def count_nodes(src):
+    return sum(1 for line in src.splitlines() if "[label=" in line and "->" not in line)
+
+def test_aggregated_graph_is_bounded():
+    viz = make_large_viz()
+    driver_scores = {f"d{i}": 1 + (i % 40) / 10 for i in range(300)}
+    card_scores = {f"C{c}": (c % 100) / 100 for c in range(2000)}
+    statuses = {f"C{c}": ["RED", "YELLOW", "GREEN"][c % 3] for c in range(2000)}
+
+    src = viz.render_aggregated_dot(driver_scores, card_scores, statuses, group_by="status", max_nodes=30)
+    assert count_nodes(src) <= 30
+    assert "RED (667 cards)" in src
+    assert "label=" in src and "penwidth" in src
+
+    # Many stakeholders get folded into "Other"; expanding stays within the cap
+    expand = ["card:Other", "driver:Low drivers"]
+    src = viz.render_aggregated_dot(driver_scores, card_scores, statuses, group_by="stakeholder", expand=expand, max_nodes=30)
+    assert count_nodes(src) <= 30
+    assert "more)" in src
+
+def test_aggregated_expansion_shows_members():
+    viz = make_viz()
+    src = viz.render_aggregated_dot({"d0": 2.0, "d1": 4.0, "d2": 3.0}, {"C1": 0.8, "C2": 0.2},
+                                    {"C1": "RED", "C2": "GREEN"}, expand=["card:RED"])
+    assert "Card 1" in src and "GREEN (1 cards)" in src
+    assert "card:RED" not in src
+
+def test_aggregated_cache_sees_stakeholder_edits():
+    viz = make_viz()
+    assert "Unassigned (2 cards)" in viz.render_aggregated_dot(group_by="stakeholder")
+    cards = [c.model_copy(update={"stakeholders": ["HR"]}) if c.id == "C1" else c for c in viz.cards]
+    edited = CausalVisualizer([DriverConfig(id=k, label=v, survey_items=[], range=[1, 5]) for k, v in viz.drivers.items()], cards)
+    src = edited.render_aggregated_dot(group_by="stakeholder")
+    assert "HR (1 cards)" in src and "Unassigned (1 cards)" in src
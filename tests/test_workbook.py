@@ -0,0 +1,87 @@
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+from core.workbook import load_workbook, match_sheets, read_sheet
+from core.rule_format import rules_to_json
+from data.models import CardStatus, RuleConfig
+
+def _write(path, sheets):
+    wb = Workbook(write_only=True)
+    for name, rows in sheets.items():
+        ws = wb.create_sheet(name)
+        for row in rows:
+            ws.append(row)
+    wb.save(path)
+    return path
+
+RULE = RuleConfig(condition="d1 < 3", status=CardStatus.RED, message="Low: act | now")
+
+def _hr_workbook(path):
+    rng = np.random.default_rng(0)
+    survey = [["employee_id", "Q1", "Q2", "Q3"]]
+    for i in range(40):
+        base = int(rng.integers(1, 6))
+        survey.append([f"u{i}", base, min(5, base + int(rng.integers(0, 2))), None if i == 3 else base])
+    return _write(path, {
+        "Read me": [["Workbook for the HR pilot"]],
+        "Drivers": [["id", "label", "survey_items", "range"], ["d1", "Safety", "Q1,Q2,Q3", "1-5"], [None, None], ["d2", "Load", None, "0-10"]],
+        "Decision Cards": [
+            ["id", "title", "decision_question", "stakeholders", "drivers", "kpis", "rules"],
+            ["C1", "Retention", "Act?", "HR, CEO", "d1", "turnover", rules_to_json([RULE])],
+            ["C2", "Load", "Hire?", "HR", "d2", None, "d2 > 7:YELLOW:High"],
+        ],
+        "survey": survey,
+        "KPIs": [["Date", "Department", "turnover"]] + [[datetime.datetime(2024, m, 1), "Sales", 0.1 * m] for m in range(1, 7)],
+    })
+
+def test_workbook_maps_sheets_and_types_columns(tmp_path):
+    result = load_workbook(str(_hr_workbook(tmp_path / "hr.xlsx")), {"min_n_count": 5, "max_missing_ratio": 0.2})
+    assert result.ok, result.errors
+    assert result.sheets == {"drivers": "Drivers", "cards": "Decision Cards", "survey": "survey", "kpi": "KPIs"}
+    assert result.unused_sheets == ["Read me"]
+
+    assert [(d.id, d.survey_items, d.range) for d in result.drivers] == [("d1", ["Q1", "Q2", "Q3"], [1.0, 5.0]), ("d2", [], [0.0, 10.0])]
+    assert result.cards[0].rules == [RULE]
+    assert result.cards[1].rules[0].status == CardStatus.YELLOW
+
+    survey = result.survey
+    assert len(survey) == 40
+    assert survey["Q1"].dtype == np.int64 and survey["Q3"].dtype == np.float64 and np.isnan(survey["Q3"][3])
+    assert {c.name for c in result.survey_quality["checks"]} >= {"Sample Size", "Missing Ratio", "Reliability (Safety)"}
+    assert result.kpi["Date"].dtype == "datetime64[ns]" and result.kpi["turnover"].dtype == np.float64
+    assert result.kpi_checks == []
+
+def test_workbook_roles_and_errors_per_sheet(tmp_path):
+    path = _write(tmp_path / "bad.xlsx", {
+        "cards": [["id", "title", "decision_question", "rules"], ["C1", "T", "Q", "x < 1:PURPLE"]],
+        "Responses": [["Q1", "Q2"], [1, 2]],
+        "kpi": [["Department"], ["Sales"]],
+    })
+    result = load_workbook(str(path), roles=["survey"])
+    assert result.sheets == {"survey": "Responses"} and result.ok and result.cards is None
+
+    result = load_workbook(str(path), sheet_map={"survey": "Missing"})
+    assert "unknown status 'PURPLE'" in result.errors["cards"]
+    assert result.errors["survey"] == "Sheet 'Missing' not found"
+    assert result.errors["kpi"] == "KPI sheet has no numeric columns"
+
+def test_read_sheet_header_and_blank_rows(tmp_path):
+    path = _write(tmp_path / "s.xlsx", {"data": [[], [None, None], ["a", None, "a", None], [1, "x", " ", None], [], [2.5, None, "y"]]})
+    from openpyxl import load_workbook as open_wb
+    wb = open_wb(str(path), read_only=True)
+    df = read_sheet(wb["data"])
+    wb.close()
+    assert list(df.columns) == ["a", "column_2", "a.1"]
+    assert df["a"].tolist() == [1.0, 2.5]
+    assert df["column_2"][0] == "x" and pd.isna(df["column_2"][1])
+    assert pd.isna(df["a.1"][0]) and df["a.1"][1] == "y"
+    assert match_sheets(["Decision_Cards", "KPI"], {"kpi": "Other"}) == {"cards": "Decision_Cards", "kpi": "Other"}
+
+def test_unreadable_workbook_is_reported(tmp_path):
+    bad = tmp_path / "survey.xlsx"
+    bad.write_bytes(b"id,q1\n1,2\n")
+    result = load_workbook(str(bad))
+    assert not result.ok and "Not a readable .xlsx workbook" in result.errors["workbook"]
+    assert result.sheets == {} and result.survey is None